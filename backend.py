@@ -25,6 +25,7 @@ from pydantic import BaseModel
 import uvicorn
 
 from utils.logger import logger
+from utils import graph_processor
 import ast
 import main as graphrag_main
 
@@ -149,6 +150,15 @@ async def send_progress_update(client_id: str, stage: str, progress: int, messag
         "timestamp": datetime.now().isoformat()
     }, client_id)
 
+async def send_answer_delta(client_id: str, stage: str, delta: str):
+    """Send a fragment of an answer that is still being generated via WebSocket"""
+    await manager.send_message({
+        "type": "answer_delta",
+        "stage": stage,
+        "delta": delta,
+        "timestamp": datetime.now().isoformat()
+    }, client_id)
+
 async def clear_cache_files(dataset_name: str):
     """Clear all cache files for a dataset before graph construction"""
     try:
@@ -211,6 +221,14 @@ async def get_status():
         "graphrag_available": GRAPHRAG_AVAILABLE
     }
 
+@app.get("/api/llm/endpoints")
+async def get_llm_endpoints():
+    """Per-endpoint load, latency and circuit state, and hedging counters of the LLM client"""
+    return {
+        "endpoints": graphrag_main.call_llm_api.get_endpoint_pool().stats(),
+        "hedging": graphrag_main.call_llm_api.get_hedging_stats(),
+    }
+
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
     await manager.connect(websocket, client_id)
@@ -515,7 +533,10 @@ async def prepare_graph_visualization(graph_path: str) -> Dict:
             return {"nodes": [], "links": [], "categories": [], "stats": {}}
 
         # Handle different graph data formats
-        if isinstance(graph_data, list):
+        if graph_processor.is_normalized_graph_data(graph_data):
+            # Normalized format: node table + edge table referencing node ids
+            return convert_normalized_format(graph_data)
+        elif isinstance(graph_data, list):
             # GraphRAG format: list of relationships
             return convert_graphrag_format(graph_data)
         elif isinstance(graph_data, dict) and "nodes" in graph_data:
@@ -605,6 +626,18 @@ def convert_graphrag_format(graph_data: List) -> Dict:
         }
     }
 
+def convert_normalized_format(graph_data: Dict) -> Dict:
+    """Convert normalized {format, nodes, edges} graph data to ECharts format (same output as the GraphRAG list)"""
+    nodes_by_id = {node["id"]: node for node in graph_data.get("nodes", [])}
+    relationships = []
+    for edge in graph_data.get("edges", []):
+        start_node = nodes_by_id.get(edge.get("source"))
+        end_node = nodes_by_id.get(edge.get("target"))
+        if start_node is None or end_node is None:
+            continue
+        relationships.append({"start_node": start_node, "relation": edge.get("relation", "related_to"), "end_node": end_node})
+    return convert_graphrag_format(relationships)
+
 def convert_standard_format(graph_data: Dict) -> Dict:
     """Convert standard {nodes: [], edges: []} format to ECharts format"""
     nodes = []
@@ -680,8 +713,11 @@ async def ask_question(request: QuestionRequest, client_id: str = "default"):
         if config is None:
             config = get_config("config/base_config.yaml")
 
-        graphq = decomposer.GraphQ(dataset_name, config=config)
-        kt_retriever = retriever.KTRetriever(
+        # Blocking work (graph/index loading, retrieval) runs in the default executor and LLM calls
+        # use the async client, so one question does not stall the event loop for other requests
+        loop = asyncio.get_event_loop()
+        graphq = decomposer.GraphQ(dataset_name, config=config, hedge=True)
+        kt_retriever = await loop.run_in_executor(None, lambda: retriever.KTRetriever(
             dataset_name,
             graph_path,
             recall_paths=config.retrieval.recall_paths,
@@ -689,15 +725,30 @@ async def ask_question(request: QuestionRequest, client_id: str = "default"):
             top_k=config.retrieval.top_k_filter,
             mode="agent",  # force agent mode
             config=config
-        )
+        ))
 
         await send_progress_update(client_id, "retrieval", 40, "Building indices...")
-        kt_retriever.build_indices()
+        await loop.run_in_executor(None, kt_retriever.build_indices)
 
         # Step 1+2: Reuse main.py's initial_question_decomposition (decomposition + initial retrieval)
         await send_progress_update(client_id, "retrieval", 50, "Question decomposition and initial retrieval...")
         graphrag_main.config = config  # ensure main.py uses the same config as backend
-        init_result = graphrag_main.initial_question_decomposition(graphq, kt_retriever, question, schema_path)
+        # the decomposition LLM call is awaited on the loop; only retrieval runs in the executor, and the
+        # initial answer is streamed below instead of being generated inside initial_question_decomposition
+        try:
+            decomposition_result = await graphq.decompose_async(question, schema_path)
+        except Exception as e:
+            logger.error(f"Error decomposing question: {str(e)}")
+            decomposition_result = {
+                "sub_questions": [{"sub-question": question}],
+                "involved_types": {"nodes": [], "relations": [], "attributes": []},
+            }
+        init_result = await loop.run_in_executor(
+            None, lambda: graphrag_main.initial_question_decomposition(
+                graphq, kt_retriever, question, schema_path,
+                decomposition_result=decomposition_result, generate_initial_answer=False,
+            )
+        )
 
         sub_questions = init_result.get("sub_questions", [])
         reasoning_steps = []
@@ -725,23 +776,21 @@ async def ask_question(request: QuestionRequest, client_id: str = "default"):
         thoughts = []
 
         # Initial answer attempt
-        initial_triples = graphrag_main.deduplicate_triples(list(all_triples))
-        initial_chunk_ids = list(set(all_chunk_ids))
-        initial_chunk_contents = graphrag_main.merge_chunk_contents(initial_chunk_ids, all_chunk_contents)
-        context_initial = "=== Triples ===\n" + "\n".join(initial_triples[:20]) + "\n=== Chunks ===\n" + "\n".join(initial_chunk_contents[:10])
+        context_initial = graphrag_main.pack_context(question, all_triples, all_chunk_ids, all_chunk_contents).render()
         init_prompt = kt_retriever.generate_prompt(question, context_initial)
         try:
-            initial_answer = kt_retriever.generate_answer(init_prompt)
+            initial_answer = await kt_retriever.generate_answer_streaming(
+                init_prompt, lambda delta: send_answer_delta(client_id, "initial_answer", delta), hedge=True
+            )
         except Exception as e:
             initial_answer = f"Initial answer failed: {e}"
         thoughts.append(f"Initial: {initial_answer[:200]}")
         final_answer = initial_answer
 
         for step in range(1, max_steps + 1):
-            loop_triples = graphrag_main.deduplicate_triples(list(all_triples))
-            loop_chunk_ids = list(set(all_chunk_ids))
-            loop_chunk_contents = graphrag_main.merge_chunk_contents(loop_chunk_ids, all_chunk_contents)
-            loop_ctx = "=== Triples ===\n" + "\n".join(loop_triples[:20]) + "\n=== Chunks ===\n" + "\n".join(loop_chunk_contents[:10])
+            loop_packed = graphrag_main.pack_context(f"{question} {current_query}", all_triples, all_chunk_ids, all_chunk_contents)
+            loop_triples, loop_chunk_ids, loop_chunk_contents = loop_packed.triples, loop_packed.chunk_ids, loop_packed.chunks
+            loop_ctx = loop_packed.render()
             loop_prompt = f"""
 You are an expert knowledge assistant using iterative retrieval with chain-of-thought reasoning.
 Current Question: {question}
@@ -754,7 +803,9 @@ Instructions:
 Your reasoning:
 """
             try:
-                reasoning = kt_retriever.generate_answer(loop_prompt)
+                reasoning = await kt_retriever.generate_answer_streaming(
+                    loop_prompt, lambda delta: send_answer_delta(client_id, f"ircot_step_{step}", delta), hedge=True
+                )
             except Exception as e:
                 reasoning = f"Reasoning error: {e}"
             thoughts.append(reasoning[:400])
@@ -782,7 +833,9 @@ Your reasoning:
             current_query = new_query
             await send_progress_update(client_id, "retrieval", min(90, 75 + step * 5), f"Iterative retrieval Step {step}...")
             try:
-                new_ret, _ = kt_retriever.process_retrieval_results(current_query, top_k=config.retrieval.top_k_filter)
+                new_ret, _ = await loop.run_in_executor(
+                    None, lambda: kt_retriever.process_retrieval_results(current_query, top_k=config.retrieval.top_k_filter)
+                )
                 new_triples = new_ret.get('triples', []) or []
                 new_chunk_ids = new_ret.get('chunk_ids', []) or []
                 new_chunk_contents = new_ret.get('chunk_contents', []) or []
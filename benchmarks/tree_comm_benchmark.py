@@ -0,0 +1,302 @@
+"""
+Scaling benchmark for the Tree-Comm community stage (FastTreeComm).
+
+Generates synthetic knowledge graphs with a heavy-tailed degree distribution,
+topic-correlated entity names and relations, then runs detect_communities and
+create_super_nodes_with_keywords with LLM naming stubbed locally. Reports wall
+time per phase and peak resident memory for every graph size.
+
+Usage:
+    python benchmarks/tree_comm_benchmark.py --sizes 10000 100000 1000000 --fake-embeddings 384
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import resource
+import sys
+import time
+import zlib
+from queue import Empty
+from typing import Dict, List
+
+import networkx as nx
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import logger
+
+
+SYLLABLES = [
+    "ar", "bel", "cor", "dan", "el", "fal", "gor", "hal", "ir", "jen", "kal", "lor", "mar", "nor",
+    "or", "pel", "quin", "ros", "sel", "tor", "ul", "val", "wen", "xan", "yor", "zel", "bri", "cas",
+    "dor", "fen", "gal", "hes", "kor", "lin", "mor", "nes", "pra", "ril", "sto", "vin",
+]
+
+ENTITY_TYPES = [
+    "River", "Institute", "Company", "Festival", "Mountain", "University", "Party", "Band", "Museum",
+    "Province", "Dynasty", "Hospital", "Station", "Temple", "League", "Studio", "Library", "Bridge",
+    "Treaty", "Orchestra", "Foundation", "Airport", "Castle", "Journal", "Valley", "Island",
+]
+
+RELATIONS = [
+    "located_in", "founded_by", "part_of", "member_of_group", "born_in", "works_for", "owned_by",
+    "capital_of", "adjacent_to", "created_by", "influenced_by", "allied_with", "successor_of",
+    "named_after", "headquartered_in", "participated_in", "directed_by", "published_by", "studied_at",
+    "married_to", "composed_by", "governed_by", "sponsored_by", "flows_into", "signed_by",
+    "performed_at", "manufactured_by", "designed_by", "hosted_by", "affiliated_with",
+]
+
+ATTRIBUTE_KEYS = ["population", "founded", "area", "height", "genre", "country", "language", "status"]
+
+PHASES = ["adjacency", "triples", "embeddings", "clustering", "refinement", "naming", "keywords"]
+
+
+def generate_synthetic_kg(num_entities: int, avg_degree: float = 4.0, intra_topic_ratio: float = 0.8,
+                          attr_ratio: float = 0.5, num_topics: int = None, seed: int = 42) -> nx.MultiDiGraph:
+    """
+    Build a MultiDiGraph in the KTBuilder layout (level-2 entities, level-1 attributes).
+
+    Degrees follow a Pareto (power-law) weight distribution; most edges stay inside
+    a latent topic so that the graph has recoverable community structure, and names
+    and relations are drawn from topic-specific vocabularies.
+    """
+    rng = np.random.default_rng(seed)
+    n = num_entities
+    num_topics = num_topics or max(10, n // 500)
+
+    topics = rng.integers(0, num_topics, size=n)
+    weights = rng.pareto(1.2, size=n) + 1.0
+
+    # 每个主题拥有固定的词根、实体类型与关系子集，使名称与三元组语义随主题聚集
+    topic_roots = rng.integers(0, len(SYLLABLES), size=(num_topics, 4))
+    topic_types = rng.integers(0, len(ENTITY_TYPES), size=(num_topics, 3))
+    topic_relations = rng.integers(0, len(RELATIONS), size=(num_topics, 5))
+
+    root_pick = topic_roots[topics, rng.integers(0, 4, size=n)]
+    mid_pick = rng.integers(0, len(SYLLABLES), size=n)
+    tail_pick = rng.integers(0, len(SYLLABLES), size=n)
+    type_pick = topic_types[topics, rng.integers(0, 3, size=n)]
+    names = [
+        f"{(SYLLABLES[a] + SYLLABLES[b] + SYLLABLES[c]).capitalize()} {ENTITY_TYPES[t]}"
+        for a, b, c, t in zip(root_pick.tolist(), mid_pick.tolist(), tail_pick.tolist(), type_pick.tolist())
+    ]
+
+    num_edges = int(n * avg_degree / 2)
+    global_cdf = np.cumsum(weights)
+    sources = np.searchsorted(global_cdf, rng.random(num_edges) * global_cdf[-1])
+
+    # 主题内目标节点：按主题排序后在对应区间的累计权重上做二分采样
+    order = np.argsort(topics, kind="stable")
+    sorted_cdf = np.cumsum(weights[order])
+    topic_start = np.searchsorted(topics[order], np.arange(num_topics), side="left")
+    topic_end = np.searchsorted(topics[order], np.arange(num_topics), side="right")
+    src_topic = topics[sources]
+    low = np.where(topic_start[src_topic] > 0, sorted_cdf[topic_start[src_topic] - 1], 0.0)
+    high = sorted_cdf[topic_end[src_topic] - 1]
+    intra_targets = order[np.searchsorted(sorted_cdf, low + rng.random(num_edges) * (high - low))]
+    global_targets = np.searchsorted(global_cdf, rng.random(num_edges) * global_cdf[-1])
+    targets = np.where(rng.random(num_edges) < intra_topic_ratio, intra_targets, global_targets)
+    targets = np.minimum(targets, n - 1)
+    relation_pick = topic_relations[src_topic, rng.integers(0, 5, size=num_edges)]
+
+    graph = nx.MultiDiGraph()
+    graph.add_nodes_from(
+        (f"entity_{i}", {"label": "entity", "level": 2, "properties": {"name": name, "chunk id": f"c{i // 20}"}})
+        for i, name in enumerate(names)
+    )
+    graph.add_edges_from(
+        (f"entity_{u}", f"entity_{v}", {"relation": RELATIONS[r]})
+        for u, v, r in zip(sources.tolist(), targets.tolist(), relation_pick.tolist())
+        if u != v
+    )
+
+    num_attrs = int(n * attr_ratio)
+    attr_owner = rng.integers(0, n, size=num_attrs)
+    attr_key = rng.integers(0, len(ATTRIBUTE_KEYS), size=num_attrs)
+    attr_value = rng.integers(1, 5000, size=num_attrs)
+    graph.add_nodes_from(
+        (f"attr_{j}", {"label": "attribute", "level": 1,
+                       "properties": {"name": f"{ATTRIBUTE_KEYS[k]}: {v}", "chunk id": f"c{o // 20}"}})
+        for j, (o, k, v) in enumerate(zip(attr_owner.tolist(), attr_key.tolist(), attr_value.tolist()))
+    )
+    graph.add_edges_from(
+        (f"entity_{o}", f"attr_{j}", {"relation": "has_attribute"}) for j, o in enumerate(attr_owner.tolist())
+    )
+    return graph
+
+
+class HashingEncoder:
+    """Deterministic bag-of-words hashing encoder standing in for SentenceTransformer"""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, texts, convert_to_tensor: bool = False, batch_size: int = 128, **kwargs):
+        import torch
+
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        rows, cols = [], []
+        for i, text in enumerate(texts):
+            for token in text.lower().replace("_", " ").split():
+                rows.append(i)
+                cols.append(zlib.crc32(token.encode("utf-8")) % self.dim)
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(embeddings, (rows, cols), 1.0)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-9
+        if single:
+            embeddings = embeddings[0]
+        return torch.from_numpy(embeddings) if convert_to_tensor else embeddings
+
+
+class StubLLMClient:
+    """Answers community naming prompts locally, optionally with a fixed latency"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def call_api(self, content: str) -> str:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        match = re.search(r"Communities data: (\[.*\])", content)
+        communities = json.loads(match.group(1)) if match else []
+        return json.dumps([
+            {"id": comm["id"], "name": f"{comm['center']} Community",
+             "summary": f"Community of {comm['size']} members around {comm['center']}"}
+            for comm in communities
+        ], ensure_ascii=False)
+
+
+def _peak_rss_mb() -> float:
+    # Linux 下 ru_maxrss 单位为 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def run_benchmark(num_entities: int, args) -> Dict:
+    from utils.tree_comm import FastTreeComm
+
+    result = {"num_entities": num_entities}
+
+    start = time.time()
+    graph = generate_synthetic_kg(num_entities, avg_degree=args.avg_degree, attr_ratio=args.attr_ratio,
+                                  seed=args.seed)
+    result["generate"] = time.time() - start
+    result["nodes"] = graph.number_of_nodes()
+    result["edges"] = graph.number_of_edges()
+    result["rss_after_generate_mb"] = _peak_rss_mb()
+
+    encoder = HashingEncoder(args.fake_embeddings) if args.fake_embeddings else args.embedding_model
+    llm_client = StubLLMClient(args.llm_latency)
+    tree_comm = FastTreeComm(graph, embedding_model=encoder, struct_weight=args.struct_weight,
+                             llm_client=llm_client)
+    result["rss_after_init_mb"] = _peak_rss_mb()
+
+    level2_nodes = [n for n, d in graph.nodes(data=True) if d["level"] == 2]
+    start = time.time()
+    comm_to_nodes = tree_comm.detect_communities(level2_nodes, max_total_communities=args.max_total_communities)
+    result["detect_communities"] = time.time() - start
+    result["communities"] = len(comm_to_nodes)
+    result["rss_after_detect_mb"] = _peak_rss_mb()
+
+    start = time.time()
+    tree_comm.create_super_nodes_with_keywords(comm_to_nodes, level=4)
+    result["create_super_nodes_with_keywords"] = time.time() - start
+    result["llm_calls"] = llm_client.calls
+    result["peak_rss_mb"] = _peak_rss_mb()
+
+    result["phases"] = {phase: round(tree_comm.phase_times.get(phase, 0.0), 3) for phase in PHASES}
+    return result
+
+
+def _run_in_subprocess(num_entities: int, args, queue):
+    try:
+        queue.put(run_benchmark(num_entities, args))
+    except Exception as e:
+        queue.put({"num_entities": num_entities, "error": f"{type(e).__name__}: {e}"})
+
+
+def _wait_for_result(process, queue, num_entities: int, poll_interval: float = 1.0) -> Dict:
+    """
+    Result of a benchmark subprocess. Polls the queue while the process is alive, so a child that
+    crashes or is OOM-killed without reporting yields a failed result with its exit code instead of
+    hanging the parent.
+    """
+    while True:
+        try:
+            return queue.get(timeout=poll_interval)
+        except Empty:
+            if process.is_alive():
+                continue
+        # the child may have reported right before exiting
+        try:
+            return queue.get(timeout=poll_interval)
+        except Empty:
+            return {
+                "num_entities": num_entities,
+                "exitcode": process.exitcode,
+                "error": f"benchmark process exited with code {process.exitcode} without a result",
+            }
+
+
+def format_report(results: List[Dict]) -> str:
+    header = ["entities", "edges", "comms"] + PHASES + ["total_s", "peak_mb"]
+    lines = [" | ".join(f"{h:>10}" for h in header)]
+    for res in results:
+        if "error" in res:
+            lines.append(f"{res['num_entities']:>10} | failed: {res['error']}")
+            continue
+        total = sum(res["phases"].values())
+        row = [res["num_entities"], res["edges"], res["communities"]]
+        row += [f"{res['phases'][phase]:.2f}" for phase in PHASES]
+        row += [f"{total:.2f}", f"{res['peak_rss_mb']:.0f}"]
+        lines.append(" | ".join(f"{str(v):>10}" for v in row))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FastTreeComm scaling benchmark on synthetic graphs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000],
+                        help="Numbers of level-2 entities to benchmark")
+    parser.add_argument("--avg-degree", type=float, default=4.0)
+    parser.add_argument("--attr-ratio", type=float, default=0.5, help="Attribute nodes per entity")
+    parser.add_argument("--struct-weight", type=float, default=0.3)
+    parser.add_argument("--max-total-communities", type=int, default=None)
+    parser.add_argument("--embedding-model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--fake-embeddings", type=int, default=0,
+                        help="Use a hashing encoder of this dimension instead of SentenceTransformer")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated seconds per naming call")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Optional path for the JSON results")
+    args = parser.parse_args()
+
+    # 每个规模在独立进程中运行，使峰值内存互不影响
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for size in args.sizes:
+        logger.info(f"Benchmarking FastTreeComm with {size} level-2 nodes")
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run_in_subprocess, args=(size, args, queue))
+        process.start()
+        result = _wait_for_result(process, queue, size)
+        process.join()
+        results.append(result)
+        logger.info(json.dumps(result))
+
+    print(format_report(results))
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Benchmark results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
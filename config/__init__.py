@@ -13,6 +13,7 @@ from .config_loader import (
     TreeCommConfig,
     RetrievalConfig,
     EmbeddingsConfig,
+    LLMConfig,
     OutputConfig,
     PerformanceConfig,
     EvaluationConfig,
@@ -29,6 +30,7 @@ __all__ = [
     "TreeCommConfig",
     "RetrievalConfig",
     "EmbeddingsConfig",
+    "LLMConfig",
     "OutputConfig",
     "PerformanceConfig",
     "EvaluationConfig",
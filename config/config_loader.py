@@ -35,6 +35,7 @@ class ConstructionConfig:
     datasets_no_chunk: list = None
     chunk_size: int = 1000
     overlap: int = 200
+    incremental: bool = False
     
     def __post_init__(self):
         if self.datasets_no_chunk is None:
@@ -47,6 +48,11 @@ class TreeCommConfig:
     struct_weight: float = 0.3
     enable_fast_mode: bool = True
     max_total_communities: int = 100
+    max_community_size: int = 100
+    refine_workers: int = 0  # 0 = use all CPU cores, 1 = serial
+    community_engine: str = "kmeans"  # "kmeans" (embedding), "louvain" or "leiden" (graph modularity)
+    modularity_resolution: float = 1.0
+    modularity_threshold: float = 1e-7
 
 @dataclass
 class FAISSConfig:
@@ -74,6 +80,10 @@ class RetrievalConfig:
     enable_high_recall: bool = True
     enable_caching: bool = True
     cache_dir: str = "retriever/faiss_cache_new"
+    graph_backend: str = "memory"  # "memory" (networkx graph in RAM) or "sqlite" (disk-resident store with FTS)
+    context_max_tokens: int = 6000  # token budget of the triples + chunks context in answer / IRCoT prompts
+    context_triple_share: float = 0.4  # part of the budget triples may use before chunks
+    context_chunk_overlap: float = 0.8  # drop a chunk whose words are this much covered by a selected chunk
     faiss: FAISSConfig = None
     agent: AgentConfig = None
     
@@ -91,6 +101,35 @@ class EmbeddingsConfig:
     batch_size: int = 32
     max_length: int = 512
 
+@dataclass
+class LLMConfig:
+    """LLM client configuration (one HTTP connection pool shared by all LLMCompletionCall instances)"""
+    max_connections: int = 64
+    max_keepalive_connections: int = 32
+    keepalive_expiry: float = 60.0
+    timeout: float = 120.0
+    connect_timeout: float = 10.0
+    max_retries: int = 5
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    call_deadline: float = 300.0  # seconds one call_api may take across all retries
+    enable_cache: bool = False  # cache responses by (model, prompt, temperature)
+    cache_dir: str = "output/llm_cache"
+    cache_memory_entries: int = 1024
+    cache_max_entries: int = 100000
+    cache_ttl: float = 0  # seconds, 0 = entries never expire
+    coalesce_requests: bool = True  # concurrent identical requests share one upstream call
+    balancing: str = "least_outstanding"  # endpoint choice with LLM_ENDPOINTS: "least_outstanding" or "latency"
+    circuit_failure_threshold: int = 5  # consecutive failures that eject an endpoint
+    circuit_cooldown: float = 30.0  # seconds before an ejected endpoint is probed again
+    enable_hedging: bool = False  # allow call sites that pass hedge=True to send a duplicate of slow requests
+    hedge_percentile: float = 95.0  # hedge after this percentile of recent latencies
+    hedge_min_delay: float = 1.0  # seconds, lower bound of the hedge delay
+    hedge_max_rate: float = 0.1  # at most this fraction of hedgeable requests are duplicated
+    record_mode: str = "off"  # "off", "record" (log all LLM traffic) or "replay" (serve it offline)
+    record_path: str = "output/llm_recordings/llm_traffic.jsonl"
+    replay_latency_scale: float = 0.0  # replay with recorded latency * scale, 0 = instant
+
 @dataclass
 class NLPConfig:
     """NLP configuration"""
@@ -106,6 +145,7 @@ class OutputConfig:
     logs_dir: str = "output/logs"
     save_intermediate_results: bool = True
     save_chunk_details: bool = True
+    graph_format: str = "normalized"  # "normalized" (node + edge tables) or "legacy" (relationship records)
 
 @dataclass
 class PerformanceConfig:
@@ -148,6 +188,7 @@ class ConfigManager:
         self.retrieval: Optional[RetrievalConfig] = None
         self.embeddings: Optional[EmbeddingsConfig] = None
         self.nlp: Optional[NLPConfig] = None
+        self.llm: Optional[LLMConfig] = None
         self.prompts: Dict[str, Any] = {}
         self.output: Optional[OutputConfig] = None
         self.performance: Optional[PerformanceConfig] = None
@@ -207,6 +248,9 @@ class ConfigManager:
         nlp = self.config_data.get("nlp", {})
         self.nlp = NLPConfig(**nlp)
         
+        llm_data = self.config_data.get("llm", {})
+        self.llm = LLMConfig(**llm_data)
+        
         self.prompts = self.config_data.get("prompts", {})
         
         output_data = self.config_data.get("output", {})
@@ -232,6 +276,18 @@ class ConfigManager:
         
         if self.construction.mode not in ["agent", "basic"]:
             raise ValueError(f"Invalid construction mode: {self.construction.mode}")
+
+        valid_engines = ["kmeans", "louvain", "leiden"]
+        if self.tree_comm.community_engine not in valid_engines:
+            raise ValueError(f"Invalid community engine: {self.tree_comm.community_engine}. Must be one of {valid_engines}")
+
+        valid_graph_formats = ["normalized", "legacy"]
+        if self.output.graph_format not in valid_graph_formats:
+            raise ValueError(f"Invalid graph format: {self.output.graph_format}. Must be one of {valid_graph_formats}")
+        
+        valid_graph_backends = ["memory", "sqlite"]
+        if self.retrieval.graph_backend not in valid_graph_backends:
+            raise ValueError(f"Invalid graph backend: {self.retrieval.graph_backend}. Must be one of {valid_graph_backends}")
         
         # Validate numerical parameters
         if self.retrieval.top_k <= 0:
@@ -239,6 +295,33 @@ class ConfigManager:
         
         if self.tree_comm.struct_weight < 0 or self.tree_comm.struct_weight > 1:
             raise ValueError("struct_weight must be between 0 and 1")
+        
+        if self.retrieval.context_max_tokens <= 0:
+            raise ValueError("retrieval.context_max_tokens must be positive")
+        if not 0 <= self.retrieval.context_triple_share <= 1 or not 0 < self.retrieval.context_chunk_overlap <= 1:
+            raise ValueError("retrieval.context_triple_share must be in [0, 1] and context_chunk_overlap in (0, 1]")
+        if self.llm.max_connections <= 0:
+            raise ValueError("llm.max_connections must be positive")
+        if not 0 <= self.llm.max_keepalive_connections <= self.llm.max_connections:
+            raise ValueError("llm.max_keepalive_connections must be between 0 and llm.max_connections")
+        if self.llm.max_retries < 0:
+            raise ValueError("llm.max_retries must be non-negative")
+        if self.llm.call_deadline <= 0:
+            raise ValueError("llm.call_deadline must be positive")
+        valid_balancing = ["least_outstanding", "latency"]
+        if self.llm.balancing not in valid_balancing:
+            raise ValueError(f"Invalid llm.balancing: {self.llm.balancing}. Must be one of {valid_balancing}")
+        if self.llm.circuit_failure_threshold <= 0 or self.llm.circuit_cooldown < 0:
+            raise ValueError("llm.circuit_failure_threshold must be positive and circuit_cooldown non-negative")
+        if not 0 < self.llm.hedge_percentile < 100 or self.llm.hedge_min_delay < 0 or not 0 <= self.llm.hedge_max_rate <= 1:
+            raise ValueError("llm.hedge_percentile must be in (0, 100), hedge_min_delay non-negative and hedge_max_rate in [0, 1]")
+        valid_record_modes = ["off", "record", "replay"]
+        if self.llm.record_mode not in valid_record_modes:
+            raise ValueError(f"Invalid llm.record_mode: {self.llm.record_mode}. Must be one of {valid_record_modes}")
+        if self.llm.replay_latency_scale < 0:
+            raise ValueError("llm.replay_latency_scale must be non-negative")
+        if self.llm.cache_memory_entries < 0 or self.llm.cache_max_entries <= 0 or self.llm.cache_ttl < 0:
+            raise ValueError("llm cache sizes must be positive and cache_ttl non-negative")
     
     def get_dataset_config(self, dataset_name: str) -> DatasetConfig:
         """Get configuration for a specific dataset."""
@@ -289,6 +372,7 @@ class ConfigManager:
             "tree_comm": asdict(self.tree_comm),
             "retrieval": asdict(self.retrieval),
             "embeddings": asdict(self.embeddings),
+            "llm": asdict(self.llm),
             "prompts": self.prompts,
             "output": asdict(self.output),
             "performance": asdict(self.performance),
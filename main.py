@@ -13,6 +13,8 @@ from typing import List
 
 from models.constructor import kt_gen as constructor
 from models.retriever import agentic_decomposer as decomposer, enhanced_kt_retriever as retriever
+from utils import call_llm_api
+from utils.context_packer import ContextPacker
 from utils.eval import Eval
 from config import get_config, ConfigManager
 from utils.logger import logger
@@ -25,34 +27,6 @@ def tuples_to_string(rows, sep=", ", line_sep="\n", wrap_brackets=True):
     return line_sep.join(fmt(t) for t in rows)
 
 
-def rerank_chunks_by_keywords(chunks: List[str], question: str, top_k: int) -> List[str]:
-    """
-    Rerank chunks by keyword matching with the question
-    
-    Args:
-        chunks: List of chunk contents
-        question: Original question
-        top_k: Number of top chunks to return
-        
-    Returns:
-        Reranked list of chunks
-    """
-    if len(chunks) <= top_k:
-        return chunks
-    
-    question_keywords = set(question.lower().split())
-    scored_chunks = []
-    
-    for chunk in chunks:
-        chunk_lower = chunk.lower()
-        score = sum(1 for keyword in question_keywords if keyword in chunk_lower)
-        scored_chunks.append((chunk, score))
-    
-    scored_chunks.sort(key=lambda x: x[1], reverse=True)
-    
-    return [scored_chunk[0] for scored_chunk in scored_chunks[:top_k]]
-
-
 def deduplicate_triples(triples: List[str]) -> List[str]:
 
     return list(set(triples))
@@ -63,6 +37,41 @@ def merge_chunk_contents(chunk_ids, chunk_contents_dict):
     return [chunk_contents_dict.get(chunk_id, f"[Missing content for chunk {chunk_id}]") for chunk_id in chunk_ids]
 
 
+def pack_context(question, triples, chunk_ids, chunk_contents_dict):
+    """
+    Select the triples and chunks that go into an answer / IRCoT prompt within the
+    retrieval.context_max_tokens budget, most relevant first (see ContextPacker).
+    """
+    chunk_ids = list(dict.fromkeys(chunk_ids))
+    chunks = dict(zip(chunk_ids, merge_chunk_contents(chunk_ids, chunk_contents_dict)))
+    triples = deduplicate_triples(list(triples))
+    packed = ContextPacker.from_config(config).pack(question, triples, chunks)
+    logger.info(f"Packed context: {len(packed.triples)}/{len(triples)} triples, {len(packed.chunks)}/{len(chunks)} chunks "
+                f"({packed.redundant_chunks} redundant), {packed.tokens} tokens")
+    return packed
+
+
+EMPTY_ANSWER_RETRIES = 3
+
+
+def generate_answer_with_retry(kt_retriever, prompt, what, error_answer):
+    """
+    generate_answer, asking again (at most EMPTY_ANSWER_RETRIES times) when the model returns an empty
+    completion. Transient transport / status errors are already retried with backoff inside
+    LLMCompletionCall; a call that still fails, or only ever answers empty, yields error_answer.
+    """
+    for attempt in range(1, EMPTY_ANSWER_RETRIES + 1):
+        try:
+            answer = kt_retriever.generate_answer(prompt)
+        except Exception as e:
+            logger.error(f"Error generating {what}: {str(e)}")
+            return error_answer
+        if answer and answer.strip():
+            return answer
+        logger.warning(f"Empty {what} (attempt {attempt}/{EMPTY_ANSWER_RETRIES})")
+    return error_answer
+
+
 def parse_arguments():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description="Youtu-GraphRAG Framework")
@@ -205,8 +214,19 @@ def retrieval(datasets):
         elif config.triggers.mode == "agent":
             agent_retrieval(graphq, kt_retriever, qa_pairs, dataset_config.schema_path)
 
+        response_cache = call_llm_api.get_response_cache()
+        if response_cache is not None:
+            logger.info(f"LLM response cache: {response_cache.stats()}")
+        logger.info(f"LLM request coalescing: {call_llm_api.get_coalescing_stats()}")
+        for endpoint_stats in call_llm_api.get_endpoint_pool().stats():
+            logger.info(f"LLM endpoint: {endpoint_stats}")
+        recorder = call_llm_api.get_recorder()
+        if recorder is not None:
+            logger.info(f"LLM traffic {recorder.mode}: {recorder.stats()}")
+
 
-def initial_question_decomposition(graphq, kt_retriever, question, schema_path):
+def initial_question_decomposition(graphq, kt_retriever, question, schema_path, decomposition_result=None,
+                                   generate_initial_answer=True):
     """
     Process a single question using noagent mode and return structured results.
     
@@ -215,9 +235,12 @@ def initial_question_decomposition(graphq, kt_retriever, question, schema_path):
         kt_retriever: KTRetriever instance
         question: The question to process
         schema_path: Path to schema file
+        decomposition_result: Decomposition already obtained by the caller (e.g. GraphQ.decompose_async),
+            graphq.decompose is called when None
+        generate_initial_answer: Set False when the caller generates the initial answer itself
         
     Returns:
-        dict: Contains decomposition_result, retrieval_results, and initial_answer
+        dict: Contains decomposition_result, retrieval_results, and initial_answer (None when not generated)
     """
     all_triples = set()
     all_chunk_ids = set()
@@ -226,7 +249,8 @@ def initial_question_decomposition(graphq, kt_retriever, question, schema_path):
     total_time = 0
 
     try:
-        decomposition_result = graphq.decompose(question, schema_path)
+        if decomposition_result is None:
+            decomposition_result = graphq.decompose(question, schema_path)
         sub_questions = decomposition_result.get("sub_questions", [])
         involved_types = decomposition_result.get("involved_types", {})
         logger.info(f"Original question: {question}")
@@ -293,29 +317,14 @@ def initial_question_decomposition(graphq, kt_retriever, question, schema_path):
                 all_sub_question_results.append(sub_result)
                 continue
             
-    dedup_triples = deduplicate_triples(list(all_triples))
-    dedup_chunk_ids = list(set(all_chunk_ids))
-    dedup_chunk_contents = merge_chunk_contents(dedup_chunk_ids, all_chunk_contents)
+    packed = pack_context(question, all_triples, all_chunk_ids, all_chunk_contents)
+    dedup_triples, dedup_chunk_ids, dedup_chunk_contents = packed.triples, packed.chunk_ids, packed.chunks
 
     if not dedup_triples and not dedup_chunk_contents:
         logger.warning(f"No triples or chunks retrieved for question: {question}")
         dedup_triples = ["No relevant information found"]
         dedup_chunk_contents = ["No relevant chunks found"]
 
-    if len(dedup_triples) > 20: 
-        question_keywords = set(question.lower().split())
-        scored_triples = []
-        for triple in dedup_triples:
-            triple_lower = triple.lower()
-            score = sum(1 for keyword in question_keywords if keyword in triple_lower)
-            scored_triples.append((triple, score))
-
-        scored_triples.sort(key=lambda x: x[1], reverse=True)
-        dedup_triples = [triple for triple, score in scored_triples[:config.retrieval.top_k_filter]]
-
-    if len(dedup_chunk_contents) > config.retrieval.top_k_filter:
-        dedup_chunk_contents = rerank_chunks_by_keywords(dedup_chunk_contents, question, config.retrieval.top_k_filter)
-
     context = "=== Triples ===\n" + "\n".join(dedup_triples)
     context += "\n=== Chunks ===\n" + "\n".join(dedup_chunk_contents)
 
@@ -324,18 +333,9 @@ def initial_question_decomposition(graphq, kt_retriever, question, schema_path):
 
     prompt = kt_retriever.generate_prompt(question, context)
 
-    max_retries = 20
     initial_answer = None
-    for retry in range(max_retries):
-        try:
-            initial_answer = kt_retriever.generate_answer(prompt)
-            if initial_answer and initial_answer.strip():
-                break
-        except Exception as e:
-            logger.error(f"Error generating answer (attempt {retry + 1}): {str(e)}")
-            if retry == max_retries - 1:
-                initial_answer = "Error: Unable to generate answer"
-            time.sleep(1)
+    if generate_initial_answer:
+        initial_answer = generate_answer_with_retry(kt_retriever, prompt, "answer", "Error: Unable to generate answer")
 
     return {
         'decomposition_result': decomposition_result,
@@ -415,12 +415,10 @@ def agent_retrieval(graphq, kt_retriever, qa_pairs, schema_path):
         while step <= max_steps:
             logger.info(f"📝 IRCoT Step {step}/{max_steps}")
             
-            dedup_triples = deduplicate_triples(list(all_triples))
-            dedup_chunk_ids = list(set(all_chunk_ids))
-            dedup_chunk_contents = merge_chunk_contents(dedup_chunk_ids, all_chunk_contents)
-            
-            context = "=== Triples ===\n" + "\n".join(dedup_triples)
-            context += "\n=== Chunks ===\n" + "\n".join(dedup_chunk_contents)
+            # the knowledge base grows every step; the packer keeps the prompt within the token budget
+            packed = pack_context(f"{qa['question']} {current_query}", all_triples, all_chunk_ids, all_chunk_contents)
+            dedup_triples, dedup_chunk_contents = packed.triples, packed.chunks
+            context = packed.render()
             
             ircot_prompt = f"""
                             You are an expert knowledge assistant using iterative retrieval with chain-of-thought reasoning.
@@ -445,18 +443,8 @@ def agent_retrieval(graphq, kt_retriever, qa_pairs, schema_path):
                             
                             Your reasoning:
                             """
-            max_retries = 20
-            response = None
-            for retry in range(max_retries):
-                try:
-                    response = kt_retriever.generate_answer(ircot_prompt)
-                    if response and response.strip():
-                        break
-                except Exception as e:
-                    logger.error(f"Error generating IRCoT response (attempt {retry + 1}): {str(e)}")
-                    if retry == max_retries - 1:
-                        response = "Error: Unable to generate reasoning"
-                    time.sleep(1)
+            response = generate_answer_with_retry(kt_retriever, ircot_prompt, "IRCoT response",
+                                                  "Error: Unable to generate reasoning")
             
             thoughts.append(response)
             
@@ -512,23 +500,11 @@ def agent_retrieval(graphq, kt_retriever, qa_pairs, schema_path):
             
             step += 1
         
-        final_context = "=== Final Triples ===\n" + "\n".join(deduplicate_triples(list(all_triples)))
-        final_context += "\n=== Final Chunks ===\n" + "\n".join(merge_chunk_contents(list(set(all_chunk_ids)), all_chunk_contents))
+        final_context = pack_context(qa["question"], all_triples, all_chunk_ids, all_chunk_contents).render("Final ")
         
         final_prompt = kt_retriever.generate_prompt(qa["question"], final_context)
         
-        max_retries = 20
-        answer = None
-        for retry in range(max_retries):
-            try:
-                answer = kt_retriever.generate_answer(final_prompt)
-                if answer and answer.strip():
-                    break
-            except Exception as e:
-                logger.error(f"Error generating final answer (attempt {retry + 1}): {str(e)}")
-                if retry == max_retries - 1:
-                    answer = "Error: Unable to generate answer"
-                time.sleep(1)
+        answer = generate_answer_with_retry(kt_retriever, final_prompt, "final answer", "Error: Unable to generate answer")
         
         logger.info(f"========== Original Question: {qa['question']} ==========") 
         logger.info(f"Noagent Initial Answer: {initial_result['initial_answer']}")
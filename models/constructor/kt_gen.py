@@ -3,7 +3,7 @@ import os
 import threading
 import time
 from concurrent import futures
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Tuple, Union
 
 import nanoid
 import networkx as nx
@@ -30,6 +30,9 @@ class KTBuilder:
         self.llm_client = call_llm_api.LLMCompletionCall()
         self.all_chunks = {}
         self.mode = mode or config.construction.mode
+        # (entity node id, attribute text) -> attribute node id, and chunk provenance per attribute node
+        self.attribute_nodes: Dict[Tuple[str, str], str] = {}
+        self.attribute_chunks: Dict[str, List] = {}
 
     def load_schema(self, schema_path) -> Dict[str, Any]:
         try:
@@ -195,15 +198,47 @@ class KTBuilder:
         except Exception as e:
             return None
     
+    def _find_or_create_attribute(self, entity_node_id: str, attr: str, chunk_id: int) -> Tuple[str, bool]:
+        """
+        Attribute node of (entity, attribute text), recording chunk_id in its provenance.
+        Returns (attribute node id, created). Callers must hold self.lock.
+        """
+        key = (entity_node_id, str(attr).strip())
+        attr_node_id = self.attribute_nodes.get(key)
+        if attr_node_id is not None:
+            chunks = self.attribute_chunks.setdefault(attr_node_id, [])
+            if chunk_id not in chunks:
+                chunks.append(chunk_id)
+            return attr_node_id, False
+
+        attr_node_id = f"attr_{self.node_counter}"
+        self.node_counter += 1
+        self.attribute_nodes[key] = attr_node_id
+        self.attribute_chunks[attr_node_id] = [chunk_id]
+        return attr_node_id, True
+
+    def _apply_attribute_provenance(self):
+        """Store the chunk provenance of attribute nodes mentioned in several chunks as "chunk ids"."""
+        for attr_node_id, chunks in self.attribute_chunks.items():
+            if len(chunks) > 1 and attr_node_id in self.graph:
+                self.graph.nodes[attr_node_id]["properties"]["chunk ids"] = list(chunks)
+
     def _process_attributes(self, extracted_attr: dict, chunk_id: int, entity_types: dict = None) -> tuple[list, list]:
         """Process extracted attributes and return nodes and edges to add."""
         nodes_to_add = []
         edges_to_add = []
         
         for entity, attributes in extracted_attr.items():
+            entity_node_id = None
             for attr in attributes:
-                # Create attribute node
-                attr_node_id = f"attr_{self.node_counter}"
+                if entity_node_id is None:
+                    # resolved on the first attribute: an entity without attributes adds no node
+                    entity_type = entity_types.get(entity) if entity_types else None
+                    entity_node_id = self._find_or_create_entity(entity, chunk_id, nodes_to_add, entity_type)
+                with self.lock:
+                    attr_node_id, created = self._find_or_create_attribute(entity_node_id, attr, chunk_id)
+                if not created:
+                    continue
                 nodes_to_add.append((
                     attr_node_id,
                     {
@@ -212,10 +247,6 @@ class KTBuilder:
                         "level": 1,
                     }
                 ))
-                self.node_counter += 1
-
-                entity_type = entity_types.get(entity) if entity_types else None
-                entity_node_id = self._find_or_create_entity(entity, chunk_id, nodes_to_add, entity_type)
                 edges_to_add.append((entity_node_id, attr_node_id, "has_attribute"))
         
         return nodes_to_add, edges_to_add
@@ -300,9 +331,15 @@ class KTBuilder:
     def _process_attributes_agent(self, extracted_attr: dict, chunk_id: int, entity_types: dict = None):
         """Process extracted attributes in agent mode (direct graph operations)."""
         for entity, attributes in extracted_attr.items():
+            entity_node_id = None
             for attr in attributes:
-                # Create attribute node
-                attr_node_id = f"attr_{self.node_counter}"
+                if entity_node_id is None:
+                    # resolved on the first attribute: an entity without attributes adds no node
+                    entity_type = entity_types.get(entity) if entity_types else None
+                    entity_node_id = self._find_or_create_entity_direct(entity, chunk_id, entity_type)
+                attr_node_id, created = self._find_or_create_attribute(entity_node_id, attr, chunk_id)
+                if not created:
+                    continue
                 self.graph.add_node(
                     attr_node_id,
                     label="attribute",
@@ -312,10 +349,6 @@ class KTBuilder:
                     },
                     level=1,
                 )
-                self.node_counter += 1
-
-                entity_type = entity_types.get(entity) if entity_types else None
-                entity_node_id = self._find_or_create_entity_direct(entity, chunk_id, entity_type)
                 self.graph.add_edge(entity_node_id, attr_node_id, relation="has_attribute")
     
     def _process_triples_agent(self, extracted_triples: list, chunk_id: int, entity_types: dict = None):
@@ -420,7 +453,7 @@ class KTBuilder:
         except Exception as e:
             logger.error(f"Failed to update schema for dataset '{self.dataset_name}': {type(e).__name__}: {e}")
 
-    def process_level4(self):
+    def process_level4(self, incremental: bool = False):
         """Process communities using Tree-Comm algorithm"""
         level2_nodes = [n for n, d in self.graph.nodes(data=True) if d['level'] == 2]
         start_comm = time.time()
@@ -429,6 +462,16 @@ class KTBuilder:
             embedding_model=self.config.tree_comm.embedding_model,
             struct_weight=self.config.tree_comm.struct_weight,
         )
+
+        if incremental:
+            # only entities that are not yet a member of any community are assigned
+            assigned_nodes = {u for u, _, d in self.graph.edges(data=True) if d.get('relation') == 'member_of'}
+            new_nodes = [n for n in level2_nodes if n not in assigned_nodes]
+            _tree_comm.assign_new_entities(new_nodes, level=4)
+            end_comm = time.time()
+            logger.info(f"Incremental Community Indexing Time: {end_comm - start_comm}s ({len(new_nodes)} new nodes)")
+            return
+
         comm_to_nodes = _tree_comm.detect_communities(level2_nodes)
 
         # create super nodes (level 4 communities)
@@ -438,6 +481,33 @@ class KTBuilder:
         # self._connect_keywords_to_communities()
         end_comm = time.time()
         logger.info(f"Community Indexing Time: {end_comm - start_comm}s")
+        logger.info("Community phase times: " +
+                    ", ".join(f"{phase}={seconds:.2f}s" for phase, seconds in _tree_comm.phase_times.items()))
+
+    def load_existing_graph(self, json_path: str) -> bool:
+        """Load a previously built graph so that new documents are merged into it."""
+        if not os.path.exists(json_path):
+            logger.warning(f"No existing graph at {json_path}, building from scratch")
+            return False
+
+        self.graph = graph_processor.load_graph_from_json(json_path)
+        used_ids = [
+            int(n.rsplit("_", 1)[1]) for n in self.graph.nodes()
+            if isinstance(n, str) and "_" in n and n.rsplit("_", 1)[1].isdigit()
+        ]
+        self.node_counter = max(used_ids) + 1 if used_ids else self.graph.number_of_nodes()
+
+        for u, v, data in self.graph.edges(data=True):
+            if data.get("relation") != "has_attribute" or self.graph.nodes[v].get("label") != "attribute":
+                continue
+            properties = self.graph.nodes[v]["properties"]
+            key = (u, str(properties.get("name", "")).strip())
+            if key not in self.attribute_nodes:
+                self.attribute_nodes[key] = v
+                self.attribute_chunks[v] = list(properties.get("chunk ids") or [properties.get("chunk id")])
+        logger.info(f"Loaded existing graph from {json_path}: {self.graph.number_of_nodes()} nodes, "
+                    f"{self.graph.number_of_edges()} edges")
+        return True
     
     def _connect_keywords_to_communities(self):
         """Connect relevant keywords to communities"""
@@ -482,7 +552,7 @@ class KTBuilder:
             error_msg = f"Error processing document: {type(e).__name__}: {str(e)}"
             raise Exception(error_msg) from e
 
-    def process_all_documents(self, documents: List[Dict[str, Any]]) -> None:
+    def process_all_documents(self, documents: List[Dict[str, Any]], incremental: bool = False) -> None:
         """Process all documents with high concurrency and pass results to process_level4."""
 
         max_workers = min(self.config.construction.max_workers, (os.cpu_count() or 1) + 4)
@@ -529,8 +599,9 @@ class KTBuilder:
         
         logger.info(f"🚀🚀🚀🚀 {'Processing Level 3 and 4':^20} 🚀🚀🚀🚀")
         logger.info(f"{'➖' * 20}")
+        self._apply_attribute_provenance()
         self.triple_deduplicate()
-        self.process_level4()
+        self.process_level4(incremental=incremental)
 
        
 
@@ -549,51 +620,51 @@ class KTBuilder:
                 new_graph.add_edge(u, v, **data)
         self.graph = new_graph
 
-    def format_output(self) -> List[Dict[str, Any]]:
-        """convert graph to specified output format"""
-        output = []
-
-        for u, v, data in self.graph.edges(data=True):
-            u_data = self.graph.nodes[u]
-            v_data = self.graph.nodes[v]
-
-            relationship = {
-                "start_node": {
-                    "label": u_data["label"],
-                    "properties": u_data["properties"],
-                },
-                "relation": data["relation"],
-                "end_node": {
-                    "label": v_data["label"],
-                    "properties": v_data["properties"],
-                },
-            }
-            output.append(relationship)
-
-        return output
+    def format_output(self, graph_format: str = "normalized") -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """convert graph to specified output format ("normalized" node/edge tables or "legacy" relationship records)"""
+        if graph_format == "legacy":
+            return graph_processor.graph_to_relationships(self.graph)
+        return graph_processor.graph_to_normalized(self.graph)
     
     def save_graphml(self, output_path: str):
         graph_processor.save_graph(self.graph, output_path)
     
-    def build_knowledge_graph(self, corpus):
+    def build_knowledge_graph(self, corpus, incremental: bool = None):
         logger.info(f"========{'Start Building':^20}========")
         logger.info(f"{'➖' * 30}")
+
+        if incremental is None:
+            incremental = self.config.construction.incremental
+        json_output_path = f"output/graphs/{self.dataset_name}_new.json"
+        if incremental:
+            incremental = self.load_existing_graph(json_output_path)
         
         with open(corpus, 'r', encoding='utf-8') as f:
             documents = json_repair.load(f)
         
-        self.process_all_documents(documents)
+        self.process_all_documents(documents, incremental=incremental)
         
         logger.info(f"All Process finished, token cost: {self.token_len}")
         
         self.save_chunks_to_file()
         
-        output = self.format_output()
+        output = self.format_output(self.config.output.graph_format)
         
-        json_output_path = f"output/graphs/{self.dataset_name}_new.json"
         os.makedirs("output/graphs", exist_ok=True)
         with open(json_output_path, 'w', encoding='utf-8') as f:
             json.dump(output, f, ensure_ascii=False, indent=2)
         logger.info(f"Graph saved to {json_output_path}")
+
+        try:
+            # snapshot of the graph exactly as the retriever loads it from the JSON
+            snapshot_path = graph_processor.get_snapshot_path(json_output_path)
+            graph_processor.save_graph_snapshot(
+                graph_processor.build_graph_from_data(output),
+                snapshot_path,
+                graph_processor.compute_file_hash(json_output_path),
+            )
+            logger.info(f"Graph snapshot saved to {snapshot_path}")
+        except Exception as e:
+            logger.warning(f"Failed to save graph snapshot: {type(e).__name__}: {e}")
         
         return output
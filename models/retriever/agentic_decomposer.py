@@ -7,7 +7,7 @@ except ImportError:
     get_config = None
 
 class GraphQ:
-    def __init__(self, dataset_name, config=None):
+    def __init__(self, dataset_name, config=None, hedge=False):
         if config is None and get_config is not None:
             try:
                 self.config = get_config()
@@ -17,6 +17,8 @@ class GraphQ:
             self.config = config
         self.llm_client = call_llm_api.LLMCompletionCall()
         self.dataset_name = dataset_name
+        # latency-critical (interactive) callers hedge slow decomposition calls
+        self.hedge = hedge
             
     def read_schema(self, schema_path: str) -> str:
         with open(schema_path, "r") as f:
@@ -101,7 +103,17 @@ class GraphQ:
     def decompose(self, question: str, schema_path: str) -> dict:
         schema = self.read_schema(schema_path)
         prompt = self.prompt_format(schema, question)
-        response = self.llm_client.call_api(prompt)
+        response = self.llm_client.call_api(prompt, hedge=self.hedge)
+        return self._parse_decomposition(response)
+
+    async def decompose_async(self, question: str, schema_path: str) -> dict:
+        """decompose for event-loop callers (awaits the async LLM client instead of blocking)"""
+        schema = self.read_schema(schema_path)
+        prompt = self.prompt_format(schema, question)
+        response = await self.llm_client.call_api_async(prompt, hedge=self.hedge)
+        return self._parse_decomposition(response)
+
+    def _parse_decomposition(self, response: str) -> dict:
         content = json_repair.loads(response)
         
         # Ensure backward compatibility - if old format, convert to new format
@@ -2,7 +2,6 @@ import os
 import pickle
 import threading
 import time
-from functools import lru_cache
 from typing import Dict, List, Optional, Set, Tuple
 
 import faiss
@@ -15,6 +14,10 @@ from sentence_transformers import SentenceTransformer
 
 from models.retriever.faiss_filter import DualFAISSRetriever
 from utils import graph_processor
+from utils.compact_graph import CompactGraph
+from utils.node_table import NodeTable
+from utils.relation_vocab import RelationVocab
+from utils.sqlite_graph import SQLiteGraph, load_sqlite_graph, read_chunk_file
 from utils import call_llm_api
 from utils.logger import logger
 
@@ -56,7 +59,19 @@ class KTRetriever:
             mode = mode if mode != "agent" else config.triggers.mode
             qa_encoder = qa_encoder or SentenceTransformer(config.embeddings.model_name)
         
-        self.graph = graph_processor.load_graph_from_json(json_path)
+        self.graph_backend = config.retrieval.graph_backend if config else "memory"
+        chunk_file = f"output/chunks/{dataset}.txt"
+        if self.graph_backend == "sqlite":
+            # 图和chunk文本留在磁盘上，只有CSR拓扑数组常驻内存
+            self.graph = load_sqlite_graph(json_path, chunk_file=chunk_file)
+        else:
+            self.graph = graph_processor.load_graph_with_snapshot(json_path)
+        self.relation_vocab = RelationVocab.from_graph(self.graph)
+        if not isinstance(self.graph, SQLiteGraph):
+            self.relation_vocab.canonicalize(self.graph)
+        self.compact_graph = CompactGraph(self.graph, relation_vocab=self.relation_vocab)
+        self.node_table = NodeTable(self.graph, self.compact_graph.node_index,
+                                    store_text=not isinstance(self.graph, SQLiteGraph))
         self.qa_encoder = qa_encoder or SentenceTransformer('all-MiniLM-L6-v2')
 
         self.llm_client = call_llm_api.LLMCompletionCall()
@@ -80,7 +95,7 @@ class KTRetriever:
 
         self.nlp = spacy.load(config.nlp.spacy_model)
         
-        self.faiss_retriever = DualFAISSRetriever(dataset, self.graph, model_name=config.embeddings.model_name, cache_dir=cache_dir, device=self.device)
+        self.faiss_retriever = DualFAISSRetriever(dataset, self.graph, model_name=config.embeddings.model_name, cache_dir=cache_dir, device=self.device, compact_graph=self.compact_graph)
         
         self.node_embedding_cache = {}       
         self.triple_embedding_cache = {}     
@@ -103,18 +118,11 @@ class KTRetriever:
         self.precompute_lock = threading.Lock()
         
         self.chunk2id = {}
-        chunk_file = f"output/chunks/{self.dataset}.txt"
-        if os.path.exists(chunk_file):
+        if isinstance(self.graph, SQLiteGraph):
+            self.chunk2id = self.graph.chunks
+        elif os.path.exists(chunk_file):
             try:
-                with open(chunk_file, "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and "\t" in line:
-                            parts = line.split("\t", 1)
-                            if len(parts) == 2 and parts[0].startswith("id: ") and parts[1].startswith("Chunk: "):
-                                chunk_id = parts[0][4:] 
-                                chunk_text = parts[1][7:]  
-                                self.chunk2id[chunk_id] = chunk_text
+                self.chunk2id = dict(read_chunk_file(chunk_file))
                 logger.info(f"Loaded {len(self.chunk2id)} chunks from {chunk_file}")
             except Exception as e:
                 logger.error(f"Error loading chunks from {chunk_file}: {e}")
@@ -123,13 +131,13 @@ class KTRetriever:
         self._node_text_index = None
         self.use_exact_keyword_matching = True  # Set to False for original substring matching
         self.enable_performance_optimizations = True
-        self._node_text_cache = {}
         
         if self.enable_performance_optimizations:
             try:
                 cache_loaded = self._load_node_embedding_cache()
-                self._precompute_node_texts()
-                self._build_node_text_index()
+                if not isinstance(self.graph, SQLiteGraph):
+                    # sqlite后端用FTS5做关键词检索，不在内存中建立全量文本索引
+                    self._build_node_text_index()
                 self._precompute_chunk_embeddings()
                 
                 if cache_loaded:
@@ -157,115 +165,6 @@ class KTRetriever:
                 ).float().to(self.device)
         return query_embed
 
-    def _precompute_node_texts(self):
-        """
-        Precompute node texts for all nodes to avoid repeated text extraction.
-        This is called during initialization to build the text cache.
-        """
-        if self._load_node_text_cache():
-            return
-        
-        start_time = time.time()
-        
-        all_nodes = list(self.graph.nodes())
-        total_nodes = len(all_nodes)
-        processed_nodes = 0
-        
-        for node in all_nodes:
-            try:
-                node_text = self._get_node_text(node)
-                if node_text and not node_text.startswith('[Error'):
-                    self._node_text_cache[node] = node_text
-                processed_nodes += 1
-                
-            except Exception as e:
-                continue
-        
-        end_time = time.time()
-        logger.info(f"Node texts precomputed for {len(self._node_text_cache)} nodes in {end_time - start_time:.2f} seconds")
-        
-        try:
-            self._save_node_text_cache()
-        except Exception as e:
-            logger.warning(f"Failed to save node text cache: {type(e).__name__}: {e}")
-
-    def _save_node_text_cache(self):
-        """Save node text cache to disk"""
-        cache_path = f"{self.cache_dir}/{self.dataset}/node_text_cache.pkl"
-        try:
-            if not self._node_text_cache:
-                return False
-                
-            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
-            
-            with open(cache_path, 'wb') as f:
-                pickle.dump(self._node_text_cache, f)
-            
-            file_size = os.path.getsize(cache_path)
-            logger.info(f"Saved node text cache with {len(self._node_text_cache)} entries to {cache_path} (size: {file_size} bytes)")
-            return True
-                
-        except Exception as e:
-            return False
-
-    def _load_node_text_cache(self):
-        """Load node text cache from disk"""
-        cache_path = f"{self.cache_dir}/{self.dataset}/node_text_cache.pkl"
-        if os.path.exists(cache_path):
-            try:
-                file_size = os.path.getsize(cache_path)
-                if file_size < 1000:  # Less than 1KB likely empty or corrupted
-                    logger.warning(f"Warning: Cache file too small ({file_size} bytes), likely empty or corrupted")
-                    return False
-                
-                with open(cache_path, 'rb') as f:
-                    self._node_text_cache = pickle.load(f)
-                
-                if not self._node_text_cache:
-                    logger.warning("Warning: Loaded cache is empty")
-                    return False
-                
-                if not self._check_text_cache_consistency():
-                    logger.warning("Text cache inconsistent with current graph, will rebuild")
-                    return False
-                
-                logger.info(f"Loaded node text cache with {len(self._node_text_cache)} entries from {cache_path} (file size: {file_size} bytes)")
-                return True
-                
-            except Exception as e:
-                logger.error(f"Error loading node text cache: {e}")
-                try:
-                    os.remove(cache_path)
-                    logger.info(f"Removed corrupted cache file: {cache_path}")
-                except Exception as e2:
-                    logger.warning(f"Failed to remove corrupted cache file {cache_path}: {type(e2).__name__}: {e2}")
-        else:
-            logger.warning(f"Cache file not found: {cache_path}")
-        return False
-
-    def _check_text_cache_consistency(self):
-        """Check if the loaded text cache is consistent with current graph"""
-        try:
-            current_nodes = set(self.graph.nodes())
-            
-            cached_nodes = set(self._node_text_cache.keys())
-            
-            missing_nodes = current_nodes - cached_nodes
-            if missing_nodes:
-                logger.info(f"Text cache missing {len(missing_nodes)} nodes from current graph")
-                return False
-            
-            extra_nodes = cached_nodes - current_nodes
-            if len(extra_nodes) > len(current_nodes) * 0.1:
-                logger.warning(f"Text cache has too many extra nodes: {len(extra_nodes)} extra vs {len(current_nodes)} current")
-                return False
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error checking text cache consistency: {e}")
-            return False
-
     def _precompute_node_embeddings(self):
         """
         Precompute embeddings for all nodes to avoid repeated encoding
@@ -746,17 +645,11 @@ class KTRetriever:
 
     def _get_one_hop_triples_from_nodes(self, node_list: list) -> list:
 
-        one_hop_triples = []
-        node_set = set(node_list)
-        
-        for u, v, data in self.graph.edges(data=True):
-            if u in node_set or v in node_set:
-                relation = data.get('relation', '')
-                u_name = self._get_node_name(u)
-                v_name = self._get_node_name(v)
-                one_hop_triples.append((u_name, relation, v_name))
-        
-        return one_hop_triples[:self.top_k]
+        edge_ids = self.compact_graph.edges_touching(node_list)[:self.top_k]
+        return [
+            (self._get_node_name(u), relation, self._get_node_name(v))
+            for u, relation, v in self.compact_graph.edge_triples(edge_ids)
+        ]
 
     def _filter_nodes_by_schema_type(self, target_types: list) -> list:
         """
@@ -771,24 +664,12 @@ class KTRetriever:
         if not target_types:
             return list(self.graph.nodes())
         
-        filtered_nodes = []
-        for node_id, node_data in self.graph.nodes(data=True):
-            node_properties = node_data.get('properties', {})
-            node_schema_type = node_properties.get('schema_type', '')
-            
-            if node_schema_type in target_types:
-                filtered_nodes.append(node_id)
-            # Also include nodes without schema_type for backward compatibility
-            elif not node_schema_type and node_data.get('label') == 'entity':
-                filtered_nodes.append(node_id)
-
-        return filtered_nodes
+        return self.node_table.nodes_with_schema_types(target_types)
 
     def _get_node_name(self, node_id: str) -> str:
         """Get the name property of a node."""
-        node_data = self.graph.nodes.get(node_id, {})
-        properties = node_data.get('properties', {})
-        return properties.get('name', node_id)
+        name = self.node_table.name(node_id)
+        return node_id if name is None else name
 
     def _parallel_dual_path_retrieval(self, question_embed: torch.Tensor, question: str) -> Dict:
         all_chunk_ids = set()
@@ -995,6 +876,14 @@ class KTRetriever:
                 q_embed.cpu().numpy()
             )
 
+            future_keyword_chunks = None
+            if question and isinstance(self.graph, SQLiteGraph):
+                # sqlite后端用FTS5按关键词补充召回chunk
+                future_keyword_chunks = executor.submit(
+                    self._get_keyword_based_chunks,
+                    future_keywords
+                )
+
             future_chunk_retrieval = executor.submit(
                 self._chunk_embedding_retrieval,
                 question_embed,
@@ -1071,6 +960,8 @@ class KTRetriever:
                 one_hop_triples + path_triples + relation_triples
             })
             chunk_results = future_chunk_retrieval.result()
+            if future_keyword_chunks:
+                chunk_results = self._add_keyword_chunks(chunk_results, future_keyword_chunks.result())
 
         return {
             "top_nodes": top_nodes,
@@ -1104,39 +995,50 @@ class KTRetriever:
         keywords = future_keywords.result()
         return self._keyword_based_node_search(keywords)
 
-    @lru_cache(maxsize=1000)
-    def _get_cached_neighbors(self, node_id: str) -> List[str]:
-        return list(self.graph.neighbors(node_id))
+    def _get_keyword_based_chunks(self, future_keywords) -> List[str]:
+        keywords = future_keywords.result()
+        return self.graph.search_chunks(keywords, limit=self.top_k)
+
+    def _add_keyword_chunks(self, chunk_results: Dict, keyword_chunk_ids: List[str]) -> Dict:
+        """Append keyword-matched chunks missing from the embedding results; they carry no FAISS score and are reranked later"""
+        merged = {key: list(chunk_results.get(key, [])) for key in ("chunk_ids", "scores", "chunk_contents")}
+        seen = set(merged["chunk_ids"])
+        for chunk_id in keyword_chunk_ids:
+            content = self.chunk2id.get(chunk_id)
+            if chunk_id in seen or content is None:
+                continue
+            seen.add(chunk_id)
+            merged["chunk_ids"].append(chunk_id)
+            merged["scores"].append(0.0)
+            merged["chunk_contents"].append(content)
+        return merged
 
     def _optimized_neighbor_expansion(self, top_nodes: List[str], question_embed: torch.Tensor) -> List[Tuple]:
-        all_neighbors = set()
-        edge_queries = set()
-        for node in top_nodes:
-            neighbors = self._get_cached_neighbors(node)
-            all_neighbors.update(n for n in neighbors)
-            edge_queries.update((node, n) for n in all_neighbors)
-            edge_queries.update((n, node) for n in all_neighbors)
+        """Edges between the top nodes and their successors (both directions), first relation per node pair"""
+        cg = self.compact_graph
+        rows = np.unique(cg.indices(top_nodes))
+        if len(rows) == 0:
+            return []
+
+        out_ids = cg.out_edge_ids(rows)
+        neighbor_mask = np.zeros(cg.num_nodes, dtype=bool)
+        neighbor_mask[cg.out_targets[out_ids]] = True
+        in_ids = cg.in_edge_ids_of(rows)
+        in_ids = in_ids[neighbor_mask[cg.edge_sources[in_ids]]]
 
         triples = []
-        for u, v in edge_queries:
-            edge_data = self.graph.get_edge_data(u, v)
-            if edge_data:
-                relation = list(edge_data.values())[0].get('relation', '')
-                if relation:
-                    triples.append((u, relation, v))
+        seen_pairs = set()
+        for u, relation, v in cg.edge_triples(np.concatenate([out_ids, in_ids])):
+            if (u, v) in seen_pairs:
+                continue
+            seen_pairs.add((u, v))
+            if relation:
+                triples.append((u, relation, v))
         return triples
 
     def _get_relation_matched_triples(self, top_nodes: List[str], relations: List[str]) -> List[Tuple]:
-
-        top_node_set = set(top_nodes)
-        relation_set = set(relations)
-
-        return [
-            (u, data.get('relation'), v) 
-            for u, v, data in self.graph.edges(data=True) 
-            if data.get('relation') in relation_set and 
-               (u in top_node_set or v in top_node_set)
-        ]
+        edge_ids = self.compact_graph.edges_touching(top_nodes, relation_ids=self.relation_vocab.ids(set(relations)))
+        return self.compact_graph.edge_triples(edge_ids)
 
     def _triple_only_retrieval(self, question_embed: torch.Tensor) -> Dict:
         """
@@ -1169,7 +1071,7 @@ class KTRetriever:
     def _get_node_text(self, node: str) -> str:
         """
         Get text representation of a node by combining its name and description.
-        Optimized to use precomputed cache for better performance.
+        Read from the columnar node table.
         
         Args:
             node: Node ID in the graph
@@ -1177,42 +1079,9 @@ class KTRetriever:
         Returns:
             Combined text representation of the node
         """
-        # Use precomputed cache if available
-        if hasattr(self, '_node_text_cache') and node in self._node_text_cache:
-            return self._node_text_cache[node]
-        
         try:
-            if node not in self.graph.nodes:
-                return f"[Unknown Node: {node}]"
-                
-            data = self.graph.nodes[node]
-            if 'properties' in data and isinstance(data['properties'], dict):
-                name = data['properties'].get('name', '')
-                description = data['properties'].get('description', '')
-            else:
-                name = data.get('name', '')
-                description = data.get('description', '')
-            
-            if isinstance(name, list):
-                name = ", ".join(str(item) for item in name)
-            elif not isinstance(name, str):
-                name = str(name)
-                
-            if isinstance(description, list):
-                description = ", ".join(str(item) for item in description)
-            elif not isinstance(description, str):
-                description = str(description)
-            
-            result = f"{name} {description}".strip()
-            
-            if not result or result.isspace():
-                result = f"[Node: {node}]"
-            
-            if hasattr(self, '_node_text_cache'):
-                self._node_text_cache[node] = result
-                
-            return result
-            
+            text = self.node_table.text(node)
+            return f"[Unknown Node: {node}]" if text is None else text
         except Exception as e:
             logger.error(f"Error getting text for node {node}: {str(e)}")
             return f"[Error Node: {node}]"
@@ -1227,24 +1096,7 @@ class KTRetriever:
         Returns:
             Formatted string representation of node properties
         """
-        if node not in self.graph.nodes:
-            return ""
-            
-        data = self.graph.nodes[node]
-        properties = []
-
-        SKIP_FIELDS = {'name', 'description', 'properties', 'label', 'chunk id', 'level'}
-
-        for source in [data.get('properties', {}), data]:
-            if not isinstance(source, dict):
-                continue
-            for key, value in source.items():
-                if key in SKIP_FIELDS:
-                    continue
-                value_str = ", ".join(map(str, value)) if isinstance(value, list) else str(value)
-                properties.append(f"{key}: {value_str}")
-
-        return f"[{', '.join(properties)}]" if properties else ""
+        return self.node_table.extra_properties(node)
 
     def _extract_triple_based_info(self, triples: List[Tuple[str, str, str]]) -> List[str]:
         """
@@ -1479,26 +1331,12 @@ class KTRetriever:
     
     def _extract_chunk_ids_from_triples(self, scored_triples: List[Tuple[str, str, str, float]]) -> set:
         """Extract chunk IDs from nodes in scored triples."""
-        chunk_ids = set()
-        
-        for h, r, t, score in scored_triples:
-            if h in self.graph.nodes:
-                chunk_id = self._get_node_chunk_id(self.graph.nodes[h])
-                if chunk_id:
-                    chunk_ids.add(str(chunk_id))
-            
-            if t in self.graph.nodes:
-                chunk_id = self._get_node_chunk_id(self.graph.nodes[t])
-                if chunk_id:
-                    chunk_ids.add(str(chunk_id))
-                    
-        return chunk_ids
+        nodes = [node for h, r, t, score in scored_triples for node in (h, t)]
+        return self.node_table.chunk_ids(nodes)
     
-    def _get_node_chunk_id(self, node_data: dict) -> str:
-        """Extract chunk ID from node data, handling both old and new structures."""
-        if isinstance(node_data.get('properties'), dict):
-            return node_data['properties'].get('chunk id')
-        return node_data.get('chunk id')
+    def _get_node_chunk_id(self, node: str) -> Optional[str]:
+        """Chunk ID of a node (None if unknown or without chunk)."""
+        return self.node_table.chunk_id(node)
     
     def _get_matching_chunks(self, chunk_ids: set) -> List[str]:
         """Get chunk contents for given chunk IDs."""
@@ -1741,6 +1579,20 @@ class KTRetriever:
         logger.info(f"Answer: {answer}")  
         return answer
 
+    async def generate_answer_streaming(self, prompt: str, on_delta, hedge: bool = False) -> str:
+        """
+        Streaming generate_answer: awaits on_delta(text) for every generated delta as it arrives and
+        returns the cleaned full answer. hedge marks a latency-critical call (see LLMCompletionCall).
+        """
+        stream = self.llm_client.stream_api_async(prompt, hedge=hedge)
+        async for delta in stream:
+            await on_delta(delta)
+        answer = stream.text
+        logger.info("Retrieved context:")
+        logger.info(prompt)
+        logger.info(f"Answer: {answer}")
+        return answer
+
 
     def _extract_chunk_ids_from_nodes(self, nodes: List[str]) -> set:
         """
@@ -1752,28 +1604,7 @@ class KTRetriever:
         Returns:
             Set of chunk IDs found in the nodes
         """
-        chunk_ids = set()
-        
-        for node in nodes:
-            try:
-                if node in self.graph.nodes:
-                    data = self.graph.nodes[node]
-                    chunk_id = (
-                        data.get('properties', {}).get('chunk id') 
-                        if isinstance(data.get('properties'), dict) 
-                        else data.get('chunk id')
-                    )
-                    if chunk_id:
-                        chunk_ids.add(str(chunk_id))
-                    else:
-                        logger.warning(f"Debug: No chunk ID found for node {node}")
-                else:
-                    logger.warning(f"Debug: Node {node} not found in graph")
-            except Exception as e:
-                logger.error(f"Debug: Error processing node {node}: {str(e)}")
-                continue
-        
-        return chunk_ids
+        return self.node_table.chunk_ids(nodes)
 
     def _extract_chunk_ids_from_triple_nodes(self, scored_triples: List[Tuple[str, str, str, float]]) -> set:
         """
@@ -1785,32 +1616,8 @@ class KTRetriever:
         Returns:
             Set of chunk IDs found in the scored triples
         """
-        chunk_ids = set()
-        
-        for h, r, t, score in scored_triples:
-            try:
-                if h in self.graph.nodes:
-                    data = self.graph.nodes[h]
-                    chunk_id = (
-                        data.get('properties', {}).get('chunk id') 
-                        if isinstance(data.get('properties'), dict) 
-                        else data.get('chunk id')
-                    )
-                    if chunk_id:
-                        chunk_ids.add(str(chunk_id))
-                if t in self.graph.nodes:
-                    data = self.graph.nodes[t]
-                    chunk_id = (
-                        data.get('properties', {}).get('chunk id') 
-                        if isinstance(data.get('properties'), dict) 
-                        else data.get('chunk id')
-                    )
-                    if chunk_id:
-                        chunk_ids.add(str(chunk_id))
-            except Exception as e:
-                continue
-        
-        return chunk_ids
+        nodes = [node for h, r, t, score in scored_triples for node in (h, t)]
+        return self.node_table.chunk_ids(nodes)
 
     def _enhance_query_with_entities(self, question: str) -> str:
         """
@@ -2103,6 +1910,9 @@ class KTRetriever:
         if not keywords:
             return []
         
+        if isinstance(self.graph, SQLiteGraph):
+            return self.graph.search_nodes(keywords, per_keyword=50, limit=200)
+        
         use_exact_matching = getattr(self, 'use_exact_keyword_matching', True)
         
         if use_exact_matching:
@@ -2151,7 +1961,7 @@ class KTRetriever:
     def _build_node_text_index(self):
         """
         Build inverted index for node texts to speed up keyword search.
-        Optimized to use precomputed node texts and persistent caching.
+        Node texts come from the columnar node table; the index is cached on disk.
         """
         if self._load_node_text_index():
             logger.info("Loaded node text index from cache")
@@ -2161,17 +1971,10 @@ class KTRetriever:
         logger.info("Building optimized node text index for keyword search...")
         self._node_text_index = {}
         
-        if hasattr(self, '_node_text_cache') and self._node_text_cache:
-            node_texts = self._node_text_cache
-        else:
-            node_texts = {}
-            for node in self.graph.nodes():
-                node_texts[node] = self._get_node_text(node)
-        
-        total_nodes = len(node_texts)
+        total_nodes = len(self.node_table)
         processed_nodes = 0
         
-        for node, node_text in node_texts.items():
+        for node, node_text in self.node_table.texts():
             try:
                 node_text_lower = node_text.lower()
                 words = set(node_text_lower.split())
@@ -2310,16 +2113,15 @@ class KTRetriever:
                     if keyword in node_text:
                         for i in range(len(path) - 1):
                             u, v = path[i], path[i + 1]
-                            edge_data = self.graph.get_edge_data(u, v)
-                            if edge_data and 'relation' in edge_data:
-                                relation = list(edge_data.values())[0]['relation']
+                            relation = self.compact_graph.edge_relation(u, v)
+                            if relation:
                                 found_triples.append((u, relation, v))
                         break
             except Exception as e:
                 logger.warning(f"Error during DFS path search at node {start_node if 'start_node' in locals() else ''}: {type(e).__name__}: {e}")
             
             if depth < max_depth:
-                for neighbor in self.graph.neighbors(node):
+                for neighbor in self.compact_graph.successors(node):
                     if neighbor not in visited:
                         dfs_search(neighbor, depth + 1, path + [neighbor])
         
@@ -2348,8 +2150,8 @@ class KTRetriever:
             
             logger.info("Computing chunk embeddings from scratch...")
             
+            # 按批读取chunk文本，sqlite后端不会把全部文本载入内存
             chunk_ids = list(self.chunk2id.keys())
-            chunk_texts = list(self.chunk2id.values())
             batch_size = 50
             if self.config:
                 batch_size = self.config.embeddings.batch_size 
@@ -2358,9 +2160,9 @@ class KTRetriever:
             embeddings_list = []
             valid_chunk_ids = []
             
-            for i in range(0, len(chunk_texts), batch_size):
-                batch_texts = chunk_texts[i:i + batch_size]
+            for i in range(0, len(chunk_ids), batch_size):
                 batch_chunk_ids = chunk_ids[i:i + batch_size]
+                batch_texts = [self.chunk2id[chunk_id] for chunk_id in batch_chunk_ids]
                 
                 try:
                     batch_embeddings = self.qa_encoder.encode(batch_texts, convert_to_tensor=True)
@@ -12,16 +12,24 @@ import torch
 import torch.nn.functional as F
 from sentence_transformers import SentenceTransformer
 
+from utils.compact_graph import CompactGraph
 from utils.logger import logger
+from utils.relation_vocab import RelationVocab, TripleTable
 
 class DualFAISSRetriever:
-    def __init__(self, dataset, graph: nx.MultiDiGraph, model_name: str = "all-MiniLM-L6-v2", cache_dir: str = "retriever/faiss_cache_new", device: str = None):
+    def __init__(self, dataset, graph: nx.MultiDiGraph, model_name: str = "all-MiniLM-L6-v2", cache_dir: str = "retriever/faiss_cache_new", device: str = None,
+                 compact_graph: CompactGraph = None):
         """
         :param graph: nx graph
         :param model_name: embedding model
         :param cache_dir: cache directory for FAISS indices
+        :param compact_graph: CSR view of graph used for traversal, built from graph if not given
         """
         self.graph = graph
+        self.compact_graph = compact_graph or CompactGraph(graph)
+        self.relation_vocab: RelationVocab = self.compact_graph.relation_vocab
+        self._embedded_mask = None
+        self._embedded_mask_size = -1
         self.model = SentenceTransformer(model_name)
         self.cache_dir = cache_dir
         os.makedirs(cache_dir, exist_ok=True)
@@ -54,7 +62,7 @@ class DualFAISSRetriever:
         # Initialize map attributes to prevent AttributeError
         self.node_map = {}
         self.relation_map = {}
-        self.triple_map = {}
+        self.triple_map = TripleTable(self.relation_vocab)
         self.comm_map = {}
         
         # FAISS caching and optimization
@@ -212,21 +220,24 @@ class DualFAISSRetriever:
         if node not in self.node_id_to_embedding:
             return []
             
-        neighbor_triples = []
-        neighbors = self._get_3hop_neighbors(node)
-        
-        for neighbor in neighbors:
-            # Get outgoing edges from neighbor
-            for _, target, edge_data in self.graph.out_edges(neighbor, data=True):
-                if 'relation' in edge_data and target in self.node_id_to_embedding:
-                    neighbor_triples.append((neighbor, target, edge_data['relation']))
-            
-            # Get incoming edges to neighbor
-            for source, _, edge_data in self.graph.in_edges(neighbor, data=True):
-                if 'relation' in edge_data and source in self.node_id_to_embedding:
-                    neighbor_triples.append((source, neighbor, edge_data['relation']))
-                    
-        return neighbor_triples
+        cg = self.compact_graph
+        embedded = self._get_embedded_mask()
+        rows = cg.indices(self._get_3hop_neighbors(node))
+
+        # Outgoing edges of the neighbors, then incoming ones; the other endpoint must have an embedding
+        out_ids = cg.out_edge_ids(rows)
+        out_ids = out_ids[embedded[cg.out_targets[out_ids]]]
+        in_ids = cg.in_edge_ids_of(rows)
+        in_ids = in_ids[embedded[cg.edge_sources[in_ids]]]
+
+        return [(u, v, relation) for u, relation, v in cg.edge_triples(np.concatenate([out_ids, in_ids]))]
+
+    def _get_embedded_mask(self) -> np.ndarray:
+        """Boolean mask over compact graph nodes that have an embedding, rebuilt when the embedding map changes"""
+        if self._embedded_mask is None or self._embedded_mask_size != len(self.node_id_to_embedding):
+            self._embedded_mask = self.compact_graph.node_mask(self.node_id_to_embedding)
+            self._embedded_mask_size = len(self.node_id_to_embedding)
+        return self._embedded_mask
     
     def _process_triple_index(self, idx: int) -> List[Tuple[str, str, str]]:
         """Process a single triple index and return all related triples."""
@@ -344,7 +355,7 @@ class DualFAISSRetriever:
             logger.warning(f"Warning: Node {center} not found in embedding map")
             return set()
         
-        if center not in self.graph.nodes:
+        if center not in self.compact_graph:
             logger.warning(f"Warning: Node {center} not found in graph")
             return set()
         
@@ -353,36 +364,12 @@ class DualFAISSRetriever:
         if hasattr(self, '_3hop_cache') and cache_key in self._3hop_cache:
             return self._3hop_cache[cache_key]
         
-        neighbors = {center}
-        visited = {center}
-        
         try:
-            # Use BFS for more efficient traversal
-            queue = [(center, 0)]  # (node, depth)
-            
-            while queue:
-                current_node, depth = queue.pop(0)
-                
-                if depth >= 3:
-                    continue
-                
-                # Check if current node exists in graph before getting neighbors
-                if current_node not in self.graph.nodes:
-                    logger.warning(f"Current node {current_node} not found in graph during BFS")
-                    continue
-                    
-                for neighbor in self.graph.neighbors(current_node):
-                    # Only include neighbors that exist in both graph and embedding map
-                    if neighbor in self.node_id_to_embedding and neighbor not in visited:
-                        visited.add(neighbor)
-                        neighbors.add(neighbor)
-                        if depth < 2:  # Only add to queue if we can go deeper
-                            queue.append((neighbor, depth + 1))
-                    elif neighbor not in self.node_id_to_embedding:
-                        logger.warning(f"Warning: Neighbor {neighbor} of {current_node} not found in embedding map")
-                            
+            # Frontier-at-a-time BFS over the CSR arrays, restricted to nodes with embeddings
+            neighbors = self.compact_graph.k_hop_neighbors(center, 3, allowed=self._get_embedded_mask())
         except Exception as e:
             logger.error(f"Error getting neighbors for node {center}: {str(e)}")
+            neighbors = {center}
         
         # Cache the result
         if not hasattr(self, '_3hop_cache'):
@@ -974,9 +961,9 @@ class DualFAISSRetriever:
         
     def _build_relation_index(self):
         """Build FAISS index for all relations and cache embeddings"""
-        relations = sorted(list({
-            data['relation'] for _, _, data in self.graph.edges(data=True) if 'relation' in data
-        }))
+        # vocabulary order (sorted), so relation index rows and relation ids coincide; every
+        # relation is encoded, including an empty one, or later rows would shift off their ids
+        relations = list(self.relation_vocab.relations)
                 
         embeddings = self.model.encode(relations, convert_to_tensor=True)
 
@@ -991,11 +978,15 @@ class DualFAISSRetriever:
         index = faiss.IndexFlatIP(dim)
         faiss.normalize_L2(embeddings_np)
         index.add(embeddings_np)
+        if index.ntotal != len(self.relation_vocab):
+            raise ValueError(f"Relation index has {index.ntotal} rows but the relation vocabulary has "
+                             f"{len(self.relation_vocab)} relations; row ids would not match relation ids")
         
         faiss.write_index(index, f"{self.cache_dir}/{self.dataset}/relation.index")
         self.relation_map = {str(i): r for i, r in enumerate(relations)}
         with open(f"{self.cache_dir}/{self.dataset}/relation_map.json", 'w') as f:
             json.dump(self.relation_map, f)
+        self._save_relation_vocab()
             
         self.relation_index = index
 
@@ -1015,11 +1006,16 @@ class DualFAISSRetriever:
         index.add(embeddings)
         
         faiss.write_index(index, f"{self.cache_dir}/{self.dataset}/triple.index")
+        self.triple_map = TripleTable.from_triples(triples, self.relation_vocab)
+        # triple map rows store relation ids; the vocabulary is saved next to it
         with open(f"{self.cache_dir}/{self.dataset}/triple_map.json", 'w') as f:
-            json.dump({i: n for i, n in enumerate(triples)}, f)
+            json.dump(self.triple_map.to_json(), f)
+        self._save_relation_vocab()
         
         self.triple_index = index
-        self.triple_map = {str(i): n for i, n in enumerate(triples)}
+
+    def _save_relation_vocab(self):
+        self.relation_vocab.save(f"{self.cache_dir}/{self.dataset}/relation_vocab.json")
 
     def _build_community_index(self):
         """Build FAISS Community Index"""
@@ -1087,8 +1083,10 @@ class DualFAISSRetriever:
         
         if os.path.exists(triple_path):
             self.triple_index = faiss.read_index(triple_path)
+            vocab_path = f"{self.cache_dir}/{self.dataset}/relation_vocab.json"
+            stored_vocab = RelationVocab.load(vocab_path) if os.path.exists(vocab_path) else None
             with open(f"{self.cache_dir}/{self.dataset}/triple_map.json", 'r') as f:
-                self.triple_map = json.load(f)
+                self.triple_map = TripleTable.from_json(json.load(f), self.relation_vocab, stored_vocab)
                 
         if os.path.exists(comm_path):
             self.comm_index = faiss.read_index(comm_path)
@@ -0,0 +1,173 @@
+import concurrent.futures
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.graph_sharding import COMMUNITY_INDEX_NAME, get_dataset_schema_path, load_manifest
+from utils.logger import logger
+
+try:
+    from config import get_config
+except ImportError:
+    get_config = None
+
+
+class ShardRouter:
+    """
+    Route retrieval over a sharded dataset (see utils.graph_sharding).
+
+    The question is matched against the community routing index; the shards owning the best
+    matching communities are queried in parallel and their results merged into the same shape
+    as KTRetriever.process_retrieval_results.
+
+    Shard clients default to in-process KTRetriever instances created on first use. Any object
+    exposing process_retrieval_results(question, top_k, involved_types) can be passed through
+    shard_clients instead, e.g. a proxy to a retriever served by another worker or machine.
+    """
+
+    def __init__(
+        self,
+        shard_dir: str,
+        encoder=None,
+        config=None,
+        top_communities: int = 5,
+        max_shards: int = 2,
+        shard_clients: Optional[Dict[int, Any]] = None,
+        schema_path: Optional[str] = None,
+    ):
+        if config is None and get_config is not None:
+            try:
+                config = get_config()
+            except Exception:
+                config = None
+        self.config = config
+        self.manifest = load_manifest(shard_dir)
+        self.dataset = self.manifest["dataset"]
+        self.num_shards = self.manifest["num_shards"]
+        self.top_communities = top_communities
+        self.max_shards = max_shards
+
+        self.schema_path = schema_path or get_dataset_schema_path(self.dataset, config)
+
+        if encoder is None:
+            from sentence_transformers import SentenceTransformer
+            encoder = SentenceTransformer(self.manifest["embedding_model"])
+        self.encoder = encoder
+
+        with np.load(os.path.join(shard_dir, COMMUNITY_INDEX_NAME), allow_pickle=False) as index:
+            self.community_ids = index["community_ids"].tolist()
+            self.community_shards = index["shard_ids"]
+            self.community_embeddings = index["embeddings"]
+
+        self.shard_clients: Dict[int, Any] = dict(shard_clients or {})
+        self._client_lock = threading.Lock()
+        logger.info(f"ShardRouter for {self.dataset}: {self.num_shards} shards, {len(self.community_ids)} communities")
+
+    def route(self, question: str) -> List[int]:
+        """Shards owning the communities closest to the question, best first"""
+        if len(self.community_ids) == 0:
+            return list(range(self.num_shards))
+
+        query = np.asarray(self.encoder.encode([question], show_progress_bar=False), dtype=np.float32)[0]
+        query /= max(np.linalg.norm(query), 1e-12)
+        scores = self.community_embeddings @ query
+
+        top = np.argsort(-scores)[:self.top_communities]
+        shards = []
+        for idx in top:
+            shard_id = int(self.community_shards[idx])
+            if shard_id not in shards:
+                shards.append(shard_id)
+            if len(shards) >= self.max_shards:
+                break
+        return shards
+
+    def get_shard_client(self, shard_id: int):
+        with self._client_lock:
+            client = self.shard_clients.get(shard_id)
+            if client is None:
+                from models.retriever.enhanced_kt_retriever import KTRetriever
+
+                shard = self.manifest["shards"][shard_id]
+                client = KTRetriever(
+                    shard["dataset"],
+                    shard["graph_path"],
+                    qa_encoder=self.encoder,
+                    schema_path=self.schema_path,
+                    config=self.config,
+                )
+                client.build_indices()
+                self.shard_clients[shard_id] = client
+            return client
+
+    def process_retrieval_results(self, question: str, top_k: int = 20, involved_types: dict = None) -> Tuple[Dict, float]:
+        """Retrieve from the routed shards in parallel and merge their results"""
+        start_time = time.time()
+        shard_ids = self.route(question)
+
+        shard_results = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(shard_ids))) as executor:
+            futures = {
+                executor.submit(lambda sid: self.get_shard_client(sid).process_retrieval_results(question, top_k, involved_types), shard_id): shard_id
+                for shard_id in shard_ids
+            }
+            for future in concurrent.futures.as_completed(futures):
+                shard_id = futures[future]
+                try:
+                    shard_results[shard_id] = future.result()[0]
+                except Exception as e:
+                    logger.error(f"Retrieval failed on shard {shard_id}: {type(e).__name__}: {e}")
+
+        merged = self.merge_results([shard_results[sid] for sid in shard_ids if sid in shard_results], top_k)
+        retrieval_time = time.time() - start_time
+        logger.info(f"sharded retrieval over shards {shard_ids}: {retrieval_time:.4f}s")
+        return merged, retrieval_time
+
+    @staticmethod
+    def merge_results(results: List[Dict], top_k: int) -> Dict:
+        """
+        Merge per-shard retrieval results, best shard first.
+        Ranked lists are interleaved round-robin so every shard contributes its best items;
+        replicated boundary content is deduplicated. Chunks are merged as (chunk id, content)
+        pairs so ids and contents stay aligned, and chunk_contents keeps the shape of the first
+        result (a list parallel to chunk_ids, or a {chunk id: content} dict).
+        """
+        def dedupe_key(item) -> Any:
+            try:
+                hash(item)
+                return item
+            except TypeError:
+                return json.dumps(item, sort_keys=True, default=str)
+
+        def interleave(lists: List[List], limit: Optional[int] = None, key=dedupe_key) -> List:
+            merged, seen = [], set()
+            for rank in range(max((len(items) for items in lists), default=0)):
+                for items in lists:
+                    if rank < len(items):
+                        item_key = key(items[rank])
+                        if item_key not in seen:
+                            seen.add(item_key)
+                            merged.append(items[rank])
+            return merged[:limit] if limit is not None else merged
+
+        def chunk_pairs(result: Dict) -> List[Tuple[Any, Any]]:
+            contents = result.get('chunk_contents') or []
+            if isinstance(contents, dict):
+                chunk_ids = result.get('chunk_ids')
+                chunk_ids = list(contents) if chunk_ids is None else list(chunk_ids)
+                return [(chunk_id, contents[chunk_id]) for chunk_id in chunk_ids if chunk_id in contents]
+            return list(zip(result.get('chunk_ids') or [], contents))
+
+        chunks = interleave([chunk_pairs(r) for r in results], key=lambda pair: dedupe_key(pair[0]))
+        as_dict = bool(results) and isinstance(results[0].get('chunk_contents'), dict)
+
+        return {
+            'triples': interleave([r.get('triples', []) for r in results], top_k),
+            'chunk_ids': [chunk_id for chunk_id, _ in chunks],
+            'chunk_contents': dict(chunks) if as_dict else [content for _, content in chunks],
+            'chunk_retrieval_results': interleave([r.get('chunk_retrieval_results', []) for r in results], top_k),
+        }
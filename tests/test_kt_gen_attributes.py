@@ -0,0 +1,43 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+
+from config import get_config
+from models.constructor.kt_gen import KTBuilder
+
+
+@pytest.fixture
+def builder(monkeypatch):
+    monkeypatch.setenv("LLM_API_KEY", "test-key")
+    return KTBuilder("demo", schema_path="missing_schema.json", config=get_config())
+
+
+def _entity_names(graph):
+    return sorted(d["properties"]["name"] for _, d in graph.nodes(data=True) if d["label"] == "entity")
+
+
+def test_empty_attribute_list_adds_no_entity(builder):
+    nodes, edges = builder._process_attributes({"Paris": [], "Berlin": ["capital of Germany"]}, 0)
+
+    assert [data["properties"]["name"] for _, data in nodes if data["label"] == "entity"] == ["Berlin"]
+    assert len(edges) == 1
+
+
+def test_empty_attribute_list_adds_no_entity_agent(builder):
+    builder._process_attributes_agent({"Paris": [], "Berlin": ["capital of Germany"]}, 0)
+
+    assert _entity_names(builder.graph) == ["Berlin"]
+    assert builder.graph.number_of_edges() == 1
+
+
+def test_repeated_attribute_is_deduplicated_agent(builder):
+    builder._process_attributes_agent({"Berlin": ["capital of Germany"]}, 0)
+    builder._process_attributes_agent({"Berlin": ["capital of Germany", "population 3.7 million"]}, 1)
+    builder._apply_attribute_provenance()
+
+    attributes = {d["properties"]["name"]: d["properties"] for _, d in builder.graph.nodes(data=True)
+                  if d["label"] == "attribute"}
+    assert _entity_names(builder.graph) == ["Berlin"]
+    assert attributes["capital of Germany"]["chunk ids"] == [0, 1]
+    assert "chunk ids" not in attributes["population 3.7 million"]
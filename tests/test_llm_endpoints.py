@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from utils.llm_endpoints import EndpointPool, LLMEndpoint, load_endpoints
+
+
+def test_load_endpoints_defaults_to_single_endpoint(monkeypatch):
+    monkeypatch.delenv("LLM_ENDPOINTS", raising=False)
+    endpoints = load_endpoints("model-a", "https://api.example.com", "sk-key")
+
+    assert [(e.model, e.base_url, e.api_key) for e in endpoints] == [("model-a", "https://api.example.com", "sk-key")]
+
+
+def test_load_endpoints_rejects_mixed_models(monkeypatch):
+    monkeypatch.setenv("LLM_ENDPOINTS", json.dumps([
+        {"api_key": "sk-key1"},
+        {"api_key": "sk-key2", "model": "model-b"},
+    ]))
+    with pytest.raises(ValueError, match="same model"):
+        load_endpoints("model-a", "https://api.example.com", "")
+
+
+def test_pool_model_is_the_shared_endpoint_model():
+    pool = EndpointPool([
+        LLMEndpoint("a", "https://a.example.com", "sk-key1", "model-a"),
+        LLMEndpoint("b", "https://b.example.com", "sk-key2", "model-a"),
+    ])
+    assert pool.model == "model-a"
+
+    with pytest.raises(ValueError):
+        EndpointPool([
+            LLMEndpoint("a", "https://a.example.com", "sk-key1", "model-a"),
+            LLMEndpoint("b", "https://b.example.com", "sk-key2", "model-b"),
+        ])
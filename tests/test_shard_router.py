@@ -0,0 +1,41 @@
+from models.retriever.shard_router import ShardRouter
+
+
+def _shard(chunks, chunk_contents_as_dict=False):
+    chunk_ids = [chunk_id for chunk_id, _ in chunks]
+    contents = dict(chunks) if chunk_contents_as_dict else [content for _, content in chunks]
+    return {
+        'triples': [f"(e, r, {chunk_id})" for chunk_id in chunk_ids],
+        'chunk_ids': chunk_ids,
+        'chunk_contents': contents,
+        'chunk_retrieval_results': [{'chunk_id': chunk_id, 'score': 1.0} for chunk_id in chunk_ids],
+    }
+
+
+# "b" is a boundary chunk replicated on both shards, at different ranks; "e" is a distinct
+# chunk whose text happens to equal chunk "a"
+SHARD_0 = [("a", "text a"), ("b", "text b"), ("c", "text c")]
+SHARD_1 = [("b", "text b"), ("e", "text a"), ("d", "text d")]
+
+
+def test_merge_keeps_chunk_ids_and_contents_aligned():
+    merged = ShardRouter.merge_results([_shard(SHARD_0), _shard(SHARD_1)], top_k=10)
+
+    assert merged['chunk_ids'] == ["a", "b", "e", "c", "d"]
+    assert merged['chunk_contents'] == ["text a", "text b", "text a", "text c", "text d"]
+
+
+def test_merge_keeps_dict_chunk_contents():
+    merged = ShardRouter.merge_results([_shard(SHARD_0, True), _shard(SHARD_1, True)], top_k=10)
+
+    assert merged['chunk_ids'] == ["a", "b", "e", "c", "d"]
+    assert merged['chunk_contents'] == {"a": "text a", "b": "text b", "e": "text a", "c": "text c", "d": "text d"}
+
+
+def test_merge_dedupes_unhashable_items():
+    merged = ShardRouter.merge_results([_shard(SHARD_0), _shard(SHARD_1)], top_k=10)
+
+    assert merged['chunk_retrieval_results'] == [
+        {'chunk_id': chunk_id, 'score': 1.0} for chunk_id in ["a", "b", "e", "c", "d"]
+    ]
+    assert merged['triples'] == ["(e, r, a)", "(e, r, b)", "(e, r, e)", "(e, r, c)", "(e, r, d)"]
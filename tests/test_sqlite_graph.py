@@ -0,0 +1,34 @@
+import networkx as nx
+import pytest
+
+from utils.sqlite_graph import SQLiteGraph, build_sqlite_graph
+
+
+@pytest.fixture
+def store(tmp_path):
+    graph = nx.MultiDiGraph()
+    for i in range(10):
+        graph.add_node(f"entity_{i}", label="entity", level=2,
+                       properties={"name": f"{'river' if i < 5 else 'lake'} {i}", "description": "", "chunk id": "c1"})
+    graph.add_edge("entity_0", "entity_1", relation="flows_into")
+    chunks = [("c1", "The river flows into the sea."), ("c2", "A mountain range."), ("c3", "Another river delta.")]
+
+    db_path = str(tmp_path / "graph.sqlite")
+    build_sqlite_graph(graph, db_path, chunks=chunks)
+    store = SQLiteGraph(db_path)
+    yield store
+    store.close()
+
+
+def test_search_nodes_returns_at_most_limit(store):
+    found = store.search_nodes(["river", "lake"], per_keyword=4, limit=6)
+
+    assert len(found) == 6
+    assert len(set(found)) == 6
+
+
+def test_search_chunks_matches_any_keyword(store):
+    assert sorted(store.search_chunks(["river"])) == ["c1", "c3"]
+    assert sorted(store.search_chunks(["mountain", "delta"])) == ["c2", "c3"]
+    assert store.search_chunks(["", "  "]) == []
+    assert store.chunks.get("c2") == "A mountain range."
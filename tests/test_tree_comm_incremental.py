@@ -0,0 +1,65 @@
+import hashlib
+
+import networkx as nx
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from utils.tree_comm import FastTreeComm
+
+
+class HashingEncoder:
+    """Deterministic bag-of-words encoder standing in for a sentence transformer"""
+
+    def encode(self, texts, convert_to_tensor=False, **kwargs):
+        out = np.zeros((len(texts), 32), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.split():
+                out[i, int(hashlib.md5(word.encode()).hexdigest(), 16) % 32] += 1
+        return torch.from_numpy(out)
+
+
+def _graph_with_community(num_members, num_new):
+    graph = nx.MultiDiGraph()
+    for i in range(num_members + num_new):
+        graph.add_node(f"entity_{i}", label="entity", level=2, properties={"name": f"river {i % 3} delta {i}"})
+    for i in range(num_members + num_new - 1):
+        graph.add_edge(f"entity_{i}", f"entity_{i + 1}", relation="flows_into")
+    graph.add_node("comm_4_0", label="community", level=4, properties={"name": "rivers", "description": ""})
+    for i in range(num_members):
+        graph.add_edge(f"entity_{i}", "comm_4_0", relation="member_of")
+    return graph
+
+
+def _tree_comm(graph):
+    tc = FastTreeComm(graph, embedding_model=HashingEncoder(), llm_client=object())
+    tc.llm_client = None
+    return tc
+
+
+def _members(graph):
+    return {u for u, _, data in graph.edges(data=True) if data.get("relation") == "member_of"}
+
+
+def test_split_keeps_every_member_in_a_community():
+    graph = _graph_with_community(num_members=6, num_new=2)
+    tc = _tree_comm(graph)
+    # a split that leaves one node alone in its piece
+    tc._fast_clustering = lambda members, n_clusters=None: {0: members[:-1], 1: members[-1:]}
+
+    tc.assign_new_entities(["entity_6", "entity_7"], max_community_size=4)
+
+    assert _members(graph) == {f"entity_{i}" for i in range(8)}
+    assert all(members for members in tc.get_existing_communities().values())
+
+
+def test_merge_small_pieces_folds_singletons():
+    tc = _tree_comm(_graph_with_community(num_members=6, num_new=0))
+    nodes = [f"entity_{i}" for i in range(6)]
+
+    merged = tc._merge_small_pieces([nodes[:3], [nodes[3]], nodes[4:]])
+    assert sorted(node for piece in merged for node in piece) == nodes
+    assert all(len(piece) >= 2 for piece in merged)
+
+    assert tc._merge_small_pieces([[node] for node in nodes[:3]]) == [nodes[:3]]
@@ -1,58 +1,615 @@
 import os
 import time
 import json
+import asyncio
+import random
+import threading
+import concurrent.futures
 import requests
 import re
+import weakref
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Callable, Iterator, Optional
 
-from openai import OpenAI, AzureOpenAI
+import httpx
+import openai
+from openai import OpenAI, AzureOpenAI, AsyncOpenAI, AsyncAzureOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
 from dotenv import load_dotenv
 
+from utils.llm_cache import LLMResponseCache, make_cache_key
+from utils.llm_endpoints import EndpointPool, LLMEndpoint, load_endpoints
+from utils.llm_hedging import HedgePolicy, hedged_call, hedged_call_async, hedged_stream_async
+from utils.llm_recorder import LLMRecorder
 from utils.logger import logger
+from utils.single_flight import AsyncSingleFlight, SingleFlight
+
+try:
+    from config import get_config
+except ImportError:
+    get_config = None
 
 load_dotenv()
 
+# process-wide clients keyed by (provider, base url, api key, api version); all share one HTTP pool
+_client_lock = threading.Lock()
+_http_client = None
+_shared_clients = {}
+# async clients are bound to the event loop they were created on, so they are shared per loop
+_async_clients = weakref.WeakKeyDictionary()
+_response_cache = None
+_recorder = None
+_endpoint_pool = None
+# hedging policies by kind ("completion": full response latency, "first_token": stream time to first token)
+_hedge_policies = {}
+_hedge_executor = None
+# identical (model, prompt, temperature) requests in flight at the same time share one upstream call
+_inflight = SingleFlight()
+_inflight_async = AsyncSingleFlight()
+
+
+def _get_llm_config():
+    if get_config is not None:
+        try:
+            return get_config().llm
+        except Exception:
+            pass
+    from config.config_loader import LLMConfig
+    return LLMConfig()
+
+
+def _http_pool_options(llm_config) -> dict:
+    return {
+        "limits": httpx.Limits(
+            max_connections=llm_config.max_connections,
+            max_keepalive_connections=llm_config.max_keepalive_connections,
+            keepalive_expiry=llm_config.keepalive_expiry,
+        ),
+        "timeout": httpx.Timeout(llm_config.timeout, connect=llm_config.connect_timeout),
+    }
+
+
+def get_http_client() -> httpx.Client:
+    """The shared, thread-safe HTTP connection pool used by every LLM client in this process."""
+    global _http_client
+    with _client_lock:
+        if _http_client is None:
+            llm_config = _get_llm_config()
+            _http_client = DefaultHttpxClient(**_http_pool_options(llm_config))
+            logger.info(f"Created shared LLM HTTP pool (max_connections={llm_config.max_connections}, "
+                        f"keepalive={llm_config.max_keepalive_connections}/{llm_config.keepalive_expiry}s)")
+        return _http_client
+
+
+def get_shared_client(provider: str, base_url: str, api_key: str, api_version: str = None):
+    """OpenAI / AzureOpenAI client for the given endpoint, created once per process."""
+    key = (provider, base_url, api_key, api_version)
+    client = _shared_clients.get(key)
+    if client is not None:
+        return client
+
+    http_client = get_http_client()
+    with _client_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            # retries are handled by LLMCompletionCall, not by the SDK
+            if provider == "azure":
+                client = AzureOpenAI(
+                    azure_endpoint=base_url,
+                    api_key=api_key,
+                    api_version=api_version,
+                    http_client=http_client,
+                    max_retries=0,
+                )
+            else:
+                client = OpenAI(base_url=base_url, api_key=api_key, http_client=http_client, max_retries=0)
+            _shared_clients[key] = client
+        return client
+
+
+def get_shared_async_client(provider: str, base_url: str, api_key: str, api_version: str = None):
+    """AsyncOpenAI / AsyncAzureOpenAI client for the given endpoint, shared by all callers on the running event loop."""
+    loop = asyncio.get_running_loop()
+    key = (provider, base_url, api_key, api_version)
+    with _client_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            http_client = clients.get("http_client")
+            if http_client is None:
+                http_client = DefaultAsyncHttpxClient(**_http_pool_options(_get_llm_config()))
+                clients["http_client"] = http_client
+            if provider == "azure":
+                client = AsyncAzureOpenAI(
+                    azure_endpoint=base_url,
+                    api_key=api_key,
+                    api_version=api_version,
+                    http_client=http_client,
+                    max_retries=0,
+                )
+            else:
+                client = AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=http_client, max_retries=0)
+            clients[key] = client
+        return client
+
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """The process-wide LLM response cache, or None unless llm.enable_cache is set."""
+    global _response_cache
+    llm_config = _get_llm_config()
+    if not llm_config.enable_cache:
+        return None
+    with _client_lock:
+        if _response_cache is None:
+            _response_cache = LLMResponseCache(
+                llm_config.cache_dir,
+                max_memory_entries=llm_config.cache_memory_entries,
+                max_disk_entries=llm_config.cache_max_entries,
+                ttl=llm_config.cache_ttl,
+            )
+        return _response_cache
+
+
+def get_recorder() -> Optional[LLMRecorder]:
+    """The process-wide LLM traffic recorder, or None unless llm.record_mode is 'record' or 'replay'."""
+    global _recorder
+    llm_config = _get_llm_config()
+    if llm_config.record_mode == "off":
+        return None
+    with _client_lock:
+        if _recorder is None:
+            _recorder = LLMRecorder(llm_config.record_path, llm_config.record_mode, llm_config.replay_latency_scale)
+        return _recorder
+
+
+def get_endpoint_pool() -> EndpointPool:
+    """
+    The process-wide pool of LLM endpoints (LLM_ENDPOINTS, or the single LLM_BASE_URL / LLM_API_KEY),
+    shared so that load and health are tracked across all LLMCompletionCall instances.
+    """
+    global _endpoint_pool
+    with _client_lock:
+        if _endpoint_pool is None:
+            llm_config = _get_llm_config()
+            endpoints = load_endpoints(
+                os.getenv("LLM_MODEL", "deepseek-chat"),
+                os.getenv("LLM_BASE_URL", "https://api.deepseek.com"),
+                os.getenv("LLM_API_KEY", ""),
+            )
+            _endpoint_pool = EndpointPool(
+                endpoints,
+                strategy=llm_config.balancing,
+                failure_threshold=llm_config.circuit_failure_threshold,
+                cooldown=llm_config.circuit_cooldown,
+            )
+        return _endpoint_pool
+
+
+def get_hedge_policy(kind: str) -> HedgePolicy:
+    with _client_lock:
+        policy = _hedge_policies.get(kind)
+        if policy is None:
+            llm_config = _get_llm_config()
+            policy = HedgePolicy(
+                percentile=llm_config.hedge_percentile,
+                min_delay=llm_config.hedge_min_delay,
+                max_rate=llm_config.hedge_max_rate,
+            )
+            _hedge_policies[kind] = policy
+        return policy
+
+
+def _get_hedge_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _hedge_executor
+    with _client_lock:
+        if _hedge_executor is None:
+            _hedge_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=_get_llm_config().max_connections, thread_name_prefix="llm-hedge"
+            )
+        return _hedge_executor
+
+
+def get_hedging_stats() -> dict:
+    """Hedgeable requests, hedges sent and hedges that won, per policy kind."""
+    with _client_lock:
+        policies = dict(_hedge_policies)
+    return {kind: policy.stats() for kind, policy in policies.items()}
+
+
+def get_coalescing_stats() -> dict:
+    """Upstream calls made (leaders) vs. requests that joined an identical in-flight call (coalesced)."""
+    return {
+        "leaders": _inflight.leaders + _inflight_async.leaders,
+        "coalesced": _inflight.coalesced + _inflight_async.coalesced,
+    }
+
+
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Throttling, timeouts, connection failures and 5xx are retryable; auth / bad request errors are fatal."""
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def is_endpoint_failure(error: Exception) -> bool:
+    """Errors that count against an endpoint's health: retryable ones plus rejected keys."""
+    return is_retryable_error(error) or isinstance(error, (openai.AuthenticationError, openai.PermissionDeniedError))
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Server-requested delay in seconds from Retry-After / retry-after-ms headers, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMStream:
+    """
+    Incremental completion returned by LLMCompletionCall.stream_api / stream_api_async.
+
+    Iterate (``for`` / ``async for``) to receive raw text deltas as they arrive; once the stream is
+    exhausted, ``text`` holds the full response after the same cleaning call_api applies.
+    """
+
+    def __init__(self, deltas, clean: Callable[[str], str], on_complete: Optional[Callable[[str], None]] = None):
+        self._deltas = deltas
+        self._clean = clean
+        self._on_complete = on_complete
+        self._parts = []
+        self.text: Optional[str] = None
+
+    def _finish(self) -> None:
+        self.text = self._clean("".join(self._parts))
+        if self._on_complete is not None and self.text:
+            self._on_complete(self.text)
+
+    def __iter__(self) -> Iterator[str]:
+        for delta in self._deltas:
+            self._parts.append(delta)
+            yield delta
+        self._finish()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        async for delta in self._deltas:
+            self._parts.append(delta)
+            yield delta
+        self._finish()
+
+
 class LLMCompletionCall:
+    temperature = 0.3
+
     def __init__(self):
-        self.llm_model = os.getenv("LLM_MODEL", "deepseek-chat")
         self.llm_base_url = os.getenv("LLM_BASE_URL", "https://api.deepseek.com")
         self.llm_api_key = os.getenv("LLM_API_KEY", "")
-        if not self.llm_api_key:
+        self.llm_config = _get_llm_config()
+        self.recorder = get_recorder()
+        # a replayed run never reaches the provider, so it needs no key
+        replaying = self.recorder is not None and self.recorder.replaying
+        if not self.llm_api_key and not os.getenv("LLM_ENDPOINTS") and not replaying:
             raise ValueError("LLM API key not provided")
         self.openai_provider = os.getenv("OPENAI_PROVIDER", "openai").lower()
+        self.api_version = None
         if self.openai_provider == "azure":
             self.api_version = os.getenv("API_VERSION", "2025-01-01-preview")
-            self.client = AzureOpenAI(
-                    azure_endpoint=self.llm_base_url,
-                    api_key=self.llm_api_key,
-                    api_version=self.api_version,
-                )
-        else:
-            self.client = OpenAI(base_url=self.llm_base_url, api_key = self.llm_api_key)
+        # instances are cheap: endpoints, clients and the connection pool are shared process-wide
+        self.endpoint_pool = get_endpoint_pool()
+        # the model in the cache / recording key; the pool guarantees every endpoint serves it
+        self.llm_model = self.endpoint_pool.model
+        self.cache = get_response_cache()
 
-    def call_api(self, content: str) -> str:
+    def _client(self, endpoint: LLMEndpoint):
+        return get_shared_client(self.openai_provider, endpoint.base_url, endpoint.api_key, self.api_version)
+
+    def _async_client(self, endpoint: LLMEndpoint):
+        return get_shared_async_client(self.openai_provider, endpoint.base_url, endpoint.api_key, self.api_version)
+
+    def call_api(self, content: str, deadline: Optional[float] = None, hedge: bool = False) -> str:
         """
         Call API to generate text with retry mechanism.
+        Retryable errors (see is_retryable_error) are retried with exponential backoff and full jitter,
+        honouring Retry-After, until llm.max_retries or the per-call deadline is exhausted.
+        With llm.enable_cache, identical (model, prompt, temperature) requests are answered from the cache;
+        with llm.coalesce_requests, concurrent identical requests wait for and share one upstream call.
+        With llm.record_mode 'record' every response is written to llm.record_path; with 'replay' responses
+        are served from that recording instead of the provider.
         
         Args:
             content: Prompt content
+            deadline: Seconds the whole call (all attempts) may take, defaults to llm.call_deadline
+            hedge: Latency-critical call: with llm.enable_hedging, send a duplicate request when the
+                response is slower than the llm.hedge_percentile latency and use the first to finish
             
         Returns:
             Generated text response
         """
-            
-        try:
-            completion = self.client.chat.completions.create(
-                model=self.llm_model,
-                messages=[{"role": "user", "content": content}],
-                temperature=0.3
-            )
-            raw = completion.choices[0].message.content or ""
-            clean_completion = self._clean_llm_content(raw)
-            return clean_completion
-            
-        except Exception as e:
-            logger.error(f"LLM api calling failed. Error: {e}")
-            raise e 
+        key = make_cache_key(self.llm_model, content, self.temperature)
+        if self.recorder is None:
+            return self._call(key, content, deadline, hedge)
+        if self.recorder.replaying:
+            return self.recorder.replay(key)
+        start = time.monotonic()
+        response = self._call(key, content, deadline, hedge)
+        self.recorder.record(key, response, time.monotonic() - start)
+        return response
+
+    def _call(self, key: str, content: str, deadline: Optional[float], hedge: bool = False) -> str:
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        if self.llm_config.coalesce_requests:
+            return _inflight.do(key, lambda: self._fetch(key, content, deadline, hedge))
+        return self._fetch(key, content, deadline, hedge)
+
+    def _fetch(self, key: str, content: str, deadline: Optional[float], hedge: bool = False) -> str:
+        if hedge and self.llm_config.enable_hedging:
+            response = hedged_call(get_hedge_policy("completion"), _get_hedge_executor(),
+                                   lambda: self._request(content, deadline))
+        else:
+            response = self._request(content, deadline)
+        if self.cache and response:
+            self.cache.put(key, response)
+        return response
+
+    def _request(self, content: str, deadline: Optional[float] = None) -> str:
+        deadline_at = self._deadline_at(deadline)
+        attempt = 0
+        while True:
+            try:
+                with self.endpoint_pool.attempt(is_endpoint_failure) as endpoint:
+                    completion = self._client(endpoint).chat.completions.create(
+                        model=endpoint.model,
+                        messages=[{"role": "user", "content": content}],
+                        temperature=self.temperature,
+                        timeout=self._attempt_timeout(deadline_at),
+                    )
+                raw = completion.choices[0].message.content or ""
+                clean_completion = self._clean_llm_content(raw)
+                return clean_completion
+                
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, deadline_at)
+                if delay is None:
+                    raise e
+                attempt += 1
+                time.sleep(delay)
+
+    async def call_api_async(self, content: str, deadline: Optional[float] = None, hedge: bool = False) -> str:
+        """
+        Async counterpart of call_api for event-loop callers: same cleaning, retry policy, deadline and
+        response cache, backed by the async OpenAI / Azure client shared on the running loop. Concurrent
+        identical requests on the same loop are coalesced, traffic is recorded / replayed and hedge works
+        like call_api (the losing request is cancelled).
+        """
+        key = make_cache_key(self.llm_model, content, self.temperature)
+        if self.recorder is None:
+            return await self._call_async(key, content, deadline, hedge)
+        if self.recorder.replaying:
+            return await self.recorder.replay_async(key)
+        start = time.monotonic()
+        response = await self._call_async(key, content, deadline, hedge)
+        self.recorder.record(key, response, time.monotonic() - start)
+        return response
+
+    async def _call_async(self, key: str, content: str, deadline: Optional[float], hedge: bool = False) -> str:
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        if self.llm_config.coalesce_requests:
+            return await _inflight_async.do(key, lambda: self._fetch_async(key, content, deadline, hedge))
+        return await self._fetch_async(key, content, deadline, hedge)
+
+    async def _fetch_async(self, key: str, content: str, deadline: Optional[float], hedge: bool = False) -> str:
+        if hedge and self.llm_config.enable_hedging:
+            response = await hedged_call_async(get_hedge_policy("completion"),
+                                               lambda: self._request_async(content, deadline))
+        else:
+            response = await self._request_async(content, deadline)
+        if self.cache and response:
+            self.cache.put(key, response)
+        return response
+
+    async def _request_async(self, content: str, deadline: Optional[float] = None) -> str:
+        deadline_at = self._deadline_at(deadline)
+        attempt = 0
+        while True:
+            try:
+                with self.endpoint_pool.attempt(is_endpoint_failure) as endpoint:
+                    completion = await self._async_client(endpoint).chat.completions.create(
+                        model=endpoint.model,
+                        messages=[{"role": "user", "content": content}],
+                        temperature=self.temperature,
+                        timeout=self._attempt_timeout(deadline_at),
+                    )
+                raw = completion.choices[0].message.content or ""
+                return self._clean_llm_content(raw)
+
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, deadline_at)
+                if delay is None:
+                    raise e
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def stream_api(self, content: str, deadline: Optional[float] = None) -> LLMStream:
+        """
+        Streaming variant of call_api: iterate the returned LLMStream for text deltas as they are
+        generated, then read its cleaned .text. Failures before the first delta are retried like
+        call_api; once output has been delivered an error is raised to the caller. Cached and
+        replayed responses are delivered as a single delta; complete responses are stored in the
+        cache and recorded.
+        """
+        key = make_cache_key(self.llm_model, content, self.temperature)
+        if self.recorder is not None and self.recorder.replaying:
+            return LLMStream(iter([self.recorder.replay(key)]), self._clean_llm_content)
+        on_complete = self._stream_on_complete(key)
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return LLMStream(iter([cached]), self._clean_llm_content, on_complete)
+        return LLMStream(self._stream_request(content, deadline), self._clean_llm_content, on_complete)
+
+    def stream_api_async(self, content: str, deadline: Optional[float] = None, hedge: bool = False) -> LLMStream:
+        """
+        Async counterpart of stream_api, consumed with ``async for``. With hedge (and llm.enable_hedging)
+        a second stream is opened when the first token is slower than the llm.hedge_percentile time to
+        first token; the stream that answers first is kept and the other cancelled.
+        """
+        key = make_cache_key(self.llm_model, content, self.temperature)
+        if self.recorder is not None and self.recorder.replaying:
+            return LLMStream(self._replayed_delta_async(key), self._clean_llm_content)
+        on_complete = self._stream_on_complete(key)
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return LLMStream(self._single_delta_async(cached), self._clean_llm_content, on_complete)
+        if hedge and self.llm_config.enable_hedging:
+            deltas = hedged_stream_async(get_hedge_policy("first_token"),
+                                         lambda: self._stream_request_async(content, deadline))
+        else:
+            deltas = self._stream_request_async(content, deadline)
+        return LLMStream(deltas, self._clean_llm_content, on_complete)
+
+    def _stream_on_complete(self, key: str) -> Optional[Callable[[str], None]]:
+        """Cache / record the full text of a finished stream"""
+        if not self.cache and self.recorder is None:
+            return None
+        start = time.monotonic()
+        cache, recorder = self.cache, self.recorder
+
+        def on_complete(text: str) -> None:
+            if cache:
+                cache.put(key, text)
+            if recorder is not None:
+                recorder.record(key, text, time.monotonic() - start)
+        return on_complete
+
+    @staticmethod
+    def _chunk_text(chunk) -> str:
+        # some providers send keep-alive / content-filter chunks without choices or content
+        if not chunk.choices:
+            return ""
+        return chunk.choices[0].delta.content or ""
+
+    def _stream_request(self, content: str, deadline: Optional[float] = None) -> Iterator[str]:
+        deadline_at = self._deadline_at(deadline)
+        attempt = 0
+        started = False
+        while True:
+            try:
+                with self.endpoint_pool.attempt(is_endpoint_failure) as endpoint:
+                    with self._client(endpoint).chat.completions.create(
+                        model=endpoint.model,
+                        messages=[{"role": "user", "content": content}],
+                        temperature=self.temperature,
+                        timeout=self._attempt_timeout(deadline_at),
+                        stream=True,
+                    ) as stream:
+                        for chunk in stream:
+                            text = self._chunk_text(chunk)
+                            if text:
+                                started = True
+                                yield text
+                return
+
+            except Exception as e:
+                delay = None if started else self._retry_delay(e, attempt, deadline_at)
+                if delay is None:
+                    if started:
+                        logger.error(f"LLM stream interrupted after output was delivered. Error: {e}")
+                    raise e
+                attempt += 1
+                time.sleep(delay)
+
+    async def _stream_request_async(self, content: str, deadline: Optional[float] = None) -> AsyncIterator[str]:
+        deadline_at = self._deadline_at(deadline)
+        attempt = 0
+        started = False
+        while True:
+            try:
+                with self.endpoint_pool.attempt(is_endpoint_failure) as endpoint:
+                    stream = await self._async_client(endpoint).chat.completions.create(
+                        model=endpoint.model,
+                        messages=[{"role": "user", "content": content}],
+                        temperature=self.temperature,
+                        timeout=self._attempt_timeout(deadline_at),
+                        stream=True,
+                    )
+                    async with stream:
+                        async for chunk in stream:
+                            text = self._chunk_text(chunk)
+                            if text:
+                                started = True
+                                yield text
+                return
+
+            except Exception as e:
+                delay = None if started else self._retry_delay(e, attempt, deadline_at)
+                if delay is None:
+                    if started:
+                        logger.error(f"LLM stream interrupted after output was delivered. Error: {e}")
+                    raise e
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _single_delta_async(text: str) -> AsyncIterator[str]:
+        yield text
+
+    async def _replayed_delta_async(self, key: str) -> AsyncIterator[str]:
+        yield await self.recorder.replay_async(key)
+
+    def _deadline_at(self, deadline: Optional[float]) -> float:
+        return time.monotonic() + (deadline if deadline is not None else self.llm_config.call_deadline)
+
+    def _attempt_timeout(self, deadline_at: float) -> float:
+        """Request timeout of one attempt, clipped to what is left of the call deadline."""
+        return max(0.1, min(self.llm_config.timeout, deadline_at - time.monotonic()))
+
+    def _retry_delay(self, error: Exception, attempt: int, deadline_at: float) -> Optional[float]:
+        """
+        Backoff before the next attempt (exponential with full jitter, at least Retry-After),
+        or None if the error is fatal or retries / the deadline are exhausted.
+        """
+        llm_config = self.llm_config
+        if not is_retryable_error(error) or attempt >= llm_config.max_retries:
+            logger.error(f"LLM api calling failed after {attempt + 1} attempt(s). Error: {error}")
+            return None
+        delay = random.uniform(0, min(llm_config.backoff_max, llm_config.backoff_base * (2 ** attempt)))
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if time.monotonic() + delay >= deadline_at:
+            logger.error(f"LLM api calling failed, deadline exhausted after {attempt + 1} attempt(s). Error: {error}")
+            return None
+        logger.warning(f"LLM api call failed ({type(error).__name__}), retry {attempt + 1}/{llm_config.max_retries} in {delay:.2f}s")
+        return delay
 
     def _clean_llm_content(self, text: str) -> str:
         if not isinstance(text, str):
@@ -0,0 +1,165 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import networkx as nx
+import numpy as np
+
+from utils.logger import logger
+from utils.relation_vocab import RelationVocab
+
+
+class CompactGraph:
+    """
+    Read-only CSR representation of a knowledge graph for retrieval-time traversal.
+
+    Nodes get dense integer ids (position in graph.nodes()), relations are ids of the shared
+    RelationVocab, and edges are stored as int32 arrays:
+    - out CSR: out_indptr / out_targets / out_relations, edge id == position, in graph.edges() order
+    - in CSR:  in_indptr / in_sources / in_edge_ids (edge ids into the out arrays)
+    """
+
+    def __init__(self, graph: nx.MultiDiGraph, relation_vocab: Optional[RelationVocab] = None):
+        self.node_ids: List[str] = list(graph.nodes())
+        self.node_index: Dict[str, int] = {node: i for i, node in enumerate(self.node_ids)}
+        self.relation_vocab = relation_vocab or RelationVocab.from_graph(graph)
+
+        num_nodes = len(self.node_ids)
+        node_index = self.node_index
+        intern = self.relation_vocab.intern
+        sources, targets, relations = [], [], []
+        for u, v, data in graph.edges(data=True):
+            sources.append(node_index[u])
+            targets.append(node_index[v])
+            relations.append(intern(data.get("relation", "")))
+
+        sources = np.asarray(sources, dtype=np.int32)
+        self.edge_sources = sources
+        self.out_targets = np.asarray(targets, dtype=np.int32)
+        self.out_relations = np.asarray(relations, dtype=np.int32)
+        # graph.edges() yields edges grouped by source in node order, so the edge list already is the out CSR
+        self.out_indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_nodes), out=self.out_indptr[1:])
+
+        order = np.argsort(self.out_targets, kind="stable")
+        self.in_edge_ids = order.astype(np.int32)
+        self.in_sources = sources[order]
+        self.in_indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.out_targets, minlength=num_nodes), out=self.in_indptr[1:])
+
+        logger.info(f"Built compact graph: {num_nodes} nodes, {len(sources)} edges, "
+                    f"{len(self.relation_vocab)} relations")
+
+    @property
+    def relations(self) -> List[str]:
+        return self.relation_vocab.relations
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.out_targets)
+
+    def __contains__(self, node_id) -> bool:
+        return node_id in self.node_index
+
+    def index(self, node_id: str) -> Optional[int]:
+        return self.node_index.get(node_id)
+
+    def indices(self, node_ids: Iterable[str]) -> np.ndarray:
+        """Integer ids of the given nodes, silently skipping unknown ones"""
+        node_index = self.node_index
+        return np.asarray([node_index[n] for n in node_ids if n in node_index], dtype=np.int64)
+
+    def node_mask(self, node_ids: Iterable[str]) -> np.ndarray:
+        mask = np.zeros(self.num_nodes, dtype=bool)
+        mask[self.indices(node_ids)] = True
+        return mask
+
+    @staticmethod
+    def _gather(indptr: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Positions of all CSR entries belonging to rows, row by row"""
+        if len(rows) == 0:
+            return np.zeros(0, dtype=np.int64)
+        starts = indptr[rows]
+        lengths = indptr[rows + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.zeros(0, dtype=np.int64)
+        offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        return offsets + np.arange(total)
+
+    def out_edge_ids(self, rows: np.ndarray) -> np.ndarray:
+        return self._gather(self.out_indptr, rows)
+
+    def in_edge_ids_of(self, rows: np.ndarray) -> np.ndarray:
+        return self.in_edge_ids[self._gather(self.in_indptr, rows)]
+
+    def successors(self, node_id: str) -> List[str]:
+        """Distinct successors in edge order (same as MultiDiGraph.neighbors)"""
+        idx = self.node_index.get(node_id)
+        if idx is None:
+            return []
+        targets = self.out_targets[self.out_indptr[idx]:self.out_indptr[idx + 1]].tolist()
+        return [self.node_ids[t] for t in dict.fromkeys(targets)]
+
+    def edge_relation(self, u: str, v: str) -> Optional[str]:
+        """Relation of the first u -> v edge, or None if there is no such edge"""
+        u_idx, v_idx = self.node_index.get(u), self.node_index.get(v)
+        if u_idx is None or v_idx is None:
+            return None
+        start, end = self.out_indptr[u_idx], self.out_indptr[u_idx + 1]
+        hits = np.flatnonzero(self.out_targets[start:end] == v_idx)
+        if len(hits) == 0:
+            return None
+        return self.relations[self.out_relations[start + hits[0]]]
+
+    def k_hop_neighbors(self, center: str, depth: int, allowed: Optional[np.ndarray] = None) -> Set[str]:
+        """
+        Nodes reachable from center along out edges within depth hops (center included).
+        If allowed is given, only nodes with allowed[idx] are visited.
+        """
+        idx = self.node_index.get(center)
+        if idx is None:
+            return set()
+
+        visited = np.zeros(self.num_nodes, dtype=bool)
+        visited[idx] = True
+        frontier = np.asarray([idx], dtype=np.int64)
+        reached = [frontier]
+        for _ in range(depth):
+            candidates = self.out_targets[self.out_edge_ids(frontier)]
+            candidates = candidates[~visited[candidates]]
+            if allowed is not None:
+                candidates = candidates[allowed[candidates]]
+            if len(candidates) == 0:
+                break
+            frontier = np.unique(candidates).astype(np.int64)
+            visited[frontier] = True
+            reached.append(frontier)
+
+        node_ids = self.node_ids
+        return {node_ids[i] for i in np.concatenate(reached).tolist()}
+
+    def edges_touching(self, node_ids: Iterable[str], relation_ids: Optional[Iterable[int]] = None) -> np.ndarray:
+        """
+        Ids of edges with at least one endpoint in node_ids, in graph.edges() order.
+        If relation_ids is given, only edges with one of these relation ids are kept.
+        """
+        rows = self.indices(node_ids)
+        if len(rows) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        edge_ids = np.union1d(self.out_edge_ids(rows), self.in_edge_ids_of(rows))
+        if relation_ids is not None:
+            edge_ids = edge_ids[np.isin(self.out_relations[edge_ids], np.fromiter(relation_ids, dtype=np.int32))]
+        return edge_ids
+
+    def edge_triples(self, edge_ids: np.ndarray) -> List[Tuple[str, str, str]]:
+        """(source id, relation, target id) for the given edge ids"""
+        node_ids, relations = self.node_ids, self.relations
+        return [
+            (node_ids[u], relations[r], node_ids[v])
+            for u, r, v in zip(self.edge_sources[edge_ids].tolist(), self.out_relations[edge_ids].tolist(),
+                               self.out_targets[edge_ids].tolist())
+        ]
@@ -0,0 +1,146 @@
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from utils.logger import logger
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+SCORE_SUFFIX_RE = re.compile(r"\[score:\s*(-?[\d.]+)\]\s*$")
+WORD_RE = re.compile(r"\w+")
+
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            # tiktoken missing or its encoding file cannot be downloaded: fall back to an estimate
+            _encoding_failed = True
+            logger.warning(f"tiktoken unavailable ({e}), estimating token counts as characters / 4")
+    return _encoding
+
+
+@lru_cache(maxsize=65536)
+def count_tokens(text: str) -> int:
+    """cl100k_base token count of text (memoized; triples and chunks recur across IRCoT steps)"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def triple_score(triple: str) -> Optional[float]:
+    """Relevance score embedded by the retriever as a trailing '[score: x]', None if absent"""
+    match = SCORE_SUFFIX_RE.search(triple)
+    return float(match.group(1)) if match else None
+
+
+def _words(text: str) -> set:
+    return set(WORD_RE.findall(text.lower()))
+
+
+@dataclass
+class PackedContext:
+    """Triples and chunks selected by ContextPacker, in relevance order"""
+    triples: List[str] = field(default_factory=list)
+    chunk_ids: List[str] = field(default_factory=list)
+    chunks: List[str] = field(default_factory=list)
+    tokens: int = 0
+    dropped_triples: int = 0
+    dropped_chunks: int = 0
+    redundant_chunks: int = 0
+
+    def render(self, title: str = "") -> str:
+        """'=== {title}Triples ===' / '=== {title}Chunks ===' sections as used in the answer prompts"""
+        context = f"=== {title}Triples ===\n" + "\n".join(self.triples)
+        context += f"\n=== {title}Chunks ===\n" + "\n".join(self.chunks)
+        return context
+
+
+class ContextPacker:
+    """
+    Fill a token budget with the most relevant retrieved triples and chunks.
+
+    Triples are ranked by the retriever's '[score: x]' suffix (or an explicit (text, score) pair), chunks
+    by an explicit score or by how many question keywords they contain; ties keep retrieval order, and
+    question keyword hits break score ties between triples. Items are taken greedily by relevance while
+    they fit: triples first up to triple_share of the budget, then chunks with everything left over.
+    A chunk whose words are at least chunk_overlap covered by an already selected chunk is dropped as
+    redundant.
+    """
+
+    def __init__(self, max_tokens: int = 6000, triple_share: float = 0.4, chunk_overlap: float = 0.8):
+        self.max_tokens = max_tokens
+        self.triple_share = triple_share
+        self.chunk_overlap = chunk_overlap
+
+    @classmethod
+    def from_config(cls, config) -> "ContextPacker":
+        retrieval = config.retrieval
+        return cls(retrieval.context_max_tokens, retrieval.context_triple_share, retrieval.context_chunk_overlap)
+
+    def pack(self, question: str,
+             triples: Iterable[Union[str, Tuple[str, float]]],
+             chunks: Union[Mapping[str, str], Sequence[Union[str, Tuple[str, float]]]]) -> PackedContext:
+        """
+        Args:
+            question: Text whose keywords rank unscored items (question plus current IRCoT query)
+            triples: Triple strings or (triple, score) pairs
+            chunks: {chunk id: content}, or chunk contents / (content, score) pairs
+
+        Returns:
+            PackedContext within max_tokens
+        """
+        keywords = _words(question)
+        packed = PackedContext()
+
+        triple_items = [t if isinstance(t, tuple) else (t, triple_score(t)) for t in triples]
+        triple_budget = int(self.max_tokens * self.triple_share)
+        used = 0
+        for triple, _ in self._rank(triple_items, keywords):
+            cost = count_tokens(triple) + 1
+            if used + cost > triple_budget:
+                packed.dropped_triples += 1
+                continue
+            packed.triples.append(triple)
+            used += cost
+
+        if isinstance(chunks, Mapping):
+            chunk_items = [(content, None, chunk_id) for chunk_id, content in chunks.items()]
+        else:
+            chunk_items = [c + (None,) if isinstance(c, tuple) else (c, None, None) for c in chunks]
+        selected_words: List[set] = []
+        for content, _, chunk_id in self._rank(chunk_items, keywords):
+            words = _words(content)
+            if words and any(len(words & other) >= self.chunk_overlap * len(words) for other in selected_words):
+                packed.redundant_chunks += 1
+                continue
+            cost = count_tokens(content) + 1
+            if used + cost > self.max_tokens:
+                packed.dropped_chunks += 1
+                continue
+            packed.chunks.append(content)
+            if chunk_id is not None:
+                packed.chunk_ids.append(chunk_id)
+            selected_words.append(words)
+            used += cost
+
+        packed.tokens = used
+        return packed
+
+    @staticmethod
+    def _rank(items: List[tuple], keywords: set) -> List[tuple]:
+        """Items (text, score, ...) by descending (score, question keyword hits), stable in input order"""
+        def key(item):
+            text, score = item[0], item[1]
+            return (score if score is not None else float("-inf"), len(keywords & _words(text)))
+        return sorted(items, key=key, reverse=True)
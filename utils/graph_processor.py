@@ -1,14 +1,37 @@
-import networkx as nx
+import gc
+import hashlib
 import json
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+from xml.sax.saxutils import escape, quoteattr
+
+import networkx as nx
+import numpy as np
 
 from utils.logger import logger
 
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = ".snapshot.npz"
+
+# property value kinds in the snapshot property table
+_PROP_STR = 0
+_PROP_JSON = 1
+
+NORMALIZED_FORMAT = "youtu-graphrag-normalized"
+NORMALIZED_VERSION = 2
+SUPPORTED_NORMALIZED_VERSIONS = (1, 2)  # version 1 files have no compact numeric ids
+GRAPH_FORMATS = ("normalized", "legacy")
+
+LABEL_LEVELS = {"attribute": 1, "entity": 2, "keyword": 3, "community": 4}
+
+STREAM_CHUNK_SIZE = 1 << 20  # characters read per refill by the streaming JSON loader
+
 
 def load_graph_from_json(input_path: str) -> nx.MultiDiGraph:
     """
-    Load a knowledge graph from JSON format
-    
-    Expected JSON format:
+    Load a knowledge graph from JSON, either the normalized format (see graph_to_normalized)
+    or the legacy list of relationship records:
     [
         {
             "start_node": {
@@ -22,11 +45,250 @@ def load_graph_from_json(input_path: str) -> nx.MultiDiGraph:
             }
         }
     ]
+
+    The file is parsed incrementally: records are decoded one at a time from a bounded
+    buffer and inserted right away, so the full record list never exists in memory.
     """
-    graph = nx.MultiDiGraph()
-    
     with open(input_path, 'r', encoding='utf-8') as f:
-        relationships = json.load(f)
+        reader = JSONStreamReader(f)
+        first = reader.peek()
+        if first == "[":
+            return build_graph_from_relationships(reader.iter_array())
+        if first == "{":
+            return _build_graph_from_normalized_stream(reader)
+    raise ValueError(f"Unrecognized graph JSON in {input_path}: expected a normalized graph object or a list of relationships")
+
+
+class JSONStreamReader:
+    """
+    Incremental reader over a JSON text stream.
+    Values are decoded one at a time with the C decoder from a buffer that only holds
+    the not-yet-consumed text, so memory stays bounded by the largest single value.
+    """
+
+    _WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+    def __init__(self, f: TextIO, chunk_size: int = STREAM_CHUNK_SIZE):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _read(self, size: int) -> bool:
+        if self._eof:
+            return False
+        chunk = self._file.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it ("" at end of input)"""
+        while True:
+            self._pos = self._WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._read(self._chunk_size):
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Malformed JSON: expected {char!r}, found {found or 'end of input'!r}")
+        self._pos += 1
+
+    def decode(self) -> Any:
+        """Decode the next complete JSON value"""
+        size = self._chunk_size
+        while True:
+            self.peek()
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+                # a value ending exactly at the buffer end may be a truncated number or literal
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._read(size)
+            size *= 2
+
+    def iter_array(self) -> Iterator[Any]:
+        """Yield the elements of the JSON array starting at the current position"""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        raw_decode, skip_whitespace = self._decoder.raw_decode, self._WHITESPACE.match
+        while True:
+            # fast path: element and its delimiter are already buffered
+            try:
+                value, end = raw_decode(self._buf, skip_whitespace(self._buf, self._pos).end())
+                end = skip_whitespace(self._buf, end).end()
+            except json.JSONDecodeError:
+                end = len(self._buf)
+            if end < len(self._buf):
+                self._pos = end
+            else:
+                value = self.decode()
+            yield value
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("]")
+            return
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        Yield the keys of the JSON object starting at the current position.
+        The caller must consume each member's value (decode or iter_array) before advancing.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.decode()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("}")
+            return
+
+
+def is_normalized_graph_data(data: Any) -> bool:
+    return isinstance(data, dict) and data.get("format") == NORMALIZED_FORMAT
+
+
+def build_graph_from_data(data: Union[Dict, List]) -> nx.MultiDiGraph:
+    """Build the graph from parsed graph JSON in either supported format"""
+    if is_normalized_graph_data(data):
+        return build_graph_from_normalized(data)
+    if isinstance(data, list):
+        return build_graph_from_relationships(data)
+    raise ValueError("Unrecognized graph JSON: expected a normalized graph object or a list of relationships")
+
+
+def graph_to_normalized(graph: nx.MultiDiGraph) -> Dict[str, Any]:
+    """
+    Convert a graph to the normalized format: every node is stored once and edges reference node ids.
+    Besides the string id every node carries a compact numeric id "idx" (its position in the node list,
+    which is also its CompactGraph / FAISS row id after loading), and edges carry the endpoint idx values.
+    {
+        "format": "youtu-graphrag-normalized",
+        "version": 2,
+        "nodes": [{"id": "entity_0", "idx": 0, "label": "entity", "level": 2, "properties": {"name": "...", ...}}],
+        "edges": [{"source": "entity_0", "target": "attr_1", "source_idx": 0, "target_idx": 1, "relation": "has_attribute"}]
+    }
+    """
+    node_index = {}
+    nodes = []
+    for node, data in graph.nodes(data=True):
+        node_index[node] = len(nodes)
+        nodes.append({
+            "id": node,
+            "idx": node_index[node],
+            "label": data["label"],
+            "level": data.get("level", LABEL_LEVELS.get(data["label"], 2)),
+            "properties": data["properties"],
+        })
+    edges = [
+        {"source": u, "target": v, "source_idx": node_index[u], "target_idx": node_index[v], "relation": data["relation"]}
+        for u, v, data in graph.edges(data=True)
+    ]
+    return {"format": NORMALIZED_FORMAT, "version": NORMALIZED_VERSION, "nodes": nodes, "edges": edges}
+
+
+def build_graph_from_normalized(data: Dict[str, Any]) -> nx.MultiDiGraph:
+    """Build the graph from normalized graph data; node ids are kept as stored"""
+    version = data.get("version")
+    if version not in SUPPORTED_NORMALIZED_VERSIONS:
+        raise ValueError(f"Unsupported normalized graph version: {version}")
+
+    graph = nx.MultiDiGraph()
+    node_ids = _add_normalized_nodes(graph, data["nodes"])
+    _add_normalized_edges(graph, data["edges"], node_ids)
+    return graph
+
+
+def _add_normalized_nodes(graph: nx.MultiDiGraph, nodes: Iterable[Dict[str, Any]]) -> List[str]:
+    """Add nodes in file order; returns the node ids indexed by their compact idx"""
+    node_ids = []
+    for node in nodes:
+        if node.get("idx", len(node_ids)) != len(node_ids):
+            raise ValueError(f"Node {node['id']} has idx {node['idx']}, expected {len(node_ids)}")
+        graph.add_node(
+            node["id"],
+            label=node["label"],
+            properties=node.get("properties", {}),
+            level=node.get("level", LABEL_LEVELS.get(node["label"], 2)),
+        )
+        node_ids.append(node["id"])
+    return node_ids
+
+
+def _add_normalized_edges(graph: nx.MultiDiGraph, edges: Iterable[Dict[str, Any]], node_ids: List[str]) -> None:
+    num_nodes = len(node_ids)
+    for edge in edges:
+        source_idx, target_idx = edge.get("source_idx"), edge.get("target_idx")
+        if source_idx is not None and target_idx is not None:
+            # resolve endpoints through the compact ids instead of hashing the string ids
+            if not (0 <= source_idx < num_nodes and 0 <= target_idx < num_nodes):
+                raise ValueError(f"Edge references unknown node idx: {source_idx} -> {target_idx}")
+            graph.add_edge(node_ids[source_idx], node_ids[target_idx], relation=edge["relation"])
+            continue
+        if edge["source"] not in graph or edge["target"] not in graph:
+            raise ValueError(f"Edge references unknown node: {edge['source']} -> {edge['target']}")
+        graph.add_edge(edge["source"], edge["target"], relation=edge["relation"])
+
+
+def _build_graph_from_normalized_stream(reader: JSONStreamReader) -> nx.MultiDiGraph:
+    """Streaming counterpart of build_graph_from_normalized; nodes must precede edges in the file"""
+    graph = nx.MultiDiGraph()
+    header = {}
+    node_ids = []
+    for key in reader.iter_object():
+        if key == "nodes":
+            node_ids = _add_normalized_nodes(graph, reader.iter_array())
+        elif key == "edges":
+            _add_normalized_edges(graph, reader.iter_array(), node_ids)
+        else:
+            header[key] = reader.decode()
+
+    if header.get("format") != NORMALIZED_FORMAT:
+        raise ValueError("Unrecognized graph JSON: expected a normalized graph object or a list of relationships")
+    if header.get("version") not in SUPPORTED_NORMALIZED_VERSIONS:
+        raise ValueError(f"Unsupported normalized graph version: {header.get('version')}")
+    return graph
+
+
+def convert_graph_json(input_path: str, output_path: Optional[str] = None, graph_format: str = "normalized") -> str:
+    """
+    Rewrite a graph JSON file in the given format (legacy files are deduplicated by (label, name) on the way).
+    Overwrites input_path when output_path is not given.
+    """
+    graph = load_graph_from_json(input_path)
+    output_path = output_path or input_path
+    save_graph_to_json(graph, output_path, graph_format=graph_format)
+    logger.info(f"Converted {input_path} -> {output_path} ({graph_format}): "
+                f"{graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges")
+    return output_path
+
+
+def build_graph_from_relationships(relationships: Iterable[Dict]) -> nx.MultiDiGraph:
+    """
+    Build the graph from relationship records (the JSON list format), consumed in a single pass.
+    Nodes are deduplicated by (label, name) and get ids "{label}_{counter}" in first-seen order.
+    """
+    graph = nx.MultiDiGraph()
     
     # Track nodes to avoid duplicates and assign consistent IDs
     node_mapping = {}  # (label, name) -> node_id
@@ -57,16 +319,7 @@ def load_graph_from_json(input_path: str) -> nx.MultiDiGraph:
             }
             
             # Add level based on label
-            if start_node_data["label"] == "attribute":
-                node_attrs["level"] = 1
-            elif start_node_data["label"] == "entity":
-                node_attrs["level"] = 2
-            elif start_node_data["label"] == "keyword":
-                node_attrs["level"] = 3
-            elif start_node_data["label"] == "community":
-                node_attrs["level"] = 4
-            else:
-                node_attrs["level"] = 2  # Default level
+            node_attrs["level"] = LABEL_LEVELS.get(start_node_data["label"], 2)
             
             graph.add_node(node_id, **node_attrs)
         
@@ -90,16 +343,7 @@ def load_graph_from_json(input_path: str) -> nx.MultiDiGraph:
             }
             
             # Add level based on label
-            if end_node_data["label"] == "attribute":
-                node_attrs["level"] = 1
-            elif end_node_data["label"] == "entity":
-                node_attrs["level"] = 2
-            elif end_node_data["label"] == "keyword":
-                node_attrs["level"] = 3
-            elif end_node_data["label"] == "community":
-                node_attrs["level"] = 4
-            else:
-                node_attrs["level"] = 2  # Default level
+            node_attrs["level"] = LABEL_LEVELS.get(end_node_data["label"], 2)
             
             graph.add_node(node_id, **node_attrs)
         
@@ -111,11 +355,10 @@ def load_graph_from_json(input_path: str) -> nx.MultiDiGraph:
     return graph
 
 
-def save_graph_to_json(graph: nx.MultiDiGraph, output_path: str):
+def save_graph_to_json(graph: nx.MultiDiGraph, output_path: str, graph_format: str = "normalized"):
     """
-    Save a knowledge graph to JSON format
-    
-    Output format:
+    Save a knowledge graph to JSON, in the normalized format (see graph_to_normalized)
+    or, with graph_format="legacy", as relationship records:
     [
         {
             "start_node": {
@@ -130,6 +373,19 @@ def save_graph_to_json(graph: nx.MultiDiGraph, output_path: str):
         }
     ]
     """
+    if graph_format not in GRAPH_FORMATS:
+        raise ValueError(f"Unsupported graph format: {graph_format}. Must be one of {GRAPH_FORMATS}")
+    if graph_format == "normalized":
+        output = graph_to_normalized(graph)
+    else:
+        output = graph_to_relationships(graph)
+    
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+
+
+def graph_to_relationships(graph: nx.MultiDiGraph) -> List[Dict[str, Any]]:
+    """Convert a graph to the legacy list of relationship records (node properties repeated per edge)"""
     output = []
     
     for u, v, data in graph.edges(data=True):
@@ -149,8 +405,7 @@ def save_graph_to_json(graph: nx.MultiDiGraph, output_path: str):
         }
         output.append(relationship)
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    return output
 
 
 # Legacy function for backward compatibility
@@ -173,6 +428,14 @@ def load_graph_from_graphml(input_path: str) -> nx.MultiDiGraph:
     graph_data = nx.read_graphml(input_path)
     
     for node_id, data in graph_data.nodes(data=True):
+        # Properties are stored as a JSON string under their attribute name
+        if isinstance(data.get("properties"), str):
+            try:
+                data["properties"] = json.loads(data["properties"])
+            except json.JSONDecodeError:
+                logger.warning(f"Warning: Could not parse properties for node {node_id}")
+                data["properties"] = {"name": data["properties"]}
+
         # Handle properties (d1)
         if "d1" in data:
             try:
@@ -220,19 +483,290 @@ def save_graph(graph: nx.MultiDiGraph, output_path: str):
 
 def save_graph_to_graphml(graph: nx.MultiDiGraph, output_path: str):
     """
-    Save graph to GraphML format (legacy function)
+    Save graph to GraphML format.
+    Elements are streamed straight to the file without copying the graph; dict- and list-valued
+    attributes (e.g. node properties) are JSON-encoded as they are written. The key layout
+    (d0, d1, ... in first-seen order, nodes before edges) matches nx.write_graphml.
     """
-    # Create a copy of the graph to avoid modifying the original
-    graph_copy = graph.copy()
-    
-    for n, data in graph_copy.nodes(data=True):
-        for k, v in list(data.items()):  
-            if isinstance(v, dict):
-                graph_copy.nodes[n][k] = json.dumps(v, ensure_ascii=False)
+    keys: Dict[Tuple[str, str, str], str] = {}
+
+    def key_id(name: str, value: Any, scope: str) -> str:
+        xml_type = _graphml_type(value)
+        return keys.setdefault((str(name), xml_type, scope), f"d{len(keys)}")
+
+    # first pass: collect attribute keys, which GraphML declares before the graph element
+    for _, data in graph.nodes(data=True):
+        for name, value in data.items():
+            key_id(name, value, "node")
+    for _, _, data in graph.edges(data=True):
+        for name, value in data.items():
+            key_id(name, value, "edge")
+    for name, value in graph.graph.items():
+        key_id(name, value, "graph")
+
+    def data_elements(data: Dict[str, Any], scope: str, indent: str) -> str:
+        return "".join(
+            f'{indent}<data key="{key_id(name, value, scope)}">{escape(_graphml_text(value))}</data>\n'
+            for name, value in data.items()
+        )
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write("<?xml version='1.0' encoding='utf-8'?>\n")
+        f.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns" '
+                'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns '
+                'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n')
+        for (name, xml_type, scope), kid in keys.items():
+            f.write(f'  <key id="{kid}" for="{scope}" attr.name={quoteattr(name)} attr.type="{xml_type}" />\n')
+
+        edge_default = "directed" if graph.is_directed() else "undirected"
+        f.write(f'  <graph edgedefault="{edge_default}">\n')
+        f.write(data_elements(graph.graph, "graph", "    "))
+        for node, data in graph.nodes(data=True):
+            if data:
+                f.write(f'    <node id={quoteattr(str(node))}>\n{data_elements(data, "node", "      ")}    </node>\n')
+            else:
+                f.write(f'    <node id={quoteattr(str(node))} />\n')
+
+        edges = graph.edges(keys=True, data=True) if graph.is_multigraph() else graph.edges(data=True)
+        for edge in edges:
+            u, v, data = edge[0], edge[1], edge[-1]
+            edge_id = f" id={quoteattr(str(edge[2]))}" if graph.is_multigraph() else ""
+            f.write(f'    <edge source={quoteattr(str(u))} target={quoteattr(str(v))}{edge_id}>\n'
+                    f'{data_elements(data, "edge", "      ")}    </edge>\n')
+        f.write("  </graph>\n</graphml>\n")
+    os.replace(tmp_path, output_path)
+
+
+def _graphml_type(value: Any) -> str:
+    if isinstance(value, (bool, np.bool_)):
+        return "boolean"
+    if isinstance(value, (int, np.integer)):
+        return "long"
+    if isinstance(value, (float, np.floating)):
+        return "double"
+    if isinstance(value, (str, dict, list)):
+        return "string"
+    raise TypeError(f"GraphML does not support type {type(value)} as data values.")
+
+
+def _graphml_text(value: Any) -> str:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (bool, np.bool_)):
+        return "true" if value else "false"
+    if isinstance(value, (float, np.floating)):
+        return repr(float(value))
+    return str(value)
+
+
+def get_snapshot_path(json_path: str) -> str:
+    """Binary snapshot path written next to a graph JSON file"""
+    return os.path.splitext(json_path)[0] + SNAPSHOT_SUFFIX
+
+
+def compute_file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's content, used to validate snapshots against their source JSON"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def save_graph_snapshot(graph: nx.MultiDiGraph, snapshot_path: str, source_hash: str = "") -> None:
+    """
+    Save a graph as a binary snapshot (numpy .npz, no pickling):
+    - a string table (one utf-8 blob plus character offsets) holding every id, label, key and value
+    - node columns: id, label and level
+    - a node property table: (node, key, value, kind) rows, non-string values stored as JSON
+    - edge arrays: source, target and relation
+    Only the label/level/properties node attributes and the relation edge attribute are kept.
+    """
+    strings = []
+    string_ids = {}
+
+    def intern(value: str) -> int:
+        idx = string_ids.get(value)
+        if idx is None:
+            idx = len(strings)
+            string_ids[value] = idx
+            strings.append(value)
+        return idx
+
+    node_index = {}
+    node_ids, node_labels, node_levels = [], [], []
+    prop_nodes, prop_keys, prop_values, prop_kinds = [], [], [], []
+
+    for i, (node, data) in enumerate(graph.nodes(data=True)):
+        node_index[node] = i
+        node_ids.append(intern(str(node)))
+        node_labels.append(intern(str(data.get("label", ""))))
+        node_levels.append(int(data.get("level", 2)))
+        for key, value in (data.get("properties") or {}).items():
+            prop_nodes.append(i)
+            prop_keys.append(intern(str(key)))
+            if isinstance(value, str):
+                prop_values.append(intern(value))
+                prop_kinds.append(_PROP_STR)
+            else:
+                prop_values.append(intern(json.dumps(value, ensure_ascii=False)))
+                prop_kinds.append(_PROP_JSON)
+
+    edge_sources, edge_targets, edge_relations = [], [], []
+    for u, v, data in graph.edges(data=True):
+        edge_sources.append(node_index[u])
+        edge_targets.append(node_index[v])
+        edge_relations.append(intern(str(data.get("relation", ""))))
+
+    # predecessor order per node, so that in_edges iterate exactly as in the source graph
+    pred_counts, pred_sources = [], []
+    for node in graph.nodes():
+        preds = graph.pred[node]
+        pred_counts.append(len(preds))
+        pred_sources.extend(node_index[u] for u in preds)
+
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in strings], out=offsets[1:])
+    blob = "".join(strings).encode("utf-8")
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "source_hash": source_hash,
+        "num_nodes": len(node_ids),
+        "num_edges": len(edge_sources),
+    }
+
+    # write to a temporary file first so that a crash never leaves a truncated snapshot behind
+    tmp_path = snapshot_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(
+            f,
+            meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+            strings=np.frombuffer(blob, dtype=np.uint8),
+            string_offsets=offsets,
+            node_ids=np.asarray(node_ids, dtype=np.int64),
+            node_labels=np.asarray(node_labels, dtype=np.int64),
+            node_levels=np.asarray(node_levels, dtype=np.int8),
+            prop_nodes=np.asarray(prop_nodes, dtype=np.int64),
+            prop_keys=np.asarray(prop_keys, dtype=np.int64),
+            prop_values=np.asarray(prop_values, dtype=np.int64),
+            prop_kinds=np.asarray(prop_kinds, dtype=np.int8),
+            edge_sources=np.asarray(edge_sources, dtype=np.int64),
+            edge_targets=np.asarray(edge_targets, dtype=np.int64),
+            edge_relations=np.asarray(edge_relations, dtype=np.int64),
+            pred_counts=np.asarray(pred_counts, dtype=np.int64),
+            pred_sources=np.asarray(pred_sources, dtype=np.int64),
+        )
+    os.replace(tmp_path, snapshot_path)
+
+
+def load_graph_snapshot(snapshot_path: str, expected_hash: Optional[str] = None) -> Optional[nx.MultiDiGraph]:
+    """
+    Load a graph written by save_graph_snapshot.
+    Returns None if the snapshot version is unknown or its source hash differs from expected_hash.
+    """
+    # the loader only allocates acyclic containers; pausing the cyclic GC avoids repeated
+    # full-heap scans while millions of dicts are created
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _load_graph_snapshot(snapshot_path, expected_hash)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _load_graph_snapshot(snapshot_path: str, expected_hash: Optional[str]) -> Optional[nx.MultiDiGraph]:
+    with np.load(snapshot_path, allow_pickle=False) as data:
+        meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+        if meta.get("version") != SNAPSHOT_VERSION:
+            logger.warning(f"Unsupported snapshot version {meta.get('version')} in {snapshot_path}")
+            return None
+        if expected_hash is not None and meta.get("source_hash") != expected_hash:
+            logger.info(f"Snapshot {snapshot_path} is stale (source hash mismatch)")
+            return None
+
+        text = data["strings"].tobytes().decode("utf-8")
+        offsets = data["string_offsets"].tolist()
+        strings = [text[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+        node_ids = [strings[i] for i in data["node_ids"].tolist()]
+        node_labels = [strings[i] for i in data["node_labels"].tolist()]
+        node_levels = data["node_levels"].tolist()
+
+        properties = [{} for _ in node_ids]
+        for node, key, value, kind in zip(data["prop_nodes"].tolist(), data["prop_keys"].tolist(),
+                                          data["prop_values"].tolist(), data["prop_kinds"].tolist()):
+            properties[node][strings[key]] = strings[value] if kind == _PROP_STR else json.loads(strings[value])
+
+        # fill the MultiDiGraph dicts directly: same structure as add_node/add_edge would build
+        # (edge keys 0..k-1 per node pair), without the per-call view overhead
+        graph = nx.MultiDiGraph()
+        node_dict, succ, pred = graph._node, graph._succ, graph._pred
+        for node_id, label, props, level in zip(node_ids, node_labels, properties, node_levels):
+            node_dict[node_id] = {"label": label, "properties": props, "level": level}
+            succ[node_id] = {}
+            pred[node_id] = {}
+
+        sources = [node_ids[i] for i in data["edge_sources"].tolist()]
+        targets = [node_ids[i] for i in data["edge_targets"].tolist()]
+        relations = [strings[i] for i in data["edge_relations"].tolist()]
+        for u, v, relation in zip(sources, targets, relations):
+            neighbors = succ[u]
+            keydict = neighbors.get(v)
+            if keydict is None:
+                neighbors[v] = {0: {"relation": relation}}
+            else:
+                keydict[len(keydict)] = {"relation": relation}
+
+        pred_sources = [node_ids[i] for i in data["pred_sources"].tolist()]
+        start = 0
+        for node_id, count in zip(node_ids, data["pred_counts"].tolist()):
+            if count:
+                pred[node_id] = {u: succ[u][node_id] for u in pred_sources[start:start + count]}
+                start += count
+
+    return graph
+
+
+def load_graph_with_snapshot(json_path: str) -> nx.MultiDiGraph:
+    """
+    Load a graph JSON file through its binary snapshot when the snapshot matches the JSON content.
+    Otherwise parse the JSON and (re)write the snapshot for the next start.
+    """
+    snapshot_path = get_snapshot_path(json_path)
+    source_hash = compute_file_hash(json_path)
+
+    if os.path.exists(snapshot_path):
+        try:
+            graph = load_graph_snapshot(snapshot_path, expected_hash=source_hash)
+            if graph is not None:
+                logger.info(f"Loaded graph snapshot {snapshot_path}: {graph.number_of_nodes()} nodes, "
+                            f"{graph.number_of_edges()} edges")
+                return graph
+        except Exception as e:
+            logger.warning(f"Failed to load graph snapshot {snapshot_path}: {type(e).__name__}: {e}")
+
+    graph = load_graph_from_json(json_path)
+    try:
+        save_graph_snapshot(graph, snapshot_path, source_hash)
+        logger.info(f"Graph snapshot saved to {snapshot_path}")
+    except Exception as e:
+        logger.warning(f"Failed to save graph snapshot {snapshot_path}: {type(e).__name__}: {e}")
+    return graph
+
+
+if __name__ == "__main__":
+    import argparse
 
-    for u, v, data in graph_copy.edges(data=True):
-        for k, v in list(data.items()):
-            if isinstance(v, dict):
-                graph_copy.edges[u, v][k] = json.dumps(v, ensure_ascii=False)
+    parser = argparse.ArgumentParser(description="Convert graph JSON files between the legacy and normalized formats")
+    parser.add_argument("inputs", nargs="+", help="Graph JSON files to convert")
+    parser.add_argument("--format", choices=GRAPH_FORMATS, default="normalized", help="Target format")
+    parser.add_argument("--output", help="Output path (single input only); inputs are rewritten in place otherwise")
+    args = parser.parse_args()
 
-    nx.write_graphml(graph_copy, output_path)
\ No newline at end of file
+    if args.output and len(args.inputs) > 1:
+        parser.error("--output can only be used with a single input file")
+    for path in args.inputs:
+        convert_graph_json(path, args.output, graph_format=args.format)
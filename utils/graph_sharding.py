@@ -0,0 +1,295 @@
+"""
+Split a constructed knowledge graph into community-based shards.
+
+Every level-4 community (with its members and keyword nodes) is owned by exactly one shard;
+remaining nodes follow the shard owning most of their neighbours. Each shard keeps all edges
+touching its owned nodes and replicates the other endpoints (boundary nodes), so one-hop
+expansion inside a shard sees the same neighbourhood as the full graph.
+
+Shards are written as regular datasets named "{dataset}_shard{i}" (graph JSON in
+output/graphs, chunk file in output/chunks), so KTRetriever and the FAISS cache layout work
+unchanged. The manifest and the community routing index used by ShardRouter are written to
+output/shards/{dataset}/.
+
+Usage:
+    python -m utils.graph_sharding --dataset hotpot --num-shards 4 [--build-indices]
+"""
+
+import argparse
+import heapq
+import json
+import os
+from collections import Counter
+from typing import Dict, List, Optional
+
+import networkx as nx
+import numpy as np
+
+from utils import graph_processor
+from utils.logger import logger
+
+try:
+    from config import get_config
+except ImportError:
+    get_config = None
+
+MANIFEST_NAME = "manifest.json"
+COMMUNITY_INDEX_NAME = "community_index.npz"
+
+
+def get_shard_dataset_name(dataset: str, shard_id: int) -> str:
+    return f"{dataset}_shard{shard_id}"
+
+
+def get_shard_dir(dataset: str, base_dir: str = "output/shards") -> str:
+    return os.path.join(base_dir, dataset)
+
+
+def get_dataset_schema_path(dataset: str, config=None) -> Optional[str]:
+    """Schema of a configured dataset, or the schemas/{dataset}.json convention used for uploads"""
+    if config is not None and dataset in config.datasets:
+        return config.get_dataset_config(dataset).schema_path
+    schema_path = f"schemas/{dataset}.json"
+    return schema_path if os.path.exists(schema_path) else None
+
+
+def get_communities(graph: nx.MultiDiGraph) -> Dict[str, List[str]]:
+    """Level-4 community node -> member nodes (member_of / keyword_of predecessors)"""
+    communities = {}
+    for node, data in graph.nodes(data=True):
+        if data.get("level") != 4:
+            continue
+        members = []
+        for pred, keydict in graph.pred[node].items():
+            if any(edge.get("relation") in ("member_of", "keyword_of") for edge in keydict.values()):
+                members.append(pred)
+        communities[node] = members
+    return communities
+
+
+def assign_shards(graph: nx.MultiDiGraph, num_shards: int) -> Dict[str, int]:
+    """
+    Owner shard of every node.
+    Communities are bin-packed (largest first onto the lightest shard); their members and keyword
+    nodes go with them. Other nodes are assigned by repeated majority vote of already assigned
+    neighbours, and whatever stays unreachable is spread over the lightest shards.
+    """
+    if num_shards < 1:
+        raise ValueError("num_shards must be positive")
+
+    owner: Dict[str, int] = {}
+    load = [(0, shard_id) for shard_id in range(num_shards)]
+    heapq.heapify(load)
+
+    communities = get_communities(graph)
+    if not communities:
+        logger.warning("Graph has no level-4 communities; sharding by neighbourhood only")
+
+    for comm, members in sorted(communities.items(), key=lambda item: len(item[1]), reverse=True):
+        size, shard_id = heapq.heappop(load)
+        owner[comm] = shard_id
+        added = 1
+        for member in members:
+            if member not in owner:
+                owner[member] = shard_id
+                added += 1
+        heapq.heappush(load, (size + added, shard_id))
+
+    pending = [node for node in graph.nodes() if node not in owner]
+    while pending:
+        votes = {}
+        for node in pending:
+            counts = Counter(owner[n] for n in graph.pred[node] if n in owner)
+            counts.update(owner[n] for n in graph.succ[node] if n in owner)
+            if counts:
+                votes[node] = counts.most_common(1)[0][0]
+        if not votes:
+            break
+        owner.update(votes)
+        pending = [node for node in pending if node not in owner]
+
+    if pending:
+        # nodes not connected to any community: keep each weakly connected component together
+        sizes = Counter(owner.values())
+        load = [(sizes.get(shard_id, 0), shard_id) for shard_id in range(num_shards)]
+        heapq.heapify(load)
+        for component in nx.weakly_connected_components(graph.subgraph(pending)):
+            size, shard_id = heapq.heappop(load)
+            for node in component:
+                owner[node] = shard_id
+            heapq.heappush(load, (size + len(component), shard_id))
+
+    return owner
+
+
+def build_shard_graph(graph: nx.MultiDiGraph, owner: Dict[str, int], shard_id: int) -> nx.MultiDiGraph:
+    """Owned nodes plus replicated boundary nodes, with every edge touching an owned node"""
+    owned = {node for node, shard in owner.items() if shard == shard_id}
+    shard_graph = nx.MultiDiGraph()
+    for node, data in graph.nodes(data=True):
+        if node in owned or any(n in owned for n in graph.pred[node]) or any(n in owned for n in graph.succ[node]):
+            shard_graph.add_node(node, **data)
+    for u, v, data in graph.edges(data=True):
+        if u in owned or v in owned:
+            shard_graph.add_edge(u, v, **data)
+    return shard_graph
+
+
+def _write_shard_chunks(source_chunk_file: str, target_chunk_file: str, chunk_ids: set) -> int:
+    """Copy the chunk lines referenced by a shard; returns the number of chunks written"""
+    written = 0
+    with open(source_chunk_file, "r", encoding="utf-8") as src, open(target_chunk_file, "w", encoding="utf-8") as dst:
+        for line in src:
+            if line.startswith("id: ") and "\t" in line and line[4:line.index("\t")] in chunk_ids:
+                dst.write(line)
+                written += 1
+    return written
+
+
+def _node_chunk_ids(data: Dict) -> List[str]:
+    properties = data.get("properties") or {}
+    chunk_id = properties.get("chunk id")
+    chunk_ids = [] if chunk_id is None else [str(c) for c in chunk_id] if isinstance(chunk_id, list) else [str(chunk_id)]
+    chunk_ids.extend(str(c) for c in properties.get("chunk ids", ()))
+    return chunk_ids
+
+
+def build_community_index(graph: nx.MultiDiGraph, owner: Dict[str, int], encoder, batch_size: int = 64) -> Dict[str, np.ndarray]:
+    """Normalized embeddings of every community's name and description, with the owning shard"""
+    comm_ids, texts = [], []
+    for node, data in graph.nodes(data=True):
+        if data.get("level") != 4:
+            continue
+        properties = data.get("properties") or {}
+        text = str(properties.get("name", ""))
+        if properties.get("description"):
+            text = f"{text}. {properties['description']}"
+        comm_ids.append(node)
+        texts.append(text)
+
+    if texts:
+        embeddings = np.asarray(encoder.encode(texts, batch_size=batch_size, show_progress_bar=False), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.maximum(norms, 1e-12)
+    else:
+        embeddings = np.zeros((0, 0), dtype=np.float32)
+
+    return {
+        "community_ids": np.asarray(comm_ids, dtype=str),
+        "shard_ids": np.asarray([owner[c] for c in comm_ids], dtype=np.int32),
+        "embeddings": embeddings,
+    }
+
+
+def shard_dataset(
+    dataset: str,
+    num_shards: int,
+    graph_path: Optional[str] = None,
+    chunk_file: Optional[str] = None,
+    shard_dir: Optional[str] = None,
+    encoder=None,
+    config=None,
+) -> Dict:
+    """
+    Split a dataset's graph into num_shards shards and write graphs, chunk files, the community
+    routing index and the manifest. Returns the manifest.
+    """
+    if config is None and get_config is not None:
+        config = get_config()
+
+    if graph_path is None:
+        if config is not None and dataset in config.datasets:
+            graph_path = config.get_dataset_config(dataset).graph_output
+        else:
+            graph_path = f"output/graphs/{dataset}_new.json"
+    chunk_file = chunk_file or f"output/chunks/{dataset}.txt"
+    shard_dir = shard_dir or get_shard_dir(dataset)
+    graphs_dir = config.output.graphs_dir if config else "output/graphs"
+    chunks_dir = config.output.chunks_dir if config else "output/chunks"
+    model_name = config.embeddings.model_name if config else "all-MiniLM-L6-v2"
+    os.makedirs(shard_dir, exist_ok=True)
+    os.makedirs(graphs_dir, exist_ok=True)
+    os.makedirs(chunks_dir, exist_ok=True)
+
+    graph = graph_processor.load_graph_from_json(graph_path)
+    owner = assign_shards(graph, num_shards)
+
+    shards = []
+    for shard_id in range(num_shards):
+        name = get_shard_dataset_name(dataset, shard_id)
+        shard_graph = build_shard_graph(graph, owner, shard_id)
+        shard_graph_path = os.path.join(graphs_dir, f"{name}_new.json")
+        graph_processor.save_graph_to_json(shard_graph, shard_graph_path,
+                                           graph_format=config.output.graph_format if config else "normalized")
+
+        num_chunks = 0
+        if os.path.exists(chunk_file):
+            chunk_ids = {cid for _, data in shard_graph.nodes(data=True) for cid in _node_chunk_ids(data)}
+            num_chunks = _write_shard_chunks(chunk_file, os.path.join(chunks_dir, f"{name}.txt"), chunk_ids)
+
+        num_owned = sum(1 for shard in owner.values() if shard == shard_id)
+        shards.append({
+            "shard_id": shard_id,
+            "dataset": name,
+            "graph_path": shard_graph_path,
+            "owned_nodes": num_owned,
+            "boundary_nodes": shard_graph.number_of_nodes() - num_owned,
+            "edges": shard_graph.number_of_edges(),
+            "chunks": num_chunks,
+        })
+        logger.info(f"Shard {shard_id}: {num_owned} owned + {shard_graph.number_of_nodes() - num_owned} boundary nodes, "
+                    f"{shard_graph.number_of_edges()} edges, {num_chunks} chunks -> {shard_graph_path}")
+
+    if encoder is None:
+        from sentence_transformers import SentenceTransformer
+        encoder = SentenceTransformer(model_name)
+    index = build_community_index(graph, owner, encoder)
+    np.savez(os.path.join(shard_dir, COMMUNITY_INDEX_NAME), **index)
+
+    manifest = {
+        "dataset": dataset,
+        "source_graph": graph_path,
+        "num_shards": num_shards,
+        "embedding_model": model_name,
+        "num_nodes": graph.number_of_nodes(),
+        "num_edges": graph.number_of_edges(),
+        "num_communities": int(len(index["community_ids"])),
+        "shards": shards,
+    }
+    with open(os.path.join(shard_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    logger.info(f"Sharded {dataset} into {num_shards} shards, manifest written to {shard_dir}")
+    return manifest
+
+
+def load_manifest(shard_dir: str) -> Dict:
+    with open(os.path.join(shard_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_shard_indices(manifest: Dict, schema_path: Optional[str] = None, config=None) -> None:
+    """Build the FAISS indices of every shard (stored under the regular cache dir per shard dataset)"""
+    from models.retriever.enhanced_kt_retriever import KTRetriever
+
+    if config is None and get_config is not None:
+        config = get_config()
+    schema_path = schema_path or get_dataset_schema_path(manifest["dataset"], config)
+
+    for shard in manifest["shards"]:
+        logger.info(f"Building FAISS indices for shard {shard['shard_id']} ({shard['dataset']})")
+        retriever = KTRetriever(shard["dataset"], shard["graph_path"], schema_path=schema_path, config=config)
+        retriever.build_indices()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split a constructed graph into community-based shards")
+    parser.add_argument("--dataset", required=True, help="Dataset whose graph should be sharded")
+    parser.add_argument("--num-shards", type=int, required=True, help="Number of shards")
+    parser.add_argument("--graph", help="Graph JSON path (defaults to the dataset's graph_output)")
+    parser.add_argument("--shard-dir", help="Directory for the manifest and routing index")
+    parser.add_argument("--build-indices", action="store_true", help="Also build the FAISS indices of every shard")
+    args = parser.parse_args()
+
+    result = shard_dataset(args.dataset, args.num_shards, graph_path=args.graph, shard_dir=args.shard_dir)
+    if args.build_indices:
+        build_shard_indices(result)
@@ -0,0 +1,202 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+from utils.logger import logger
+
+BALANCING_STRATEGIES = ("least_outstanding", "latency")
+
+# circuit breaker states
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+@dataclass
+class LLMEndpoint:
+    """One OpenAI-compatible endpoint / key plus its live health state"""
+    name: str
+    base_url: str
+    api_key: str
+    model: str
+    weight: float = 1.0
+    outstanding: int = 0
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    latency_ewma: float = 0.0  # seconds, 0 until the first success
+    state: str = CLOSED
+    opened_at: float = 0.0
+
+
+def load_endpoints(default_model: str, default_base_url: str, default_api_key: str) -> List[LLMEndpoint]:
+    """
+    Endpoints from LLM_ENDPOINTS, a JSON list of {"api_key", "base_url", "model", "weight", "name"} objects
+    (everything but api_key defaults to LLM_MODEL / LLM_BASE_URL / weight 1), or the single
+    LLM_BASE_URL / LLM_API_KEY endpoint when it is not set. All endpoints must serve the same model:
+    responses are cached and recorded under the model name before an endpoint is picked.
+    """
+    raw = os.getenv("LLM_ENDPOINTS", "").strip()
+    if not raw:
+        return [LLMEndpoint("default", default_base_url, default_api_key, default_model)]
+
+    try:
+        specs = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"LLM_ENDPOINTS is not valid JSON: {e}")
+    if not isinstance(specs, list) or not specs:
+        raise ValueError("LLM_ENDPOINTS must be a non-empty JSON list of endpoint objects")
+
+    endpoints = []
+    for i, spec in enumerate(specs):
+        if not spec.get("api_key"):
+            raise ValueError(f"LLM_ENDPOINTS[{i}] has no api_key")
+        weight = float(spec.get("weight", 1.0))
+        if weight <= 0:
+            raise ValueError(f"LLM_ENDPOINTS[{i}] weight must be positive")
+        endpoints.append(LLMEndpoint(
+            name=spec.get("name", f"endpoint-{i}"),
+            base_url=spec.get("base_url", default_base_url),
+            api_key=spec["api_key"],
+            model=spec.get("model", default_model),
+            weight=weight,
+        ))
+
+    models = sorted({endpoint.model for endpoint in endpoints})
+    if len(models) > 1:
+        raise ValueError(f"LLM_ENDPOINTS must all serve the same model, got {models}")
+    return endpoints
+
+
+class EndpointPool:
+    """
+    Routes LLM requests over several endpoints with a circuit breaker per endpoint.
+
+    Strategy "least_outstanding" picks the endpoint with the fewest in-flight requests per unit of
+    weight; "latency" weighs that load by the endpoint's latency EWMA (endpoints without samples go
+    first so they get measured). failure_threshold consecutive failures open an endpoint's circuit and
+    take it out of rotation; after cooldown seconds one probe request is let through (half-open) and
+    its outcome closes or re-opens the circuit. If every circuit is open the endpoint that has been
+    ejected longest is used anyway rather than failing the request. Thread-safe.
+    """
+
+    def __init__(self, endpoints: List[LLMEndpoint], strategy: str = "least_outstanding",
+                 failure_threshold: int = 5, cooldown: float = 30.0, latency_alpha: float = 0.2):
+        if strategy not in BALANCING_STRATEGIES:
+            raise ValueError(f"Invalid balancing strategy: {strategy}. Must be one of {list(BALANCING_STRATEGIES)}")
+        if not endpoints:
+            raise ValueError("EndpointPool needs at least one endpoint")
+        if len({endpoint.model for endpoint in endpoints}) > 1:
+            raise ValueError("All endpoints of an EndpointPool must serve the same model")
+        self.endpoints = endpoints
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.latency_alpha = latency_alpha
+        self._lock = threading.Lock()
+        if len(endpoints) > 1:
+            logger.info(f"Balancing LLM requests over {len(endpoints)} endpoints ({strategy}): "
+                        f"{', '.join(e.name for e in endpoints)}")
+
+    @property
+    def model(self) -> str:
+        """The model every endpoint serves"""
+        return self.endpoints[0].model
+
+    def _load(self, endpoint: LLMEndpoint) -> float:
+        load = (endpoint.outstanding + 1) / endpoint.weight
+        if self.strategy == "latency":
+            load *= endpoint.latency_ewma
+        return load
+
+    def acquire(self) -> LLMEndpoint:
+        """Pick an endpoint for one request attempt; pair every acquire with a release."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = []
+            for endpoint in self.endpoints:
+                if endpoint.state == OPEN and now - endpoint.opened_at >= self.cooldown:
+                    endpoint.state = HALF_OPEN
+                    endpoint.opened_at = now
+                    # the first caller to see the cooldown expire sends the probe
+                    chosen = endpoint
+                    break
+                if endpoint.state == CLOSED:
+                    candidates.append(endpoint)
+            else:
+                if candidates:
+                    chosen = min(candidates, key=lambda e: (self._load(e), e.outstanding))
+                else:
+                    chosen = min(self.endpoints, key=lambda e: e.opened_at)
+            chosen.outstanding += 1
+            chosen.requests += 1
+            return chosen
+
+    def release(self, endpoint: LLMEndpoint, latency: Optional[float], failed: bool = False) -> None:
+        """
+        Report the outcome of a request attempt: a latency for a success, failed=True for errors that say
+        something about the endpoint (throttling, 5xx, connection / auth failures), or neither for an
+        attempt without a health signal (bad request, cancelled, abandoned stream).
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            if failed:
+                endpoint.failures += 1
+                endpoint.consecutive_failures += 1
+                if endpoint.state == HALF_OPEN or endpoint.consecutive_failures >= self.failure_threshold:
+                    if endpoint.state != OPEN:
+                        logger.warning(f"LLM endpoint {endpoint.name} ejected after "
+                                       f"{endpoint.consecutive_failures} consecutive failure(s)")
+                    endpoint.state = OPEN
+                    endpoint.opened_at = time.monotonic()
+                return
+            if latency is None:
+                if endpoint.state == HALF_OPEN:
+                    # the probe told us nothing, let the next caller probe again
+                    endpoint.state = OPEN
+                    endpoint.opened_at = time.monotonic() - self.cooldown
+                return
+
+            if endpoint.state != CLOSED:
+                logger.info(f"LLM endpoint {endpoint.name} recovered")
+            endpoint.state = CLOSED
+            endpoint.consecutive_failures = 0
+            if endpoint.latency_ewma == 0.0:
+                endpoint.latency_ewma = latency
+            else:
+                endpoint.latency_ewma += self.latency_alpha * (latency - endpoint.latency_ewma)
+
+    @contextmanager
+    def attempt(self, is_failure: Callable[[Exception], bool]) -> Iterator[LLMEndpoint]:
+        """acquire() an endpoint for the body of the with block and release() it with the outcome"""
+        endpoint = self.acquire()
+        start = time.monotonic()
+        try:
+            yield endpoint
+        except Exception as e:
+            self.release(endpoint, None, failed=is_failure(e))
+            raise
+        except BaseException:
+            self.release(endpoint, None)
+            raise
+        else:
+            self.release(endpoint, time.monotonic() - start)
+
+    def stats(self) -> List[Dict]:
+        with self._lock:
+            return [
+                {
+                    "name": e.name,
+                    "base_url": e.base_url,
+                    "model": e.model,
+                    "weight": e.weight,
+                    "state": e.state,
+                    "outstanding": e.outstanding,
+                    "requests": e.requests,
+                    "failures": e.failures,
+                    "latency_ewma_ms": round(e.latency_ewma * 1000, 1),
+                }
+                for e in self.endpoints
+            ]
@@ -0,0 +1,173 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class HedgePolicy:
+    """
+    When to send a duplicate ("hedge") of a slow LLM request.
+
+    The hedge delay is the given percentile of the last window observed latencies (at least
+    min_delay); no hedges are sent until min_samples latencies have been seen. Hedges are rate
+    limited by a token bucket that earns max_rate tokens per request (a hedge costs one, at most
+    `burst` are banked), so hedges never exceed max_rate of requests plus the burst. Thread-safe.
+    """
+
+    def __init__(self, percentile: float = 95.0, min_delay: float = 1.0, max_rate: float = 0.1,
+                 window: int = 200, min_samples: int = 20, burst: float = 2.0):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_rate = max_rate
+        self.min_samples = min_samples
+        self.burst = burst
+        self._latencies = deque(maxlen=window)
+        self._tokens = burst
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "hedges": 0, "hedge_wins": 0}
+
+    def start_request(self) -> Optional[float]:
+        """Count a hedgeable request; seconds to wait before hedging it, None if it must not be hedged"""
+        with self._lock:
+            self.counters["requests"] += 1
+            self._tokens = min(self.burst, self._tokens + self.max_rate)
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+            index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+            return max(self.min_delay, ordered[index])
+
+    def try_hedge(self) -> bool:
+        """Take a hedge token; False when the hedge rate budget is exhausted"""
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            self.counters["hedges"] += 1
+            return True
+
+    def record(self, latency: float, hedge_won: bool = False) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+            if hedge_won:
+                self.counters["hedge_wins"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+
+def hedged_call(policy: HedgePolicy, executor: concurrent.futures.Executor, fn: Callable[[], T]) -> T:
+    """
+    Run fn on executor; if it has not finished after the policy's hedge delay, run a second fn and
+    return whichever succeeds first. A request already sent cannot be aborted from another thread,
+    so the losing call is abandoned and its result discarded. Raises the primary's error if both fail.
+    """
+    start = time.monotonic()
+    delay = policy.start_request()
+    primary = executor.submit(fn)
+    concurrent.futures.wait([primary], timeout=delay)
+    if primary.done() or delay is None or not policy.try_hedge():
+        result = primary.result()
+        policy.record(time.monotonic() - start)
+        return result
+
+    backup = executor.submit(fn)
+    pending = {primary, backup}
+    while pending:
+        done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                for other in pending:
+                    other.cancel()
+                policy.record(time.monotonic() - start, hedge_won=future is backup)
+                return future.result()
+    raise primary.exception()
+
+
+async def hedged_call_async(policy: HedgePolicy, factory: Callable[[], Awaitable[T]]) -> T:
+    """Event-loop counterpart of hedged_call; the losing request is cancelled."""
+    start = time.monotonic()
+    delay = policy.start_request()
+    primary = asyncio.ensure_future(factory())
+    tasks = [primary]
+    try:
+        await asyncio.wait({primary}, timeout=delay)
+        if primary.done() or delay is None or not policy.try_hedge():
+            result = await primary
+            policy.record(time.monotonic() - start)
+            return result
+
+        backup = asyncio.ensure_future(factory())
+        tasks.append(backup)
+        pending = {primary, backup}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    policy.record(time.monotonic() - start, hedge_won=task is backup)
+                    return task.result()
+        return primary.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def hedged_stream_async(policy: HedgePolicy, factory: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+    """
+    Hedge an async stream on its first item: if the first item has not arrived after the hedge
+    delay, open a second stream and continue with whichever delivers first; the other is cancelled.
+    """
+    start = time.monotonic()
+    delay = policy.start_request()
+    streams = {}
+
+    def open_stream():
+        stream = factory().__aiter__()
+        streams[asyncio.ensure_future(stream.__anext__())] = stream
+
+    open_stream()
+    primary_task = next(iter(streams))
+    winner, first, error = None, None, None
+    hedged = delay is None
+    try:
+        while winner is None:
+            timeout = None if hedged else max(0.0, delay - (time.monotonic() - start))
+            done, _ = await asyncio.wait(set(streams), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                if policy.try_hedge():
+                    open_stream()
+                continue
+            for task in done:
+                stream = streams.pop(task)
+                try:
+                    first = task.result()
+                except StopAsyncIteration:
+                    first = None
+                except Exception as e:
+                    # report the primary's error if every stream fails
+                    if error is None or task is primary_task:
+                        error = e
+                    continue
+                winner = stream
+                policy.record(time.monotonic() - start, hedge_won=task is not primary_task)
+                break
+            if winner is None and not streams:
+                raise error
+    finally:
+        for task, stream in streams.items():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await stream.aclose()
+
+    if first is None:
+        return
+    yield first
+    async for item in winner:
+        yield item
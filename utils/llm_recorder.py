@@ -0,0 +1,98 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from utils.logger import logger
+
+
+class ReplayMissError(RuntimeError):
+    """A replayed run issued an LLM request that is not in the recording"""
+
+
+class LLMRecorder:
+    """
+    Record / replay of LLM traffic as JSON lines {"key", "response", "latency"}.
+
+    key is the request hash of make_cache_key(model, prompt, temperature) and latency the seconds the
+    call took when it was recorded. In record mode every completed call is appended to path. In replay
+    mode responses are served from path without any network access; a key recorded several times is
+    answered with its responses in recorded order (cycling), and each answer is delayed by
+    latency * latency_scale (0 = answer immediately). Safe to share between threads.
+    """
+
+    def __init__(self, path: str, mode: str = "record", latency_scale: float = 0.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Invalid LLM recorder mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+        self._positions: Dict[str, int] = defaultdict(int)
+        self.counters = {"recorded": 0, "replayed": 0, "misses": 0}
+
+        if mode == "replay":
+            self._load()
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            logger.info(f"Recording LLM traffic to {path}")
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"LLM recording not found: {self.path}")
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # a run killed mid-write leaves a truncated last line
+                    logger.warning(f"Skipping malformed line {line_no} in {self.path}")
+                    continue
+                self._entries[entry["key"]].append((entry["response"], float(entry.get("latency", 0.0))))
+        total = sum(len(responses) for responses in self._entries.values())
+        logger.info(f"Replaying LLM traffic from {self.path}: {total} responses for {len(self._entries)} requests")
+
+    def record(self, key: str, response: str, latency: float) -> None:
+        line = json.dumps({"key": key, "response": response, "latency": round(latency, 4)}, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self.counters["recorded"] += 1
+
+    def _next(self, key: str) -> Tuple[str, float]:
+        with self._lock:
+            responses = self._entries.get(key)
+            if not responses:
+                self.counters["misses"] += 1
+                raise ReplayMissError(f"No recorded LLM response for request {key[:12]} in {self.path}")
+            position = self._positions[key]
+            self._positions[key] = position + 1
+            self.counters["replayed"] += 1
+            return responses[position % len(responses)]
+
+    def replay(self, key: str) -> str:
+        response, latency = self._next(key)
+        if self.latency_scale > 0 and latency > 0:
+            time.sleep(latency * self.latency_scale)
+        return response
+
+    async def replay_async(self, key: str) -> str:
+        response, latency = self._next(key)
+        if self.latency_scale > 0 and latency > 0:
+            await asyncio.sleep(latency * self.latency_scale)
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
@@ -0,0 +1,195 @@
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from utils.logger import logger
+
+# property keys that are not part of a node's formatted "extra properties"
+SKIP_PROPERTY_FIELDS = {'name', 'description', 'properties', 'label', 'chunk id', 'chunk ids', 'level'}
+
+
+def property_text(value) -> str:
+    """Flatten a property value (lists are comma-joined) to a string"""
+    if isinstance(value, list):
+        return ", ".join(str(item) for item in value)
+    return value if isinstance(value, str) else str(value)
+
+
+def node_properties(data: Dict) -> Dict:
+    """Properties dict of a node, handling both the nested and the legacy flat node layout"""
+    properties = data.get('properties')
+    return properties if isinstance(properties, dict) else data
+
+
+def format_extra_properties(data: Dict) -> str:
+    """'[key: value, ...]' for every property except name/description/chunk id/structural fields"""
+    parts = []
+    for source in (data.get('properties', {}), data):
+        if not isinstance(source, dict):
+            continue
+        for key, value in source.items():
+            if key in SKIP_PROPERTY_FIELDS:
+                continue
+            value_str = ", ".join(map(str, value)) if isinstance(value, list) else str(value)
+            parts.append(f"{key}: {value_str}")
+    return f"[{', '.join(parts)}]" if parts else ""
+
+
+class _Interner:
+    """Dense integer codes for a repeated string column; code -1 means missing"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+class NodeTable:
+    """
+    Columnar node attributes, row-aligned with CompactGraph node ids.
+
+    Names, descriptions and formatted extra properties are plain string columns (name/description
+    already flattened); chunk ids, schema types and labels are interned into small vocabularies and
+    stored as int32 codes (-1 = missing) next to an int8 level column, so batch lookups such as
+    "chunk ids of these nodes" or "nodes of these schema types" are numpy operations. Nodes whose
+    "chunk ids" provenance lists more chunks than their primary "chunk id" (deduplicated attribute
+    nodes) keep the additional codes in a small side table.
+
+    With store_text=False only the coded columns are kept in memory and the string columns are read
+    from the graph on demand (used with the disk-resident SQLite graph store).
+    """
+
+    def __init__(self, graph, node_index: Dict[str, int], store_text: bool = True):
+        self.graph = graph
+        self.node_index = node_index
+        self.node_ids: List[str] = [None] * len(node_index)
+        for node, idx in node_index.items():
+            self.node_ids[idx] = node
+        self.store_text = store_text
+
+        chunk_vocab, schema_vocab, label_vocab = _Interner(), _Interner(), _Interner()
+        num_nodes = len(self.node_ids)
+        chunk_codes = np.full(num_nodes, -1, dtype=np.int32)
+        schema_codes = np.full(num_nodes, -1, dtype=np.int32)
+        label_codes = np.full(num_nodes, -1, dtype=np.int32)
+        levels = np.zeros(num_nodes, dtype=np.int8)
+        extra_chunk_codes: Dict[int, List[int]] = {}
+        names: List[Optional[str]] = [None] * num_nodes if store_text else None
+        descriptions: List[str] = [""] * num_nodes if store_text else None
+        extras: List[str] = [""] * num_nodes if store_text else None
+
+        for node, data in graph.nodes(data=True):
+            idx = node_index.get(node)
+            if idx is None:
+                continue
+            properties = node_properties(data)
+            chunk_id = properties.get('chunk id')
+            chunk_codes[idx] = chunk_vocab.code(str(chunk_id) if chunk_id else None)
+            provenance = properties.get('chunk ids')
+            if provenance:
+                extra = [chunk_vocab.code(str(c)) for c in provenance if c and c != chunk_id]
+                if extra:
+                    extra_chunk_codes[idx] = extra
+            schema_codes[idx] = schema_vocab.code(properties.get('schema_type') or None)
+            label_codes[idx] = label_vocab.code(data.get('label'))
+            levels[idx] = data.get('level') or 0
+            if store_text:
+                if 'name' in properties:
+                    names[idx] = property_text(properties['name'])
+                descriptions[idx] = property_text(properties.get('description', ''))
+                extras[idx] = format_extra_properties(data)
+
+        self.chunk_vocab, self.schema_vocab, self.label_vocab = chunk_vocab, schema_vocab, label_vocab
+        self.chunk_codes, self.schema_codes, self.label_codes, self.levels = chunk_codes, schema_codes, label_codes, levels
+        self.extra_chunk_codes = extra_chunk_codes
+        self.names, self.descriptions, self.extras = names, descriptions, extras
+        logger.info(f"Built node table: {num_nodes} nodes, {len(chunk_vocab.values)} chunk ids, "
+                    f"{len(schema_vocab.values)} schema types")
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def __contains__(self, node) -> bool:
+        return node in self.node_index
+
+    def rows(self, nodes: Iterable[str]) -> np.ndarray:
+        node_index = self.node_index
+        return np.asarray([node_index[n] for n in nodes if n in node_index], dtype=np.int64)
+
+    def _data(self, node: str) -> Dict:
+        return self.graph.nodes[node]
+
+    def name(self, node: str) -> Optional[str]:
+        """Flattened name of a node, None if unknown or unnamed"""
+        idx = self.node_index.get(node)
+        if idx is None:
+            return None
+        if self.store_text:
+            return self.names[idx]
+        properties = node_properties(self._data(node))
+        return property_text(properties['name']) if 'name' in properties else None
+
+    def text(self, node: str) -> Optional[str]:
+        """'name description' of a node ('[Node: id]' when both are empty), None if unknown"""
+        idx = self.node_index.get(node)
+        if idx is None:
+            return None
+        if self.store_text:
+            name, description = self.names[idx] or "", self.descriptions[idx]
+        else:
+            properties = node_properties(self._data(node))
+            name = property_text(properties.get('name', ''))
+            description = property_text(properties.get('description', ''))
+        result = f"{name} {description}".strip()
+        return result or f"[Node: {node}]"
+
+    def texts(self) -> Iterable:
+        """(node id, text) for every node"""
+        return ((node, self.text(node)) for node in self.node_ids)
+
+    def extra_properties(self, node: str) -> str:
+        idx = self.node_index.get(node)
+        if idx is None:
+            return ""
+        return self.extras[idx] if self.store_text else format_extra_properties(self._data(node))
+
+    def chunk_id(self, node: str) -> Optional[str]:
+        idx = self.node_index.get(node)
+        if idx is None:
+            return None
+        code = self.chunk_codes[idx]
+        return self.chunk_vocab.values[code] if code >= 0 else None
+
+    def chunk_ids(self, nodes: Iterable[str]) -> Set[str]:
+        """Distinct chunk ids referenced by the given nodes (including their provenance lists)"""
+        rows = self.rows(nodes)
+        codes = self.chunk_codes[rows]
+        values = self.chunk_vocab.values
+        chunk_ids = {values[code] for code in np.unique(codes[codes >= 0]).tolist()}
+        if self.extra_chunk_codes:
+            for row in rows.tolist():
+                for code in self.extra_chunk_codes.get(row, ()):
+                    chunk_ids.add(values[code])
+        return chunk_ids
+
+    def nodes_with_schema_types(self, schema_types: Iterable[str]) -> List[str]:
+        """
+        Nodes whose schema_type is one of schema_types, plus entity nodes without a schema_type
+        (backward compatibility), in node order.
+        """
+        type_codes = [self.schema_vocab.codes[t] for t in schema_types if t in self.schema_vocab.codes]
+        mask = np.isin(self.schema_codes, np.asarray(type_codes, dtype=np.int32))
+        entity_code = self.label_vocab.codes.get('entity')
+        if entity_code is not None:
+            mask |= (self.schema_codes < 0) & (self.label_codes == entity_code)
+        node_ids = self.node_ids
+        return [node_ids[i] for i in np.flatnonzero(mask).tolist()]
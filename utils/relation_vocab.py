@@ -0,0 +1,132 @@
+import json
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import networkx as nx
+import numpy as np
+
+
+class RelationVocab:
+    """
+    Interned relation vocabulary: every distinct relation string gets a dense integer id.
+    Built from a graph the ids follow the sorted relation order, which is also the row order
+    of the FAISS relation index, so relation ids and relation index ids coincide.
+    """
+
+    def __init__(self, relations: Optional[Iterable[str]] = None):
+        self.relations: List[str] = []
+        self.relation_ids: Dict[str, int] = {}
+        for relation in relations or []:
+            self.intern(relation)
+
+    @classmethod
+    def from_graph(cls, graph: nx.MultiDiGraph) -> "RelationVocab":
+        return cls(sorted({data["relation"] for _, _, data in graph.edges(data=True) if "relation" in data}))
+
+    def intern(self, relation: str) -> int:
+        rid = self.relation_ids.get(relation)
+        if rid is None:
+            rid = len(self.relations)
+            self.relation_ids[relation] = rid
+            self.relations.append(relation)
+        return rid
+
+    def id(self, relation: str) -> Optional[int]:
+        return self.relation_ids.get(relation)
+
+    def ids(self, relations: Iterable[str]) -> List[int]:
+        """Ids of the known relations among the given ones"""
+        relation_ids = self.relation_ids
+        return [relation_ids[r] for r in relations if r in relation_ids]
+
+    def __getitem__(self, rid: int) -> str:
+        return self.relations[rid]
+
+    def __len__(self) -> int:
+        return len(self.relations)
+
+    def __contains__(self, relation) -> bool:
+        return relation in self.relation_ids
+
+    def canonicalize(self, graph: nx.MultiDiGraph) -> None:
+        """Point every edge's relation at the vocabulary's string object instead of a per-edge copy"""
+        for _, _, data in graph.edges(data=True):
+            relation = data.get("relation")
+            if relation is not None:
+                data["relation"] = self.relations[self.intern(relation)]
+
+    def save(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.relations, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "RelationVocab":
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+
+class TripleTable:
+    """
+    Row-aligned (head, relation id, tail) table behind the FAISS triple index.
+    Indexing by row (int or str, like the former triple_map dict) returns a (head, relation, tail)
+    tuple whose relation is the vocabulary's shared string.
+    """
+
+    def __init__(self, vocab: RelationVocab, heads: Sequence[str] = (), relation_ids: Sequence[int] = (),
+                 tails: Sequence[str] = ()):
+        self.vocab = vocab
+        self.heads = list(heads)
+        self.relation_ids = np.asarray(relation_ids, dtype=np.int32)
+        self.tails = list(tails)
+
+    @classmethod
+    def from_triples(cls, triples: Iterable[Tuple[str, str, str]], vocab: RelationVocab) -> "TripleTable":
+        heads, relation_ids, tails = [], [], []
+        for h, r, t in triples:
+            heads.append(h)
+            relation_ids.append(vocab.intern(r))
+            tails.append(t)
+        return cls(vocab, heads, relation_ids, tails)
+
+    @classmethod
+    def from_json(cls, data: Dict[str, list], vocab: RelationVocab,
+                  stored_vocab: Optional[RelationVocab] = None) -> "TripleTable":
+        """
+        Load a persisted triple map {row: [head, relation, tail]}.
+        Relations may be ids into stored_vocab (the vocabulary saved with the index) or plain strings
+        (maps written before relation ids); both are re-interned into vocab.
+        """
+        rows = sorted(data.items(), key=lambda item: int(item[0]))
+        triples = []
+        for _, (h, r, t) in rows:
+            if isinstance(r, int):
+                if stored_vocab is None:
+                    raise ValueError("Triple map stores relation ids but no relation vocabulary was saved with it")
+                r = stored_vocab[r]
+            triples.append((h, r, t))
+        return cls.from_triples(triples, vocab)
+
+    def to_json(self) -> Dict[int, list]:
+        return {i: [h, int(r), t] for i, (h, r, t) in enumerate(zip(self.heads, self.relation_ids.tolist(), self.tails))}
+
+    def _row(self, key: Union[int, str]) -> int:
+        try:
+            row = int(key)
+        except (TypeError, ValueError):
+            raise KeyError(key)
+        if not 0 <= row < len(self.heads):
+            raise KeyError(key)
+        return row
+
+    def __getitem__(self, key: Union[int, str]) -> Tuple[str, str, str]:
+        row = self._row(key)
+        return self.heads[row], self.vocab[self.relation_ids[row]], self.tails[row]
+
+    def __contains__(self, key) -> bool:
+        try:
+            self._row(key)
+            return True
+        except KeyError:
+            return False
+
+    def __len__(self) -> int:
+        return len(self.heads)
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key: the first caller runs fn, callers arriving while it
+    is in flight wait for and share its result (or exception). Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class AsyncSingleFlight:
+    """
+    Event-loop counterpart of SingleFlight: concurrent awaits of the same key on one loop share a
+    single task. A cancelled waiter does not cancel the shared task.
+    """
+
+    def __init__(self):
+        # per event loop: key -> in-flight task
+        self._calls = weakref.WeakKeyDictionary()
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+        task = calls.get(key)
+        if task is None:
+            task = loop.create_task(factory())
+            calls[key] = task
+            task.add_done_callback(lambda done: calls.pop(key, None) if calls.get(key) is done else None)
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
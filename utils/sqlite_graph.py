@@ -0,0 +1,376 @@
+"""
+Disk-resident graph store backed by a local SQLite file.
+
+Nodes, edges, relations and chunks live in tables with adjacency indexes; FTS5 indexes cover
+node text (name, description) and chunk text. SQLiteGraph exposes the read-only subset of the
+networkx MultiDiGraph interface the retrievers use (nodes view, neighbors, edges, in/out edges,
+get_edge_data), so resident memory is bounded by SQLite's page cache plus a small LRU of node
+attribute dicts instead of the whole graph.
+
+Usage:
+    python -m utils.sqlite_graph output/graphs/hotpot_new.json --chunks output/chunks/hotpot.txt
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import networkx as nx
+
+from utils import graph_processor
+from utils.logger import logger
+
+SQLITE_SUFFIX = ".sqlite"
+SQLITE_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE nodes (
+    idx INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    label TEXT,
+    level INTEGER,
+    name TEXT,
+    description TEXT,
+    properties TEXT
+);
+CREATE TABLE relations (id INTEGER PRIMARY KEY, relation TEXT NOT NULL UNIQUE);
+CREATE TABLE edges (idx INTEGER PRIMARY KEY, src INTEGER NOT NULL, dst INTEGER NOT NULL, rel INTEGER NOT NULL);
+CREATE INDEX edges_src ON edges (src, idx);
+CREATE INDEX edges_dst ON edges (dst, idx);
+CREATE TABLE chunks (rowid INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, text TEXT);
+CREATE VIRTUAL TABLE node_fts USING fts5 (name, description, content='nodes', content_rowid='idx');
+CREATE VIRTUAL TABLE chunk_fts USING fts5 (text, content='chunks', content_rowid='rowid');
+"""
+
+
+def get_sqlite_path(json_path: str) -> str:
+    """SQLite store path written next to a graph JSON file"""
+    return os.path.splitext(json_path)[0] + SQLITE_SUFFIX
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, list):
+        return ", ".join(str(item) for item in value)
+    return value if isinstance(value, str) else str(value)
+
+
+def read_chunk_file(chunk_file: str) -> Iterator[Tuple[str, str]]:
+    """(chunk id, text) pairs from an output/chunks/{dataset}.txt file"""
+    with open(chunk_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and "\t" in line:
+                chunk_id, chunk_text = line.split("\t", 1)
+                if chunk_id.startswith("id: ") and chunk_text.startswith("Chunk: "):
+                    yield chunk_id[4:], chunk_text[7:]
+
+
+def build_sqlite_graph(graph: nx.MultiDiGraph, db_path: str, chunks=None, source_hash: str = "") -> None:
+    """
+    Write a graph (and optionally (chunk id, text) pairs) to a new SQLite store.
+    The file is written under a temporary name and renamed, so readers never see a partial store.
+    """
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;")
+        conn.executescript(_SCHEMA)
+
+        node_index = {}
+
+        def node_rows():
+            for i, (node, data) in enumerate(graph.nodes(data=True)):
+                node_index[node] = i
+                properties = data.get("properties") or {}
+                yield (
+                    i, str(node), data.get("label"), data.get("level"),
+                    _text(properties.get("name", "")), _text(properties.get("description", "")),
+                    json.dumps(properties, ensure_ascii=False),
+                )
+
+        conn.executemany("INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?)", node_rows())
+
+        relation_ids = {}
+
+        def edge_rows():
+            for i, (u, v, data) in enumerate(graph.edges(data=True)):
+                relation = data.get("relation", "")
+                rid = relation_ids.setdefault(relation, len(relation_ids))
+                yield i, node_index[u], node_index[v], rid
+
+        conn.executemany("INSERT INTO edges VALUES (?, ?, ?, ?)", edge_rows())
+        conn.executemany("INSERT INTO relations VALUES (?, ?)", ((rid, r) for r, rid in relation_ids.items()))
+
+        if chunks is not None:
+            conn.executemany("INSERT OR REPLACE INTO chunks (id, text) VALUES (?, ?)", chunks)
+
+        conn.execute("INSERT INTO node_fts (node_fts) VALUES ('rebuild')")
+        conn.execute("INSERT INTO chunk_fts (chunk_fts) VALUES ('rebuild')")
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("schema_version", str(SQLITE_SCHEMA_VERSION)),
+            ("source_hash", source_hash),
+        ])
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+
+
+class SQLiteNodeView:
+    """graph.nodes replacement: membership, attribute lookup and iteration backed by the nodes table"""
+
+    def __init__(self, store: "SQLiteGraph"):
+        self._store = store
+
+    def __call__(self, data: bool = False):
+        if data:
+            return ((row[0], self._store._attrs_from_row(row)) for row in
+                    self._store._query("SELECT id, label, level, properties FROM nodes ORDER BY idx"))
+        return iter(self)
+
+    def __iter__(self) -> Iterator[str]:
+        return (row[0] for row in self._store._query("SELECT id FROM nodes ORDER BY idx"))
+
+    def __len__(self) -> int:
+        return self._store.number_of_nodes()
+
+    def __contains__(self, node) -> bool:
+        return self._store.has_node(node)
+
+    def __getitem__(self, node) -> Dict[str, Any]:
+        attrs = self._store.node_attributes(node)
+        if attrs is None:
+            raise KeyError(node)
+        return attrs
+
+    def get(self, node, default=None):
+        attrs = self._store.node_attributes(node)
+        return default if attrs is None else attrs
+
+
+class SQLiteChunkMap(Mapping):
+    """Read-only chunk id -> text mapping over the chunks table (drop-in for KTRetriever.chunk2id)"""
+
+    def __init__(self, store: "SQLiteGraph"):
+        self._store = store
+
+    def __getitem__(self, chunk_id: str) -> str:
+        rows = self._store._query("SELECT text FROM chunks WHERE id = ?", (chunk_id,))
+        if not rows:
+            raise KeyError(chunk_id)
+        return rows[0][0]
+
+    def __contains__(self, chunk_id) -> bool:
+        return bool(self._store._query("SELECT 1 FROM chunks WHERE id = ?", (chunk_id,)))
+
+    def __iter__(self) -> Iterator[str]:
+        return (row[0] for row in self._store._query("SELECT id FROM chunks ORDER BY rowid"))
+
+    def __len__(self) -> int:
+        return self._store._query("SELECT COUNT(*) FROM chunks")[0][0]
+
+
+class SQLiteGraph:
+    """Read-only, networkx-compatible view of a SQLite graph store (see module docstring)"""
+
+    def __init__(self, db_path: str, attr_cache_size: int = 10000, page_cache_mb: int = 64):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"SQLite graph store not found: {db_path}")
+        self.db_path = db_path
+        self.attr_cache_size = attr_cache_size
+        self.page_cache_mb = page_cache_mb
+        self._local = threading.local()
+        self._attr_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._attr_lock = threading.Lock()
+        self.nodes = SQLiteNodeView(self)
+        self.chunks = SQLiteChunkMap(self)
+        self.meta = dict(self._query("SELECT key, value FROM meta"))
+        self._num_nodes = self._query("SELECT COUNT(*) FROM nodes")[0][0]
+        self._num_edges = self._query("SELECT COUNT(*) FROM edges")[0][0]
+
+    def _conn(self) -> sqlite3.Connection:
+        # one read-only connection per thread; retrieval runs in thread pools
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+            conn.execute(f"PRAGMA cache_size = -{self.page_cache_mb * 1024}")
+            self._local.conn = conn
+        return conn
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        return self._conn().execute(sql, params).fetchall()
+
+    @staticmethod
+    def _attrs_from_row(row: Tuple) -> Dict[str, Any]:
+        return {"label": row[1], "level": row[2], "properties": json.loads(row[3]) if row[3] else {}}
+
+    @property
+    def source_hash(self) -> str:
+        return self.meta.get("source_hash", "")
+
+    def number_of_nodes(self) -> int:
+        return self._num_nodes
+
+    def number_of_edges(self) -> int:
+        return self._num_edges
+
+    def __len__(self) -> int:
+        return self._num_nodes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.nodes)
+
+    def __contains__(self, node) -> bool:
+        return self.has_node(node)
+
+    def has_node(self, node) -> bool:
+        if node in self._attr_cache:
+            return True
+        return bool(self._query("SELECT 1 FROM nodes WHERE id = ?", (node,)))
+
+    def node_attributes(self, node) -> Optional[Dict[str, Any]]:
+        """Attribute dict of a node (label, level, properties), served from a bounded LRU"""
+        with self._attr_lock:
+            attrs = self._attr_cache.get(node)
+            if attrs is not None:
+                self._attr_cache.move_to_end(node)
+                return attrs
+        rows = self._query("SELECT id, label, level, properties FROM nodes WHERE id = ?", (node,))
+        if not rows:
+            return None
+        attrs = self._attrs_from_row(rows[0])
+        with self._attr_lock:
+            self._attr_cache[node] = attrs
+            if len(self._attr_cache) > self.attr_cache_size:
+                self._attr_cache.popitem(last=False)
+        return attrs
+
+    def neighbors(self, node) -> Iterator[str]:
+        return self.successors(node)
+
+    def successors(self, node) -> Iterator[str]:
+        rows = self._query(
+            "SELECT d.id FROM nodes s JOIN edges e ON e.src = s.idx JOIN nodes d ON d.idx = e.dst "
+            "WHERE s.id = ? ORDER BY e.idx", (node,))
+        return iter(dict.fromkeys(row[0] for row in rows))
+
+    def predecessors(self, node) -> Iterator[str]:
+        rows = self._query(
+            "SELECT s.id FROM nodes d JOIN edges e ON e.dst = d.idx JOIN nodes s ON s.idx = e.src "
+            "WHERE d.id = ? ORDER BY e.idx", (node,))
+        return iter(dict.fromkeys(row[0] for row in rows))
+
+    def edges(self, data: bool = False):
+        cursor = self._conn().execute(
+            "SELECT s.id, d.id, r.relation FROM edges e JOIN nodes s ON s.idx = e.src "
+            "JOIN nodes d ON d.idx = e.dst JOIN relations r ON r.id = e.rel ORDER BY e.idx")
+        if data:
+            return ((u, v, {"relation": relation}) for u, v, relation in cursor)
+        return ((u, v) for u, v, _ in cursor)
+
+    def out_edges(self, node, data: bool = False):
+        rows = self._query(
+            "SELECT d.id, r.relation FROM nodes s JOIN edges e ON e.src = s.idx JOIN nodes d ON d.idx = e.dst "
+            "JOIN relations r ON r.id = e.rel WHERE s.id = ? ORDER BY e.idx", (node,))
+        if data:
+            return [(node, v, {"relation": relation}) for v, relation in rows]
+        return [(node, v) for v, _ in rows]
+
+    def in_edges(self, node, data: bool = False):
+        rows = self._query(
+            "SELECT s.id, r.relation FROM nodes d JOIN edges e ON e.dst = d.idx JOIN nodes s ON s.idx = e.src "
+            "JOIN relations r ON r.id = e.rel WHERE d.id = ? ORDER BY e.idx", (node,))
+        if data:
+            return [(u, node, {"relation": relation}) for u, relation in rows]
+        return [(u, node) for u, _ in rows]
+
+    def get_edge_data(self, u, v, default=None):
+        rows = self._query(
+            "SELECT r.relation FROM nodes s JOIN edges e ON e.src = s.idx JOIN nodes d ON d.idx = e.dst "
+            "JOIN relations r ON r.id = e.rel WHERE s.id = ? AND d.id = ? ORDER BY e.idx", (u, v))
+        if not rows:
+            return default
+        return {key: {"relation": row[0]} for key, row in enumerate(rows)}
+
+    @staticmethod
+    def _fts_query(term: str) -> str:
+        return '"' + term.replace('"', '""') + '"'
+
+    def search_nodes(self, keywords: List[str], per_keyword: int = 50, limit: int = 200) -> List[str]:
+        """Node ids whose name or description matches any keyword (FTS5, best matches first per keyword)"""
+        found = {}
+        for keyword in keywords:
+            if not keyword or not keyword.strip():
+                continue
+            rows = self._query(
+                "SELECT n.id FROM node_fts JOIN nodes n ON n.idx = node_fts.rowid "
+                "WHERE node_fts MATCH ? ORDER BY rank LIMIT ?", (self._fts_query(keyword), per_keyword))
+            found.update(dict.fromkeys(row[0] for row in rows))
+            if len(found) >= limit:
+                break
+        return list(found)[:limit]
+
+    def search_chunks(self, keywords: List[str], limit: int = 20) -> List[str]:
+        """Chunk ids whose text matches any keyword, best matches first"""
+        terms = [self._fts_query(k) for k in keywords if k and k.strip()]
+        if not terms:
+            return []
+        rows = self._query(
+            "SELECT c.id FROM chunk_fts JOIN chunks c ON c.rowid = chunk_fts.rowid "
+            "WHERE chunk_fts MATCH ? ORDER BY rank LIMIT ?", (" OR ".join(terms), limit))
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def load_sqlite_graph(json_path: str, chunk_file: Optional[str] = None, db_path: Optional[str] = None) -> SQLiteGraph:
+    """
+    Open the SQLite store of a graph JSON file, (re)building it when it is missing or was built
+    from different graph/chunk content.
+    """
+    db_path = db_path or get_sqlite_path(json_path)
+    source_hash = graph_processor.compute_file_hash(json_path)
+    if chunk_file and os.path.exists(chunk_file):
+        source_hash += ":" + graph_processor.compute_file_hash(chunk_file)
+
+    if os.path.exists(db_path):
+        try:
+            store = SQLiteGraph(db_path)
+            if store.meta.get("schema_version") == str(SQLITE_SCHEMA_VERSION) and store.source_hash == source_hash:
+                logger.info(f"Opened SQLite graph store {db_path}: {store.number_of_nodes()} nodes, "
+                            f"{store.number_of_edges()} edges")
+                return store
+            store.close()
+            logger.info(f"SQLite graph store {db_path} is stale, rebuilding")
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to open SQLite graph store {db_path}: {type(e).__name__}: {e}")
+
+    graph = graph_processor.load_graph_from_json(json_path)
+    chunks = read_chunk_file(chunk_file) if chunk_file and os.path.exists(chunk_file) else None
+    build_sqlite_graph(graph, db_path, chunks=chunks, source_hash=source_hash)
+    del graph
+    logger.info(f"SQLite graph store written to {db_path}")
+    return SQLiteGraph(db_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the SQLite graph store for a graph JSON file")
+    parser.add_argument("graph", help="Graph JSON file")
+    parser.add_argument("--chunks", help="Chunk file (output/chunks/{dataset}.txt) to store alongside")
+    parser.add_argument("--output", help="SQLite file (defaults to the graph path with a .sqlite suffix)")
+    args = parser.parse_args()
+
+    load_sqlite_graph(args.graph, chunk_file=args.chunks, db_path=args.output)
@@ -1,8 +1,15 @@
+import heapq
 import json
+import math
+import multiprocessing
+import os
 import time
 import warnings
 from collections import defaultdict
-from typing import Dict, List
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
 
 import networkx as nx
 import numpy as np
@@ -24,14 +31,136 @@ try:
 except ImportError:
     get_config = None
 
+try:
+    import igraph
+    import leidenalg
+except ImportError:
+    igraph = None
+    leidenalg = None
+
+
+# 社区层（level 3/4）写回图中的关系，计算实体三元组表示时需要排除
+COMMUNITY_RELATIONS = {"member_of", "represented_by", "keyword_of", "kw_filter_by"}
+
+MAX_MERGED_COMMUNITY_SIZE = 100
+# 待细分节点总数低于该值时，进程池的启动开销大于收益，串行执行
+PARALLEL_REFINE_MIN_NODES = 2000
+
+
+def _kmeans_groups(embeddings, n_clusters=None) -> List[List[int]]:
+    """KMeans over embedding rows, returning row groups in first-seen label order"""
+    n = len(embeddings)
+    if n <= 2:
+        return [list(range(n))]
+
+    if n_clusters is None:
+        base_clusters = n // 10
+        n_clusters = min(max(2, base_clusters), n // 2, 200)
+
+    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=5)
+    cluster_labels = kmeans.fit_predict(embeddings)
+
+    groups = defaultdict(list)
+    for row, label in enumerate(cluster_labels):
+        groups[label].append(row)
+    return list(groups.values())
+
+
+def _should_merge(size1: int, size2: int, similarity: float) -> bool:
+    if similarity < 0.5:
+        return False
+    return size1 + size2 <= MAX_MERGED_COMMUNITY_SIZE
+
+
+def _refine_embedding_cluster(embeddings, max_iter, merge_threshold) -> List[List[int]]:
+    """
+    Split one cluster with KMeans and greedily merge similar sub-clusters.
+    Centroid similarities are computed as one matrix product, above-threshold pairs are
+    consumed from a heap, and merged centroids are updated as size-weighted means.
+    :return: groups of row indices into embeddings
+    """
+    if len(embeddings) <= 3:
+        return [list(range(len(embeddings)))]
+
+    current_clusters = _kmeans_groups(embeddings)
+    if len(current_clusters) == 1:
+        return current_clusters
+
+    sizes = np.array([len(rows) for rows in current_clusters], dtype=np.float64)
+    # 簇中心为成员三元组向量的均值，合并时按簇大小加权增量更新
+    centroids = np.vstack([embeddings[rows].mean(axis=0) for rows in current_clusters])
+
+    for iteration in range(max_iter):
+        normalized = centroids / (np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-9)
+        center_sim_matrix = normalized @ normalized.T
+
+        rows, cols = np.nonzero(np.triu(center_sim_matrix >= merge_threshold, k=1))
+        merge_heap = [(-center_sim_matrix[i, j], i, j) for i, j in zip(rows.tolist(), cols.tolist())]
+        heapq.heapify(merge_heap)
+
+        merged = np.zeros(len(current_clusters), dtype=bool)
+        new_clusters, new_centroids, new_sizes = [], [], []
+
+        while merge_heap:
+            neg_sim, i, j = heapq.heappop(merge_heap)
+            if merged[i] or merged[j]:
+                continue
+
+            if not _should_merge(len(current_clusters[i]), len(current_clusters[j]), -neg_sim):
+                continue
+
+            merged_size = sizes[i] + sizes[j]
+            new_clusters.append(current_clusters[i] + current_clusters[j])
+            new_centroids.append((sizes[i] * centroids[i] + sizes[j] * centroids[j]) / merged_size)
+            new_sizes.append(merged_size)
+            merged[i] = merged[j] = True
+
+        if not new_clusters:
+            break
+
+        for idx in np.flatnonzero(~merged):
+            new_clusters.append(current_clusters[idx])
+            new_centroids.append(centroids[idx])
+            new_sizes.append(sizes[idx])
+
+        current_clusters = new_clusters
+        centroids = np.vstack(new_centroids)
+        sizes = np.array(new_sizes, dtype=np.float64)
+
+        if len(current_clusters) == 1:
+            break
+
+    return current_clusters
+
+
+_worker_embeddings = None
+_worker_shm = None
+_worker_thread_limits = None
+
+
+def _init_refine_worker(shm_name, shape, dtype):
+    """Attach the read-only embedding matrix shared by the parent process"""
+    global _worker_embeddings, _worker_shm, _worker_thread_limits
+    # 每个进程内 KMeans 单线程运行，避免与进程级并行互相争抢 CPU
+    from threadpoolctl import threadpool_limits
+    _worker_thread_limits = threadpool_limits(limits=1)
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_embeddings = np.ndarray(shape, dtype=np.dtype(dtype), buffer=_worker_shm.buf)
+
+
+def _refine_worker(rows, max_iter, merge_threshold) -> List[List[int]]:
+    groups = _refine_embedding_cluster(_worker_embeddings[rows], max_iter, merge_threshold)
+    return [[rows[i] for i in group] for group in groups]
+
 
 class FastTreeComm:
-    def __init__(self, graph, embedding_model="all-MiniLM-L6-v2", struct_weight=0.3, config=None):
+    def __init__(self, graph, embedding_model="all-MiniLM-L6-v2", struct_weight=0.3, config=None, llm_client=None):
         """
         :param graph: Input graph (NetworkX DiGraph)
-        :param embedding_model: Sentence embedding model
+        :param embedding_model: Sentence embedding model name, or an already loaded encoder
         :param struct_weight: Structural similarity weight (float between 0 and 1)
         :param config: Configuration object (optional)
+        :param llm_client: LLM client used for community naming (optional, created from env by default)
         """
         if config is None and get_config is not None:
             try:
@@ -45,23 +174,42 @@ class FastTreeComm:
             embedding_model = embedding_model or config.tree_comm.embedding_model
             struct_weight = struct_weight if struct_weight != 0.3 else config.tree_comm.struct_weight
         
-        self.model = SentenceTransformer(embedding_model)
+        tree_comm_config = config.tree_comm if config else None
+        self.community_engine = getattr(tree_comm_config, "community_engine", "kmeans")
+        self.modularity_resolution = getattr(tree_comm_config, "modularity_resolution", 1.0)
+        self.modularity_threshold = getattr(tree_comm_config, "modularity_threshold", 1e-7)
+
+        if isinstance(embedding_model, str):
+            self.model = SentenceTransformer(embedding_model)
+        else:
+            self.model = embedding_model
         self.semantic_cache = {}
         self.struct_weight = struct_weight
-        self.node_list = list(graph.nodes())
-        self.node_names = {n: graph.nodes[n]["properties"]["name"] for n in graph.nodes()}
-        self.neighbor_cache = {n: set(graph.neighbors(n)) for n in graph.nodes()}
-        self.edge_relations = {(u, v): data.get("relation", "related_to") 
-                          for u, v, data in graph.edges(data=True)}
-        
-        self.triple_strings_cache = {}
-        self.degree_cache = {n: self.graph.degree(n) for n in self.node_list}
+        # 各阶段累计耗时（秒），便于定位社区构建的瓶颈
+        self.phase_times = defaultdict(float)
+
+        with self._timed_phase("adjacency"):
+            self.node_list = list(graph.nodes())
+            self.node_names = {n: graph.nodes[n]["properties"]["name"] for n in graph.nodes()}
+            self.neighbor_cache = {n: set(graph.neighbors(n)) for n in graph.nodes()}
+            
+            self.triple_strings_cache = {}
+            self.degree_cache = {n: self.graph.degree(n) for n in self.node_list}
 
-        self.adjacency_sparse = self._build_sparse_adjacency()
+            self.adjacency_sparse = self._build_sparse_adjacency()
 
-        self._precompute_all_triples()
+        with self._timed_phase("triples"):
+            self._precompute_all_triples()
         
-        self.llm_client = call_llm_api.LLMCompletionCall()
+        self.llm_client = llm_client if llm_client is not None else call_llm_api.LLMCompletionCall()
+
+    @contextmanager
+    def _timed_phase(self, phase: str):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.phase_times[phase] += time.time() - start
 
     def _build_sparse_adjacency(self):
         n = len(self.node_list)
@@ -95,6 +243,8 @@ class FastTreeComm:
         
         for neighbor in self.graph.neighbors(node_id):
             rel = self.graph.edges[node_id, neighbor, 0].get("relation", "related_to")
+            if rel in COMMUNITY_RELATIONS:
+                continue
             neighbor_name = self.graph.nodes[neighbor]["properties"]["name"]
             triples.append(f"{node_name} {rel} {neighbor_name}")
             
@@ -168,20 +318,10 @@ class FastTreeComm:
         if len(level_nodes) <= 2:
             return {0: level_nodes}
         
-        if n_clusters is None:
-            base_clusters = len(level_nodes) // 10
-            n_clusters = min(max(2, base_clusters), len(level_nodes) // 2, 200)
-        
         embeddings = self.get_triple_embeddings_batch(level_nodes)
+        groups = _kmeans_groups(embeddings, n_clusters)
         
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=5)
-        cluster_labels = kmeans.fit_predict(embeddings)
-        
-        clusters = defaultdict(list)
-        for node, label in zip(level_nodes, cluster_labels):
-            clusters[label].append(node)
-        
-        return dict(clusters)
+        return {label: [level_nodes[row] for row in rows] for label, rows in enumerate(groups)}
 
     def detect_communities(self, level_nodes, max_iter=1, merge_threshold=0.5, max_total_communities=None):
         if len(level_nodes) <= 1:
@@ -195,155 +335,198 @@ class FastTreeComm:
                 # 原有的默认逻辑：节点数的1/3，最少5个，最多200个
                 max_total_communities = min(max(5, len(level_nodes) // 3), 200)
 
-        initial_clusters = self._fast_clustering(level_nodes)
+        if self.community_engine in ("louvain", "leiden"):
+            with self._timed_phase("clustering"):
+                return self._detect_communities_modularity(level_nodes, max_total_communities)
+
+        with self._timed_phase("embeddings"):
+            self.get_triple_embeddings_batch(level_nodes)
+
+        with self._timed_phase("clustering"):
+            initial_clusters = self._fast_clustering(level_nodes)
         final_communities = {}
         comm_id = 0
         
         # 按簇大小排序，优先处理大簇（确保大簇能得到细分机会）
         sorted_clusters = sorted(initial_clusters.items(), key=lambda x: len(x[1]), reverse=True)
         processed_cluster_ids = set()
-        
-        for cluster_id, cluster_nodes in sorted_clusters:
-            processed_cluster_ids.add(cluster_id)
-            
-            if len(cluster_nodes) <= 3:
-                final_communities[comm_id] = cluster_nodes
-                comm_id += 1
-            else:
-                # 检查是否还有剩余配额进行细分
-                if len(final_communities) >= max_total_communities:
-                    # 配额已满，将剩余簇直接作为社区，不再细分
-                    final_communities[comm_id] = cluster_nodes
-                    comm_id += 1
-                else:
-                    sub_communities = self._refine_cluster(cluster_nodes, max_iter, merge_threshold)
-                    for sub_comm in sub_communities.values():
-                        final_communities[comm_id] = sub_comm
+
+        with self._timed_phase("refinement"):
+            # 各簇的细分相互独立，可并行提交；结果仍按排序顺序消费，保证 comm_id 分配与上限逻辑不变
+            with self._parallel_refinement(level_nodes, sorted_clusters, max_iter, merge_threshold) as pending:
+                for cluster_id, cluster_nodes in sorted_clusters:
+                    processed_cluster_ids.add(cluster_id)
+                
+                    if len(cluster_nodes) <= 3:
+                        final_communities[comm_id] = cluster_nodes
                         comm_id += 1
-                        
-                        # 如果社区数量已经达到上限，停止细分
+                    else:
+                        # 检查是否还有剩余配额进行细分
                         if len(final_communities) >= max_total_communities:
-                            break
-                    
-                    # 如果达到上限，将剩余未处理的簇直接添加为社区
-                    if len(final_communities) >= max_total_communities:
-                        for remaining_cluster_id, remaining_nodes in sorted_clusters:
-                            if remaining_cluster_id not in processed_cluster_ids:
-                                if len(final_communities) < max_total_communities:
-                                    final_communities[comm_id] = remaining_nodes
-                                    comm_id += 1
-                                else:
+                            # 配额已满，将剩余簇直接作为社区，不再细分
+                            final_communities[comm_id] = cluster_nodes
+                            comm_id += 1
+                        else:
+                            if pending is not None:
+                                row_groups = pending[cluster_id].result()
+                                sub_communities = {
+                                    i: [level_nodes[row] for row in rows] for i, rows in enumerate(row_groups)
+                                }
+                            else:
+                                sub_communities = self._refine_cluster(cluster_nodes, max_iter, merge_threshold)
+                            for sub_comm in sub_communities.values():
+                                final_communities[comm_id] = sub_comm
+                                comm_id += 1
+                            
+                                # 如果社区数量已经达到上限，停止细分
+                                if len(final_communities) >= max_total_communities:
                                     break
-                        break
+                        
+                            # 如果达到上限，将剩余未处理的簇直接添加为社区
+                            if len(final_communities) >= max_total_communities:
+                                for remaining_cluster_id, remaining_nodes in sorted_clusters:
+                                    if remaining_cluster_id not in processed_cluster_ids:
+                                        if len(final_communities) < max_total_communities:
+                                            final_communities[comm_id] = remaining_nodes
+                                            comm_id += 1
+                                        else:
+                                            break
+                                break
+        
         
         logger.info(f"Generated {len(final_communities)} communities from {len(level_nodes)} nodes")
         return final_communities
 
+    def _level_adjacency(self, level_nodes):
+        """Undirected, multiplicity-weighted adjacency restricted to level_nodes"""
+        node_to_idx = {node: i for i, node in enumerate(self.node_list)}
+        level_indices = [node_to_idx[node] for node in level_nodes]
+        sub_adj = self.adjacency_sparse[level_indices][:, level_indices]
+        sym_adj = (sub_adj + sub_adj.T).tocsr()
+        sym_adj.setdiag(0)
+        sym_adj.eliminate_zeros()
+        return sym_adj
+
+    def _modularity_partition(self, sym_adj) -> List[List[int]]:
+        n = sym_adj.shape[0]
+        if self.community_engine == "leiden":
+            if leidenalg is not None:
+                coo = sp.triu(sym_adj, k=1).tocoo()
+                ig_graph = igraph.Graph(n=n, edges=list(zip(coo.row.tolist(), coo.col.tolist())))
+                ig_graph.es["weight"] = coo.data.tolist()
+                partition = leidenalg.find_partition(
+                    ig_graph, leidenalg.RBConfigurationVertexPartition, weights="weight",
+                    resolution_parameter=self.modularity_resolution, seed=42
+                )
+                return [list(members) for members in partition]
+            logger.warning("leidenalg/igraph not installed, falling back to Louvain")
+
+        nx_graph = nx.from_scipy_sparse_array(sym_adj)
+        partition = nx.community.louvain_communities(
+            nx_graph, weight="weight", resolution=self.modularity_resolution,
+            threshold=self.modularity_threshold, seed=42
+        )
+        return [sorted(members) for members in partition]
+
+    def _detect_communities_modularity(self, level_nodes, max_total_communities):
+        """
+        Graph-native community detection (Louvain/Leiden) over the sparse adjacency.
+        No embeddings are needed here; semantic scores are only used later for naming and keywords.
+        Communities beyond max_total_communities are dissolved and their nodes re-attached to the
+        kept community they share the most edges with.
+        """
+        sym_adj = self._level_adjacency(level_nodes)
+        parts = self._modularity_partition(sym_adj)
+        parts.sort(key=lambda members: (-len(members), min(members)))
+
+        if len(parts) > max_total_communities:
+            kept = parts[:max_total_communities]
+            labels = np.full(len(level_nodes), -1, dtype=np.int64)
+            for comm_id, members in enumerate(kept):
+                labels[members] = comm_id
+
+            assigned = np.flatnonzero(labels >= 0)
+            leftover = np.flatnonzero(labels < 0)
+            membership = sp.csr_matrix(
+                (np.ones(len(assigned)), (assigned, labels[assigned])),
+                shape=(len(level_nodes), len(kept))
+            )
+            edge_counts = (sym_adj[leftover] @ membership).toarray()
+            best = edge_counts.argmax(axis=1)
+            has_neighbor = edge_counts.max(axis=1) > 0
+            labels[leftover[has_neighbor]] = best[has_neighbor]
+
+            num_candidates = len(parts)
+            parts = [np.flatnonzero(labels == comm_id).tolist() for comm_id in range(len(kept))]
+            logger.info(f"Capped {num_candidates} candidate communities to {len(kept)}, "
+                        f"{int((~has_neighbor).sum())} isolated nodes left unassigned")
+
+        final_communities = {
+            comm_id: [level_nodes[i] for i in members] for comm_id, members in enumerate(parts)
+        }
+        logger.info(f"Generated {len(final_communities)} communities from {len(level_nodes)} nodes "
+                    f"({self.community_engine})")
+        return final_communities
+
     def _refine_cluster(self, cluster_nodes, max_iter, merge_threshold):
         if len(cluster_nodes) <= 3:
             return {0: cluster_nodes}
 
-        initial_clusters = self._fast_clustering(cluster_nodes)
-        
-        if len(initial_clusters) == 1:
-            return initial_clusters
-        
-        cluster_centers = {}
-        for cluster_id, nodes in initial_clusters.items():
-            center = self._compute_community_center(nodes)
-            cluster_centers[cluster_id] = center
-        
-        center_nodes = list(cluster_centers.values())
-        center_sim_matrix = self._compute_sim_matrix(center_nodes)
-        
-        center_to_idx = {center: idx for idx, center in enumerate(center_nodes)}
+        embeddings = self.get_triple_embeddings_batch(cluster_nodes)
+        groups = _refine_embedding_cluster(embeddings, max_iter, merge_threshold)
 
-        current_clusters = initial_clusters.copy()
-        current_centers = cluster_centers.copy()
-        
-        for iteration in range(max_iter):
-            changed = False
-            
-            cluster_ids = list(current_clusters.keys())
-            n_clusters = len(cluster_ids)
-            
-            cluster_similarities = []
-            
-            for i in range(n_clusters):
-                for j in range(i + 1, n_clusters):
-                    cluster1_id = cluster_ids[i]
-                    cluster2_id = cluster_ids[j]
-                    
-                    center1 = current_centers[cluster1_id]
-                    center2 = current_centers[cluster2_id]
-                    idx1 = center_to_idx[center1]
-                    idx2 = center_to_idx[center2]
-                    center_sim = center_sim_matrix[idx1][idx2]
-                    
-                    if center_sim >= merge_threshold:
-                        cluster_similarities.append({
-                            'cluster1': cluster1_id,
-                            'cluster2': cluster2_id,
-                            'similarity': center_sim
-                        })
-            
-            cluster_similarities.sort(key=lambda x: x['similarity'], reverse=True)
-            
-            merged_clusters = set()
-            new_clusters = {}
-            new_centers = {}
-            next_cluster_id = 0
-            
-            for sim_info in cluster_similarities:
-                cluster1_id = sim_info['cluster1']
-                cluster2_id = sim_info['cluster2']
-                
-                if cluster1_id not in merged_clusters and cluster2_id not in merged_clusters:
-
-                    if self._should_merge_clusters(
-                        current_clusters[cluster1_id], 
-                        current_clusters[cluster2_id],
-                        sim_info
-                    ):
-                        merged_nodes = current_clusters[cluster1_id] + current_clusters[cluster2_id]
-                        new_clusters[next_cluster_id] = merged_nodes
-                        
-                        new_center = self._compute_community_center(merged_nodes)
-                        new_centers[next_cluster_id] = new_center
-                        center_to_idx[new_center] = len(center_to_idx)
-                        
-                        merged_clusters.add(cluster1_id)
-                        merged_clusters.add(cluster2_id)
-                        next_cluster_id += 1
-                        changed = True
-            
-            for cluster_id, nodes in current_clusters.items():
-                if cluster_id not in merged_clusters:
-                    new_clusters[next_cluster_id] = nodes
-                    new_centers[next_cluster_id] = current_centers[cluster_id]
-                    next_cluster_id += 1
-            
-            if not changed:
-                break
-            
-            current_clusters = new_clusters
-            current_centers = new_centers
-            
-            if len(current_clusters) == 1:
-                break
-        
-        return current_clusters
-    
-    def _should_merge_clusters(self, cluster1_nodes, cluster2_nodes, sim_info):
+        return {cluster_id: [cluster_nodes[row] for row in rows] for cluster_id, rows in enumerate(groups)}
 
-        if sim_info['similarity'] < 0.5:
-            return False
-        
-        merged_size = len(cluster1_nodes) + len(cluster2_nodes)
-        if merged_size > 100:
-            return False
-        
-        return True
+    def _get_refine_workers(self) -> int:
+        workers = 1
+        if self.config and hasattr(self.config.tree_comm, 'refine_workers'):
+            workers = self.config.tree_comm.refine_workers
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        return workers
+
+    @contextmanager
+    def _parallel_refinement(self, level_nodes, sorted_clusters, max_iter, merge_threshold):
+        """
+        Refine every cluster with more than 3 nodes in a process pool for the duration of the with block.
+        Workers read the level embeddings from shared memory and return row groups.
+        Yields {cluster_id: future}, or None if refinement should stay serial. On exit the pool is shut
+        down and the shared memory segment released, also when setting them up fails part-way.
+        """
+        jobs = [(cluster_id, nodes) for cluster_id, nodes in sorted_clusters if len(nodes) > 3]
+        workers = min(self._get_refine_workers(), len(jobs))
+        if workers <= 1 or sum(len(nodes) for _, nodes in jobs) < PARALLEL_REFINE_MIN_NODES:
+            yield None
+            return
+
+        embeddings = np.ascontiguousarray(self.get_triple_embeddings_batch(level_nodes))
+        shm = shared_memory.SharedMemory(create=True, size=max(embeddings.nbytes, 1))
+        executor = None
+        try:
+            np.ndarray(embeddings.shape, dtype=embeddings.dtype, buffer=shm.buf)[:] = embeddings
+
+            node_to_row = {node: row for row, node in enumerate(level_nodes)}
+            # spawn 避免在已初始化 OpenMP 线程池的父进程中 fork
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_refine_worker,
+                initargs=(shm.name, embeddings.shape, embeddings.dtype.str),
+            )
+            pending = {
+                cluster_id: executor.submit(_refine_worker, [node_to_row[n] for n in nodes], max_iter, merge_threshold)
+                for cluster_id, nodes in jobs
+            }
+            logger.info(f"Refining {len(jobs)} clusters with {workers} worker processes")
+            yield pending
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            shm.close()
+            shm.unlink()
+
+    def _should_merge_clusters(self, cluster1_nodes, cluster2_nodes, sim_info):
+        return _should_merge(len(cluster1_nodes), len(cluster2_nodes), sim_info['similarity'])
 
     def _compute_community_center(self, community_nodes):
         """Compute community center using the top keyword as the center node"""
@@ -395,7 +578,17 @@ class FastTreeComm:
         return response_json
         
 
-    def create_super_nodes(self, comm_to_nodes: Dict[str, List[str]], level: int = 4, batch_size: int = 5):
+    def _super_node_id(self, comm_id, level: int, super_node_ids: Optional[Dict] = None) -> str:
+        if super_node_ids and comm_id in super_node_ids:
+            return super_node_ids[comm_id]
+        return f"comm_{level}_{comm_id}"
+
+    def create_super_nodes(self, comm_to_nodes: Dict[str, List[str]], level: int = 4, batch_size: int = 5,
+                           super_node_ids: Optional[Dict] = None):
+        """
+        :param super_node_ids: Optional mapping from comm_id to an existing super node id,
+            used to update community nodes in place instead of creating new ones
+        """
         super_nodes = {}
         communities = [(comm_id, members) for comm_id, members in comm_to_nodes.items() 
                       if len(members) >= 2]
@@ -421,7 +614,7 @@ class FastTreeComm:
                     comm_name = llm_info.get("name", f"Community_{comm_id}")
                     comm_summary = llm_info.get("summary", f"Community of {len(members)} members")
                     
-                    super_node_id = f"comm_{level}_{comm_id}"
+                    super_node_id = self._super_node_id(comm_id, level, super_node_ids)
                     member_names = [self.node_names[n] for n in members]
                     
                     self.graph.add_node(
@@ -470,9 +663,18 @@ class FastTreeComm:
         top_nodes = sorted(community_nodes, key=lambda x: combined_scores[x], reverse=True)[:top_k]
         return top_nodes
 
-    def create_super_nodes_with_keywords(self, comm_to_nodes: Dict[str, List[str]], level: int = 4, batch_size: int = 5):
-        super_nodes = self.create_super_nodes(comm_to_nodes, level, batch_size)
+    def create_super_nodes_with_keywords(self, comm_to_nodes: Dict[str, List[str]], level: int = 4, batch_size: int = 5,
+                                         super_node_ids: Optional[Dict] = None):
+        with self._timed_phase("naming"):
+            super_nodes = self.create_super_nodes(comm_to_nodes, level, batch_size, super_node_ids)
         
+        with self._timed_phase("keywords"):
+            keyword_mapping = self._create_keyword_nodes(comm_to_nodes, level, super_node_ids)
+
+        return super_nodes, keyword_mapping
+
+    def _create_keyword_nodes(self, comm_to_nodes: Dict[str, List[str]], level: int = 4,
+                              super_node_ids: Optional[Dict] = None) -> Dict[str, str]:
         keyword_mapping = {}
         for comm_id, members in comm_to_nodes.items():
             if len(members) < 2:
@@ -480,7 +682,7 @@ class FastTreeComm:
                 
             try:
                 keywords = self.extract_keywords_from_community(members)
-                super_node_id = f"comm_{level}_{comm_id}"
+                super_node_id = self._super_node_id(comm_id, level, super_node_ids)
                 
                 for keyword in keywords:
                     keyword_node_id = f"kw_{comm_id}_{keyword}"
@@ -505,6 +707,130 @@ class FastTreeComm:
             except Exception as e:
                 logger.error(f"Error creating keywords for community {comm_id}: {e}")
         
-        return super_nodes, keyword_mapping
+        return keyword_mapping
+
+    def get_existing_communities(self, level: int = 4) -> Dict[str, List[str]]:
+        """Return {super_node_id: member node ids} for community nodes already in the graph"""
+        communities = {}
+        for node, data in self.graph.nodes(data=True):
+            if data.get("level") != level or data.get("label") != "community":
+                continue
+            members = []
+            for member, _, edge_data in self.graph.in_edges(node, data=True):
+                if edge_data.get("relation") == "member_of" and member not in members:
+                    members.append(member)
+            communities[node] = members
+        return communities
+
+    def _next_community_id(self, level: int) -> int:
+        prefix = f"comm_{level}_"
+        used_ids = [
+            int(node[len(prefix):]) for node in self.graph.nodes()
+            if isinstance(node, str) and node.startswith(prefix) and node[len(prefix):].isdigit()
+        ]
+        return max(used_ids) + 1 if used_ids else 0
+
+    def _detach_community(self, super_node_id: str):
+        """Drop member_of edges and keyword nodes of a community before it is re-summarized"""
+        member_edges, keyword_edges = [], []
+        for u, _, key, data in self.graph.in_edges(super_node_id, keys=True, data=True):
+            if data.get("relation") == "member_of":
+                member_edges.append((u, super_node_id, key))
+            elif data.get("relation") == "keyword_of":
+                keyword_edges.append((u, super_node_id, key))
+
+        self.graph.remove_edges_from(member_edges + keyword_edges)
+
+        # 关键词节点可能被多个社区共享（按名称去重加载时），仅删除不再属于任何社区的关键词节点
+        for keyword_node, _, _ in keyword_edges:
+            still_used = any(
+                data.get("relation") == "keyword_of"
+                for _, _, data in self.graph.out_edges(keyword_node, data=True)
+            )
+            if not still_used:
+                self.graph.remove_node(keyword_node)
+
+    def _merge_small_pieces(self, pieces: List[List[str]], min_size: int = 2) -> List[List[str]]:
+        """
+        Fold pieces of a split community smaller than min_size into the sibling piece with the most
+        similar centroid (create_super_nodes drops communities below 2 members, which would leave
+        their nodes without a community). Returns the pieces largest first.
+        """
+        kept = [list(piece) for piece in pieces if len(piece) >= min_size]
+        small = [node for piece in pieces if len(piece) < min_size for node in piece]
+        if not kept:
+            return [small] if small else []
+        if small:
+            centroids = np.vstack([self.get_triple_embeddings_batch(piece).mean(axis=0) for piece in kept])
+            centroids = centroids / (np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-9)
+            embeddings = self.get_triple_embeddings_batch(small)
+            embeddings = embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-9)
+            for node, piece_idx in zip(small, np.argmax(embeddings @ centroids.T, axis=1).tolist()):
+                kept[piece_idx].append(node)
+        return sorted(kept, key=len, reverse=True)
+
+    def assign_new_entities(self, new_nodes: List[str], level: int = 4, max_community_size: Optional[int] = None,
+                            batch_size: int = 5):
+        """
+        Incrementally attach new level-2 nodes to the existing communities.
+        Each new node joins the community with the nearest centroid; communities that grow past
+        max_community_size are re-clustered, and only changed communities are re-summarized.
+        :return: (super_nodes, keyword_mapping) for the changed communities
+        """
+        if not new_nodes:
+            return {}, {}
+
+        if max_community_size is None:
+            if self.config and hasattr(self.config.tree_comm, 'max_community_size'):
+                max_community_size = self.config.tree_comm.max_community_size
+            else:
+                max_community_size = 100
+
+        existing = self.get_existing_communities(level)
+        existing = {super_id: members for super_id, members in existing.items() if members}
+        if not existing:
+            logger.info("No existing communities found, falling back to full community detection")
+            comm_to_nodes = self.detect_communities(new_nodes)
+            return self.create_super_nodes_with_keywords(comm_to_nodes, level, batch_size)
+
+        super_ids = list(existing.keys())
+        centroids = np.vstack([
+            self.get_triple_embeddings_batch(existing[super_id]).mean(axis=0) for super_id in super_ids
+        ])
+        centroids = centroids / (np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-9)
+
+        new_embeddings = self.get_triple_embeddings_batch(new_nodes)
+        new_embeddings = new_embeddings / (np.linalg.norm(new_embeddings, axis=1, keepdims=True) + 1e-9)
+        nearest = np.argmax(new_embeddings @ centroids.T, axis=1)
+
+        changed = []
+        for node, comm_idx in zip(new_nodes, nearest.tolist()):
+            super_id = super_ids[comm_idx]
+            existing[super_id].append(node)
+            if super_id not in changed:
+                changed.append(super_id)
+
+        comm_to_nodes = {}
+        super_node_ids = {}
+        next_comm_id = self._next_community_id(level)
+        for super_id in changed:
+            members = existing[super_id]
+            if len(members) > max_community_size:
+                n_clusters = min(math.ceil(len(members) / max_community_size), len(members) // 2)
+                pieces = self._merge_small_pieces(list(self._fast_clustering(members, n_clusters=n_clusters).values()))
+                logger.info(f"Community {super_id} grew to {len(members)} members, split into {len(pieces)}")
+            else:
+                pieces = [members]
+
+            self._detach_community(super_id)
+
+            # 最大的子簇沿用原社区节点，其余子簇作为新社区
+            for piece_idx, piece in enumerate(pieces):
+                comm_to_nodes[next_comm_id] = piece
+                if piece_idx == 0:
+                    super_node_ids[next_comm_id] = super_id
+                next_comm_id += 1
 
-    
\ No newline at end of file
+        logger.info(f"Assigned {len(new_nodes)} new nodes, re-summarizing {len(comm_to_nodes)} "
+                    f"of {len(existing)} communities")
+        return self.create_super_nodes_with_keywords(comm_to_nodes, level, batch_size, super_node_ids)